@@ -0,0 +1,83 @@
+import logging
+from typing import Dict, List, Sequence
+
+from app.helper_functions import count_tokens
+from app.web_crawler.summarizers import iter_chunks
+
+logger = logging.getLogger(__name__)
+
+TEXT_CONTEXT_TOKENS = 1500
+IMAGE_CONTEXT_TOKENS = 500
+
+
+class ArticleContext:
+    """
+    The news articles of one request as compact prompt context, numbered in
+    ranking order with title, source and summary only:
+
+        [1] Title of the best ranked article (https://source/...)
+        Its summary ...
+
+    It is created once per request by the crawler node and shared by the nodes
+    that need the articles. Every node renders it within its own token budget:
+    articles are added in ranking order, the last one that does not fit in full
+    gets its summary cut on a sentence boundary and lower ranked ones are left
+    out. Renders are kept per budget, so nodes with the same budget share one.
+    """
+
+    def __init__(self, articles: Sequence, min_summary_tokens: int = 30):
+        self.articles = list(articles)
+        self.__min_summary_tokens = min_summary_tokens
+        self.__headers = [f"[{i}] {article.title} ({article.source})" for i, article in enumerate(self.articles, 1)]
+        self.__summaries = [" ".join(article.content.split()) for article in self.articles]
+        self.__header_tokens = [count_tokens(header) for header in self.__headers]
+        self.__summary_tokens = [count_tokens(summary) for summary in self.__summaries]
+        self.__renders: Dict[int, str] = {}
+        self.__repr_tokens = None
+
+    @property
+    def repr_tokens(self) -> int:
+        """Tokens of the repr of the articles, how they used to be put into the prompts."""
+        if self.__repr_tokens is None:
+            self.__repr_tokens = count_tokens(str(self.articles))
+        return self.__repr_tokens
+
+    @property
+    def full_tokens(self) -> int:
+        """Tokens of the context with all articles and full summaries (roughly, separators are estimated)."""
+        return sum(self.__header_tokens) + sum(self.__summary_tokens) + 2 * len(self.articles)
+
+    def render(self, max_tokens: int, name: str = "prompt") -> str:
+        """The context within max_tokens tokens, `name` is the node it is for (logging only)."""
+        context = self.__renders.get(max_tokens)
+        if context is not None:
+            return context
+
+        entries: List[str] = []
+        used = 0
+        for header, header_tokens, summary, summary_tokens in zip(
+            self.__headers, self.__header_tokens, self.__summaries, self.__summary_tokens
+        ):
+            # A line break after the header and a blank line after the entry
+            remaining = max_tokens - used - header_tokens - 2
+            if summary_tokens <= remaining:
+                entries.append(f"{header}\n{summary}")
+                used += header_tokens + summary_tokens + 2
+                continue
+            if remaining >= self.__min_summary_tokens:
+                cut = next(iter_chunks(summary, remaining - 1), "")
+                entries.append(f"{header}\n{cut} …")
+            break
+
+        context = "\n\n".join(entries)
+        self.__renders[max_tokens] = context
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Article context for %s: %d/%d articles, %d tokens (budget %d), %d tokens as article repr",
+                name, len(entries), len(self.articles), count_tokens(context), max_tokens, self.repr_tokens,
+            )
+        return context
+
+    def __str__(self) -> str:
+        return f"ArticleContext({len(self.articles)} articles, {self.full_tokens} tokens)"
+
@@ -29,5 +29,9 @@ class MemeTemplate(BaseModel):
     box_count: int = Field(description="The number of boxes in the meme template")
 
 
+class MemeTemplateChoice(BaseModel):
+    id: str = Field(description="The ID of the selected meme template")
+
+
 class MemeCaptions(BaseModel):
     captions: List[str] = Field(description="List of captions for the meme")
@@ -0,0 +1,105 @@
+import threading
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Type, Union
+
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.state import CompiledStateGraph
+
+
+class GraphRegistry:
+    """
+    Compiled variants of one LangGraph workflow, keyed by the set of nodes they
+    contain. A variant is built and compiled on first use and then shared by
+    all requests; compiled graphs without a checkpointer keep no per-run state.
+
+    Every node runs after the nodes it depends on. Nodes without dependencies
+    start at START, nodes nothing depends on lead to END. Asking for a node
+    includes its dependencies.
+
+    A node with a condition only runs if the condition holds for the state when
+    its dependency finished, otherwise it and everything after it is skipped.
+    Conditions are routed with conditional edges, so they are evaluated per run
+    of the same compiled graph. Conditions are supported for nodes with at most
+    one dependency.
+    """
+
+    def __init__(
+        self,
+        state_schema: Type,
+        nodes: Dict[str, Callable],
+        dependencies: Dict[str, List[str]],
+        conditions: Optional[Dict[str, Callable[[dict], bool]]] = None,
+    ):
+        self.__state_schema = state_schema
+        self.__nodes = nodes
+        self.__dependencies = dependencies
+        self.__conditions = conditions or {}
+        for name in self.__conditions:
+            if len(self.__dependencies.get(name, [])) > 1:
+                raise ValueError(f"Node '{name}' has several dependencies and cannot have a condition")
+        self.__graphs: Dict[FrozenSet[str], CompiledStateGraph] = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def node_names(self) -> List[str]:
+        return list(self.__nodes)
+
+    @property
+    def variants(self) -> List[FrozenSet[str]]:
+        return list(self.__graphs)
+
+    def required_nodes(self, node_names: Iterable[str]) -> FrozenSet[str]:
+        """The given nodes and everything they depend on."""
+        required = set()
+        pending = list(node_names)
+        while pending:
+            name = pending.pop()
+            if name not in self.__nodes:
+                raise ValueError(f"Unknown node '{name}'")
+            if name not in required:
+                required.add(name)
+                pending.extend(self.__dependencies.get(name, []))
+        return frozenset(required)
+
+    def build(self, node_names: FrozenSet[str]) -> StateGraph:
+        workflow = StateGraph(self.__state_schema)
+        # Keep the declaration order, it determines the order of parallel branches
+        names = [name for name in self.__nodes if name in node_names]
+        for name in names:
+            workflow.add_node(name, self.__nodes[name])
+        for source in [START] + names:
+            successors = [name for name in names if self.__dependencies.get(name, [START]) == [source]]
+            if any(name in self.__conditions for name in successors):
+                workflow.add_conditional_edges(source, self.__router(successors), successors + [END])
+            elif successors:
+                for name in successors:
+                    workflow.add_edge(source, name)
+            elif source != START and not any(source in self.__dependencies.get(other, []) for other in names):
+                workflow.add_edge(source, END)
+        for name in names:
+            dependencies = self.__dependencies.get(name, [])
+            if len(dependencies) > 1:
+                # Wait for all of them, separate edges would run the node once per dependency
+                workflow.add_edge(dependencies, name)
+        return workflow
+
+    def __router(self, successors: List[str]) -> Callable[[dict], Union[str, List[str]]]:
+        def route(state: dict) -> Union[str, List[str]]:
+            selected = [
+                name for name in successors
+                if name not in self.__conditions or self.__conditions[name](state)
+            ]
+            return selected or END
+
+        return route
+
+    def get(self, node_names: Iterable[str] = None) -> CompiledStateGraph:
+        """The compiled variant with the given nodes (and their dependencies), all nodes by default."""
+        key = self.required_nodes(self.__nodes if node_names is None else node_names)
+        graph = self.__graphs.get(key)
+        if graph is None:
+            with self.__lock:
+                graph = self.__graphs.get(key)
+                if graph is None:
+                    graph = self.build(key).compile()
+                    self.__graphs[key] = graph
+        return graph
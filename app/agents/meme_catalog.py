@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from app.helper_functions import afetch_templates
+from app.web_crawler.query_encoder import hashed_ngram_vector
+
+logger = logging.getLogger(__name__)
+
+
+class MemeTemplateCatalog:
+    """
+    The meme templates of imgflip, fetched at most once per `ttl` seconds. The
+    catalog is kept in memory and in a JSON file at `path`, so a restarted
+    process does not need imgflip before its first meme. If a refresh fails,
+    the outdated templates are used until the next attempt.
+
+    `shortlist` ranks the templates by the cosine similarity of the hashed
+    n-gram vectors (see TopicCache) of their names and the user prompt. Names
+    rarely share words with a prompt, so templates without any overlap keep
+    imgflip's order, which is by popularity. Similarities below
+    `min_similarity` come from shared character n-grams only and count as no
+    overlap. If no name overlaps at all, the ranking says nothing and the
+    `fallback_size` most popular templates are offered instead, more choice
+    than k but not the whole catalog in the prompt.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = "work/cache/meme_templates.json",
+        ttl: float = 86400,
+        dimensions: int = 4096,
+        min_similarity: float = 0.1,
+        fallback_size: int = 30,
+    ):
+        self.__path = pathlib.Path(path) if path else None
+        self.__ttl = ttl
+        self.__dimensions = dimensions
+        self.__min_similarity = min_similarity
+        self.__fallback_size = fallback_size
+        self.__lock = threading.Lock()
+        self.__templates: List[dict] = []
+        self.__vectors = np.zeros((0, dimensions))
+        self.__stored_at = 0.0
+        if self.__path is not None and self.__path.exists():
+            self.__load()
+
+    @classmethod
+    def from_env(cls) -> "MemeTemplateCatalog":
+        """
+        Create a catalog configured by MEME_TEMPLATES_TTL (seconds),
+        MEME_TEMPLATES_PATH (empty string keeps it in memory only) and
+        MEME_SHORTLIST_FALLBACK.
+        """
+        return cls(
+            path=os.getenv("MEME_TEMPLATES_PATH", "work/cache/meme_templates.json"),
+            ttl=float(os.getenv("MEME_TEMPLATES_TTL", 86400)),
+            fallback_size=int(os.getenv("MEME_SHORTLIST_FALLBACK", 30)),
+        )
+
+    def __load(self) -> None:
+        try:
+            with open(self.__path, "r", encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return
+        self.__set(entry["templates"], entry["stored_at"])
+
+    def __store(self) -> None:
+        self.__path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.__path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"stored_at": self.__stored_at, "templates": self.__templates}, file)
+        os.replace(tmp_path, self.__path)
+
+    def __set(self, templates: List[dict], stored_at: float) -> None:
+        vectors = np.array([hashed_ngram_vector(t["name"], self.__dimensions) for t in templates])
+        with self.__lock:
+            self.__templates = templates
+            self.__vectors = vectors.reshape(len(templates), self.__dimensions)
+            self.__stored_at = stored_at
+
+    @property
+    def fresh(self) -> bool:
+        return bool(self.__templates) and time.time() - self.__stored_at < self.__ttl
+
+    async def arefresh(self) -> None:
+        """Fetch the templates from imgflip if the catalog is outdated. Concurrent refreshes just fetch twice."""
+        if self.fresh:
+            return
+        try:
+            templates = await afetch_templates()
+        except Exception as e:
+            templates = []
+            logger.warning("Could not fetch meme templates: %s: %s", type(e).__name__, e)
+        if not templates:
+            if self.__templates:
+                logger.warning("Using %d outdated meme templates", len(self.__templates))
+            return
+        self.__set(templates, time.time())
+        if self.__path is not None:
+            self.__store()
+
+    async def aget_templates(self) -> List[dict]:
+        await self.arefresh()
+        return self.__templates
+
+    def get(self, template_id: str) -> Optional[dict]:
+        return next((t for t in self.__templates if t["id"] == str(template_id)), None)
+
+    def shortlist(self, prompt: str, k: int = 10) -> List[dict]:
+        """
+        The k templates whose names are most similar to the prompt, in order, or
+        the fallback_size (at least k) most popular ones if no name overlaps with
+        the prompt.
+        """
+        with self.__lock:
+            templates, vectors = self.__templates, self.__vectors
+        if not templates:
+            return []
+        similarities = vectors @ hashed_ngram_vector(prompt, self.__dimensions)
+        # Weak similarities (and negative ones from hash collisions) mean no overlap
+        similarities[similarities < self.__min_similarity] = 0
+        if not similarities.any():
+            return templates[:max(k, self.__fallback_size)]
+        return [templates[i] for i in np.argsort(-similarities, kind="stable")[:k]]
+
+    async def ashortlist(self, prompt: str, k: int = 10) -> List[dict]:
+        await self.arefresh()
+        return self.shortlist(prompt, k)
+
+
+_default_catalog: Optional[MemeTemplateCatalog] = None
+
+
+def default_meme_template_catalog() -> MemeTemplateCatalog:
+    """Process wide template catalog, created from the environment on first use."""
+    global _default_catalog
+    if _default_catalog is None:
+        _default_catalog = MemeTemplateCatalog.from_env()
+    return _default_catalog
@@ -1,32 +1,40 @@
+import asyncio
+import logging
 import os
-import json
-from typing import List
+from typing import List, Sequence
 from typing import TypedDict, Union
-import requests
 
 from app.models.base import AzureDallE3ImageGenerator, LangChainDallEImageGenerator
+from app.agents.article_context import ArticleContext, IMAGE_CONTEXT_TOKENS, TEXT_CONTEXT_TOKENS
 from app.agents.data_models import NewsArticle
 from app.models.model_provider import ModelWrapper
-from app.agents.data_models import NewsArticles, MemeTemplate, MemeCaptions
+from app.agents.data_models import NewsArticles, MemeTemplate, MemeTemplateChoice, MemeCaptions
+from app.agents.meme_catalog import default_meme_template_catalog
 
-from app.helper_functions import fetch_templates
 from app.helper_functions import ensure_markdown_format
 
 
 from dotenv import load_dotenv
 
+from app.web_crawler.article_index import shared_article_index
+from app.web_crawler.data_model import NewsArticle as CrawledNewsArticle
+from app.web_crawler.news_repos import SqliteNewsRepo
 from app.web_crawler.news_sources import GoogleNewsSource
 from app.web_crawler.query_encoder import QueryEncoder
-from app.web_crawler.summarizers import Summarizer, SummarizerUsingGroq
+from app.web_crawler.summarizers import Summarizer, create_summarizer_from_env
+from app.web_crawler.http_clients import default_async_http_client
+from app.web_crawler.workflow import acrawl_topic
 
 # Load environment variables
 load_dotenv(override=True)
 
-# Initialize the image generator
+logger = logging.getLogger(__name__)
+
+# Initialize the image generator, it is stateless and shared by all requests
 if os.getenv("LLM_PROVIDER") == "openai":
-    lim = LangChainDallEImageGenerator(api_key=os.getenv("OPENAI_API_KEY"))
+    image_client = LangChainDallEImageGenerator(api_key=os.getenv("OPENAI_API_KEY"))
 else:
-    lim = AzureDallE3ImageGenerator(
+    image_client = AzureDallE3ImageGenerator(
         api_key=os.getenv("AZURE_OPENAI_API_KEY"),
         url=os.getenv("AZURE_OPENAI_DALLE3_ENDPOINT"),
     )
@@ -35,6 +43,18 @@ else:
 model_wrapper = ModelWrapper.initialize_from_env()
 llm = model_wrapper.model
 
+# Initialize the crawler clients, shared by all requests. The Groq clients are
+# created on first use, so a missing GROQ_API_KEY only fails the crawl
+query_encoder = QueryEncoder.from_env()
+summarizer: Summarizer = create_summarizer_from_env()
+news_repo = SqliteNewsRepo.from_env()
+
+
+async def aclose_crawler_clients() -> None:
+    """Close the API clients of the crawler, the FastAPI lifespan calls it on shutdown."""
+    await query_encoder.aclose()
+    await summarizer.aclose()
+
 
 class AgentState(TypedDict):
     """
@@ -47,6 +67,7 @@ class AgentState(TypedDict):
         generate_video (bool): Indicates whether video generation is enabled.
         generate_meme (bool): Indicates whether meme generation is enabled.
         news_articles (Union[NewsArticles, None]): The news articles used for generation.
+        article_context (Union[ArticleContext, None]): The news articles as compact prompt context.
         generated_text (Union[str, None]): The generated text.
         generated_image_url (Union[str, None]): The URL of the generated image.
         generated_video_url (Union[str, None]): The URL of the generated video.
@@ -61,6 +82,7 @@ class AgentState(TypedDict):
     generate_video: bool
     generate_meme: bool
     news_articles: Union[NewsArticles, None]
+    article_context: Union[ArticleContext, None]
     generated_text: Union[str, None]
     generated_image_url: Union[str, None]
     generated_video_url: Union[str, None]
@@ -68,50 +90,45 @@ class AgentState(TypedDict):
     generated_meme_url: Union[str, None]
 
 
-def load_json_files_from_folder(folder_path: str) -> List[NewsArticle]:
-    articles = []
-    for filename in os.listdir(folder_path):
-        if filename.endswith(".json"):
-            file_path = os.path.join(folder_path, filename)
-            with open(file_path, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                article = NewsArticle(**data)
-                articles.append(article)
-    return articles
+def load_json_files_from_folder(folder_path: str) -> Sequence[CrawledNewsArticle]:
+    """
+    The articles of a folder of JSON files, as a lazy sequence backed by the
+    folder's ArticleIndex: only files changed since the last call are parsed.
+    They are the crawler's NewsArticles, like the articles web_crawler returns.
+    """
+    return shared_article_index(folder_path)
 
 
-def web_crawler(state: AgentState):
+async def web_crawler(state: AgentState):
     """"""
     user_prompt = state["user_prompt"]
 
-    query_encoder = QueryEncoder()
-    news_source = GoogleNewsSource()
-
-    summarizer: Summarizer = SummarizerUsingGroq()
-
-    topic = query_encoder.get_topic(state["user_prompt"])
+    topic = await query_encoder.aget_topic(state["user_prompt"])
 
-    news_source.fetch({"q": topic, "engine": "google_news", "gl": "us", "hl": "en"})
-    limit = os.getenv("MAX_NUMBER_OF_ARTICLES")
-    complete_news_articles = news_source.get_news_content(limit=5)
-
-    news_articles = []
-    for news_article in complete_news_articles:
-        short_text = summarizer.get_summary(str(news_article.content))
-        news_article.content = short_text
-        news_articles.append(news_article)
+    # Topics kept warm by the pre-crawler are answered from the article store
+    news_articles = await asyncio.to_thread(
+        news_repo.load_topic, topic, max_age=float(os.getenv("WARM_TOPIC_MAX_AGE", 900))
+    )
+    if news_articles:
+        logger.info("Using %d pre-crawled articles for '%s'", len(news_articles), topic)
+    else:
+        limit = int(os.getenv("MAX_NUMBER_OF_ARTICLES", 5))
+        news_articles = await acrawl_topic(topic, GoogleNewsSource(), summarizer, news_repo, limit=limit)
 
     # TODOD creates news articles
     # news_articles = load_json_files_from_folder("./data/work/wired/output")
     # news_articles = [NewsArticle(title="cooking class", date="today", content="this is a cooking class story", author="myself", source="whatever.com")]
-    return {"news_articles": news_articles}
+    # Serialized once here and shared by the generation nodes
+    return {"news_articles": news_articles, "article_context": ArticleContext(news_articles)}
 
 
-def text_generator(state: AgentState):
+async def text_generator(state: AgentState):
     """"""
     # TODOD creates posts
     """LangGraph node that will schedule tasks based on dependencies and team availability"""
-    news_articles = state["news_articles"]
+    news_articles = state["article_context"].render(
+        int(os.getenv("TEXT_CONTEXT_TOKENS", TEXT_CONTEXT_TOKENS)), name="text_generator"
+    )
     user_prompt = state["user_prompt"]
     content_style = state["content_style"]
     content_format = state["content_format"]
@@ -128,17 +145,18 @@ def text_generator(state: AgentState):
             1. The output should be a single social media post formatted in Markdown.
             2. It should be written in the style and tone requested.
             3. It should have the length matching the requested style.
-            4. Add references to the text extracted from the news articles field - 'source' in the text as an Markdown upper index at the end the corresponding sentence.
+            4. Add references to the text extracted from the news articles - the source in parentheses after the article title - in the text as an Markdown upper index at the end the corresponding sentence.
             5. Add all included references to the end of the post as a list of links using the matching indexing - appearance order in the text.
         **Given:**
-            1. News Articles: {news_articles}
+            1. News Articles (numbered, most relevant first):
+{news_articles}
             2. User Prompt: {user_prompt}
             3. Expected article format: {content_format}
             4. Expected article style: {content_style}
         """
     if state["generate_text"] == True:
         try:
-            generated_text: str = llm.invoke(prompt).content.strip()
+            generated_text: str = (await llm.ainvoke(prompt)).content.strip()
         except Exception as e:
             generated_text = "LLM model invokation failed - please holder text"
 
@@ -146,11 +164,13 @@ def text_generator(state: AgentState):
     return {"generated_text": "Text generation was not requested"}
 
 
-def image_generator(state: AgentState):
+async def image_generator(state: AgentState):
     """"""
     # TODOD creates posts
     """LangGraph node that will schedule tasks based on dependencies and team availability"""
-    news_articles = state["news_articles"]
+    news_articles = state["article_context"].render(
+        int(os.getenv("IMAGE_CONTEXT_TOKENS", IMAGE_CONTEXT_TOKENS)), name="image_generator"
+    )
     user_prompt = state["user_prompt"]
     prompt_for_instructing_image_generation = f"""
         You are a social media post creator.
@@ -165,17 +185,24 @@ def image_generator(state: AgentState):
     if state["generate_image"] == True:
 
         try:
-            prompt_for_image_generation: str = llm.invoke(
+            prompt_for_image_generation: str = (await llm.ainvoke(
                 prompt_for_instructing_image_generation
-            ).content
-            print(prompt_for_image_generation)
-
-            # Call the image generator API
-            lim.generate_image(prompt_for_image_generation)
-            if lim.image_generated:
-                print("image_was_generated")
-                return {"generated_image_url": lim.image_url}
+            )).content
+            logger.debug("Image prompt: %.200s", prompt_for_image_generation)
+
+            # Call the image generator API, several candidates if configured, the first good one wins
+            results = await image_client.agenerate_candidates(
+                prompt_for_image_generation,
+                n=int(os.getenv("IMAGE_CANDIDATES", 1)),
+                deadline=float(os.getenv("IMAGE_DEADLINE", 90)),
+                first_success=True,
+            )
+            image = next((result for result in results if result.ok), None)
+            if image is not None:
+                logger.info("Image generated in %.1fs", image.seconds)
+                return {"generated_image_url": image.url}
             else:
+                logger.warning("No image generated: %s", [result.error for result in results])
                 return {
                     "generated_image_url": "No image generated due to internal error"
                 }
@@ -219,16 +246,24 @@ def video_generator(state: AgentState):
     return {"prompt": prompt}
 
 
-def meme_selector(state: AgentState):
+async def meme_selector(state: AgentState):
     if state["generate_meme"] == False:
         return {"selected_meme_template": None}
 
     user_prompt = state["user_prompt"]
-    templates = fetch_templates()
+    catalog = default_meme_template_catalog()
+    # The templates whose names are closest to the prompt are offered to the LLM, more popular ones if none is close
+    templates = await catalog.ashortlist(user_prompt, k=int(os.getenv("MEME_SHORTLIST_SIZE", 10)))
+    if not templates:
+        logger.warning("No meme templates available")
+        return {"selected_meme_template": None}
+    template_list = "\n".join(
+        f"{template['id']} | {template['name']} | {template['box_count']}" for template in templates
+    )
     prompt = f"""
         Select the most appropriate meme template based on the provided user prompt: {user_prompt}
-        Using the given list of templates: {templates}
-        Each template is defined by a unique ID, name, URL, width, height, and box count.
+        Using the given list of templates, one per line as ID | name | box count:
+{template_list}
         Your task is to analyze the user prompt to identify relevant keywords and themes,
         then match those with the best-fitting template from the list.
 
@@ -236,19 +271,26 @@ def meme_selector(state: AgentState):
         1. **Analyze User Prompt**: Break down the user prompt to identify key themes and keywords.
         2. **Match Keywords with Templates**: Compare the identified keywords with the names of the templates to find the most relevant match.
         3. **Select Appropriate Template**: Choose the template that most closely aligns with the user's prompt.
-        4. **Format the Output**: Structure the output to include the template's unique ID, name, URL, width, height, and box count.
+        4. **Format the Output**: Return the ID of the selected template.
     """
-    structure_llm = llm.with_structured_output(MemeTemplate)
-    selected_meme_template: MemeTemplate = structure_llm.invoke(prompt)
-    return {"selected_meme_template": selected_meme_template}
+    structure_llm = llm.with_structured_output(MemeTemplateChoice)
+    choice: MemeTemplateChoice = await structure_llm.ainvoke(prompt)
+    # The template details come from the catalog, not from the LLM
+    template = catalog.get(choice.id)
+    if template is None:
+        logger.warning("Unknown meme template '%s' selected, using '%s'", choice.id, templates[0]["name"])
+        template = templates[0]
+    return {"selected_meme_template": MemeTemplate(**template)}
 
 
-def meme_generator(state: AgentState):
+async def meme_generator(state: AgentState):
     if state["generate_meme"] == False:
         return {"generated_meme_url": None}
 
     user_prompt = state["user_prompt"]
     meme_template = state["selected_meme_template"]
+    if meme_template is None:
+        return {"generated_meme_url": "No meme template available"}
     box_count = meme_template.box_count
     prompt = f"""
         You are an AI assistant. Given a user prompt and given meme template, select the
@@ -261,7 +303,7 @@ def meme_generator(state: AgentState):
 
     """
     structure_llm = llm.with_structured_output(MemeCaptions)
-    caption_response = structure_llm.invoke(prompt)
+    caption_response = await structure_llm.ainvoke(prompt)
 
     template_id = meme_template.id
     username = "mmaazkhanhere"
@@ -281,7 +323,7 @@ def meme_generator(state: AgentState):
     for i in range(box_count):
         payload[f"text{i}"] = texts[i]
 
-    response = requests.post(url, data=payload)
+    response = await default_async_http_client().post(url, data=payload)
 
     if response.status_code == 200:
         data = response.json()
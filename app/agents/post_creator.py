@@ -1,5 +1,10 @@
-from langgraph.graph import StateGraph, START, END
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Iterable, Tuple
 
+from app.agents.graph_registry import GraphRegistry
+from app.agents.post_creator_graph import POST_CREATOR_CONDITIONS, POST_CREATOR_DEPENDENCIES
 from app.agents.nodes import (
     web_crawler,
     text_generator,
@@ -9,38 +14,69 @@ from app.agents.nodes import (
     AgentState,
 )
 
+logger = logging.getLogger(__name__)
 
-def create_post_creator_agent():
-    # Define a new graph
-    workflow = StateGraph(AgentState)
-    # Define the states
-    workflow.add_node("web_crawler", web_crawler)
-    workflow.add_node("text_generator", text_generator)
-    workflow.add_node("image_generator", image_generator)
-    workflow.add_node("meme_generator", meme_generator)
-    workflow.add_node("meme_selector", meme_selector)
-    # Define the transitions
-    workflow.add_edge("web_crawler", "text_generator")
-    workflow.add_edge("web_crawler", "image_generator")
-    workflow.add_edge("web_crawler", "meme_selector")
-    workflow.add_edge("meme_selector", "meme_generator")
-    # Define the start and end states
-    workflow.add_edge(START, "web_crawler")
-    workflow.add_edge("text_generator", END)
-    workflow.add_edge("image_generator", END)
-    workflow.add_edge("meme_generator", END)
-    # Return the graph
-
-    graph = workflow.compile()
-
-    return graph
+# The nodes of the post creator, how they depend on each other is in post_creator_graph
+POST_CREATOR_NODES = {
+    "web_crawler": web_crawler,
+    "text_generator": text_generator,
+    "image_generator": image_generator,
+    "meme_selector": meme_selector,
+    "meme_generator": meme_generator,
+}
+# What create_post reports for outputs that were not requested
+SKIPPED_OUTPUTS = {
+    "generated_text": "Text generation was not requested",
+    "generated_image_url": "",
+    "selected_meme_template": None,
+    "generated_meme_url": None,
+}
+
+post_creator_graphs = GraphRegistry(
+    AgentState, POST_CREATOR_NODES, POST_CREATOR_DEPENDENCIES, POST_CREATOR_CONDITIONS
+)
+
+
+def create_post_creator_agent(node_names: Iterable[str] = None):
+    """The compiled post creator graph with the given nodes (all by default), compiled once per process."""
+    return post_creator_graphs.get(node_names)
+
+
+def summarize_value(value: Any, max_chars: int = 120, max_items: int = 5) -> Any:
+    """A JSON friendly, size bounded view of a state value for logging."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return value if len(value) <= max_chars else f"{value[:max_chars]}... ({len(value)} chars)"
+    if isinstance(value, (list, tuple)):
+        items = [summarize_value(item, max_chars, max_items) for item in value[:max_items]]
+        if len(value) > max_items:
+            items.append(f"... ({len(value)} items)")
+        return items
+    if isinstance(getattr(value, "title", None), str):
+        # News articles are logged by their title only
+        return summarize_value(value.title, max_chars, max_items)
+    if hasattr(value, "model_dump"):
+        value = value.model_dump()
+    if isinstance(value, dict):
+        return {key: summarize_value(item, max_chars, max_items) for key, item in value.items()}
+    return summarize_value(str(value), max_chars, max_items)
+
+
+def summarize_state(state: Dict[str, Any], max_chars: int = 120) -> str:
+    """One line JSON summary of a graph state, article contents and long texts cut short."""
+    return json.dumps({key: summarize_value(value, max_chars) for key, value in state.items()}, ensure_ascii=False)
 
 
 def create_post(agent, initial_input):
+    return asyncio.run(acreate_post(agent, initial_input))
 
-    final_state = agent.invoke(initial_input)
 
-    print(final_state)
+async def acreate_post(agent, initial_input):
+    """Run the post creator graph, its nodes are async and run on the caller's event loop."""
+    final_state = {**SKIPPED_OUTPUTS, **await agent.ainvoke(initial_input)}
+
+    logger.info("Post created: %s", summarize_state(final_state))
     return (
         final_state["generated_text"],
         final_state["generated_image_url"],
@@ -48,3 +84,52 @@ def create_post(agent, initial_input):
         final_state["selected_meme_template"],
         final_state["generated_meme_url"],
     )
+
+
+async def astream_post(agent, initial_input) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Run the post creator graph and yield (event, data) pairs as its nodes finish:
+
+        articles    the crawl is done, {"titles": [...]}
+        text_token  a token of the post text while text_generator writes it, {"token": ...}
+        text        the finished post text, {"text": ...}
+        image       {"url": ...}
+        meme        {"template": {...}, "url": ...}
+        done        the same outputs create_post returns, once everything finished
+
+    Text tokens come from the graph's messages stream, the other events from
+    the state updates of the nodes.
+    """
+    final_state = {**SKIPPED_OUTPUTS, **initial_input}
+    async for mode, chunk in agent.astream(initial_input, stream_mode=["updates", "messages"]):
+        if mode == "messages":
+            message, metadata = chunk
+            # Only the post text is streamed, the other LLM calls produce prompts and JSON
+            if metadata.get("langgraph_node") == "text_generator" and isinstance(message.content, str) and message.content:
+                yield "text_token", {"token": message.content}
+            continue
+
+        for node, update in chunk.items():
+            update = update or {}
+            final_state.update(update)
+            if node == "web_crawler":
+                yield "articles", {"titles": [article.title for article in update.get("news_articles") or []]}
+            elif node == "text_generator":
+                yield "text", {"text": update.get("generated_text")}
+            elif node == "image_generator":
+                yield "image", {"url": update.get("generated_image_url")}
+            elif node == "meme_generator":
+                template = final_state["selected_meme_template"]
+                yield "meme", {
+                    "template": template.model_dump() if template is not None else None,
+                    "url": update.get("generated_meme_url"),
+                }
+
+    logger.info("Post streamed: %s", summarize_state(final_state))
+    yield "done", {
+        "generated_text": final_state["generated_text"],
+        "image_url": final_state["generated_image_url"],
+        "video_url": "whatever2",
+        "meme_template": final_state["selected_meme_template"],
+        "meme_url": final_state["generated_meme_url"],
+    }
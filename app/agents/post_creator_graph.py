@@ -0,0 +1,15 @@
+# The shape of the post creator graph: the nodes whose output a node needs and
+# the request flags it runs for. A meme only needs the user prompt, so it does
+# not wait for the crawler, and the crawler only runs for text or images. Kept
+# apart from the nodes, so it can be imported without creating the LLM clients.
+POST_CREATOR_DEPENDENCIES = {
+    "text_generator": ["web_crawler"],
+    "image_generator": ["web_crawler"],
+    "meme_generator": ["meme_selector"],
+}
+POST_CREATOR_CONDITIONS = {
+    "web_crawler": lambda state: state["generate_text"] or state["generate_image"],
+    "text_generator": lambda state: state["generate_text"],
+    "image_generator": lambda state: state["generate_image"],
+    "meme_selector": lambda state: state["generate_meme"],
+}
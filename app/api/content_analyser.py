@@ -21,7 +21,7 @@ class ContentAnalysisResponse(BaseModel):
 
 
 @router.post("/analyze_content/", response_model=ContentAnalysisResponse)
-def analyze_content(request: ContentAnalysisRequest):
+async def analyze_content(request: ContentAnalysisRequest):
     """
     Analyze the given text for SEO, readability, engagement scores, and identified keywords.
     """
@@ -72,6 +72,6 @@ def analyze_content(request: ContentAnalysisRequest):
     Input Text: {request.text}
     """
     structured_output = llm.with_structured_output(ContentAnalysisResponse)
-    analysis_result: ContentAnalysisResponse = structured_output.invoke(prompt)
+    analysis_result: ContentAnalysisResponse = await structured_output.ainvoke(prompt)
 
     return analysis_result
@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 from app.models.model_provider import ModelWrapper
 
-import requests
+from app.web_crawler.http_clients import default_async_http_client
 
 from app.schemas import response
 from app.schemas import request
@@ -17,7 +17,7 @@ llm = model_wrapper.model
 
 
 @router.post("/finetune_meme/", response_model=response.Meme)
-def finetune_meme(request: request.FineTuneMemeRequest):
+async def finetune_meme(request: request.FineTuneMemeRequest):
     user_prompt = request.prompt
     meme_template = request.meme.meme_template
     box_count = meme_template.box_count
@@ -32,7 +32,7 @@ def finetune_meme(request: request.FineTuneMemeRequest):
 
     """
     structure_llm = llm.with_structured_output(MemeCaptions)
-    caption_response = structure_llm.invoke(prompt)
+    caption_response = await structure_llm.ainvoke(prompt)
 
     template_id = meme_template.id
     username = "mmaazkhanhere"
@@ -52,7 +52,7 @@ def finetune_meme(request: request.FineTuneMemeRequest):
     for i in range(box_count):
         payload[f"text{i}"] = texts[i]
 
-    response = requests.post(url, data=payload)
+    response = await default_async_http_client().post(url, data=payload)
 
     if response.status_code == 200:
         data = response.json()
@@ -12,7 +12,7 @@ llm = model_wrapper.model
 
 
 @router.post("/finetune_post/", response_model=response.FineTunedText)
-def finetune_text(request: request.FineTuneTextRequest):
+async def finetune_text(request: request.FineTuneTextRequest):
 
     prompt = f"""
     You are an advanced language model. Your task is to update the previous LLM response to better address the new prompt. Follow these steps:
@@ -30,6 +30,6 @@ def finetune_text(request: request.FineTuneTextRequest):
 
     Updated Response:
     """
-    finetuned_text = llm.invoke(prompt).content
+    finetuned_text = (await llm.ainvoke(prompt)).content
 
     return response.FineTunedText(generated_text=finetuned_text)
@@ -1,13 +1,15 @@
 import os
 import json
+import logging
 from typing import List
 
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 
 
 from app.schemas import response
 from app.schemas import request
-from app.agents.post_creator import create_post_creator_agent, create_post
+from app.agents.post_creator import create_post_creator_agent, acreate_post, astream_post
 from app.schemas.response import Meme
 
 from dotenv import load_dotenv
@@ -15,11 +17,25 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv(override=True)
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
+def initial_input_from_request(initial_request: request.InitialRequest) -> dict:
+    return {
+        "user_prompt": initial_request.prompt,
+        "content_format": initial_request.format,
+        "content_style": initial_request.style,
+        "generate_text": initial_request.generate_text,
+        "generate_image": initial_request.generate_image,
+        "generate_video": initial_request.generate_video,
+        "generate_meme": initial_request.generate_meme,
+    }
+
+
 @router.post("/generate_post/", response_model=response.InitialResponse)
-def generate_post(
+async def generate_post(
     initial_request: request.InitialRequest,
     # user_id: str,
     # session_id: str,
@@ -30,17 +46,10 @@ def generate_post(
     # generate_meme: bool
 ):
 
+    # Compiled once per process and shared by all requests
     agent = create_post_creator_agent()
-    initial_input = {
-        "user_prompt": initial_request.prompt,
-        "content_format": initial_request.format,
-        "content_style": initial_request.style,
-        "generate_text": initial_request.generate_text,
-        "generate_image": initial_request.generate_image,
-        "generate_video": initial_request.generate_video,
-        "generate_meme": initial_request.generate_meme,
-    }
-    generated_text, image_url, video_url, meme_template, meme_url = create_post(
+    initial_input = initial_input_from_request(initial_request)
+    generated_text, image_url, video_url, meme_template, meme_url = await acreate_post(
         agent=agent, initial_input=initial_input
     )
 
@@ -50,3 +59,41 @@ def generate_post(
         video_url=video_url,
         meme=Meme(meme_template=meme_template, meme_url=meme_url),
     )
+
+
+def server_sent_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/generate_post/stream/")
+async def generate_post_stream(initial_request: request.InitialRequest):
+    """
+    Like generate_post, but answers with server-sent events as the parts of the
+    post are ready: `articles` (titles of the crawled articles), `text_token`
+    (while the text is written), `text`, `image` and `meme`, and finally `done`
+    with the InitialResponse. A failure ends the stream with an `error` event.
+    """
+    agent = create_post_creator_agent()
+    initial_input = initial_input_from_request(initial_request)
+
+    async def events():
+        try:
+            async for event, data in astream_post(agent, initial_input):
+                if event == "done":
+                    data = response.InitialResponse(
+                        generated_text=data["generated_text"],
+                        image_url=data["image_url"],
+                        video_url=data["video_url"],
+                        meme=Meme(meme_template=data["meme_template"], meme_url=data["meme_url"]),
+                    ).model_dump()
+                yield server_sent_event(event, data)
+        except Exception:
+            logger.exception("Streaming the post failed")
+            yield server_sent_event("error", {"detail": "Post generation failed"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,2 +1,3 @@
-from app.helper_functions.fetch_templates import fetch_templates
+from app.helper_functions.fetch_templates import fetch_templates, afetch_templates
 from app.helper_functions.ensure_markdown_format import ensure_markdown_format
+from app.helper_functions.count_tokens import count_tokens
@@ -0,0 +1,19 @@
+import re
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    # tiktoken is optional (and needs to download its vocabulary once)
+    _encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the LLM tokens of a text. Uses tiktoken's cl100k_base encoding if it is
+    available and falls back to a word/punctuation based estimate otherwise.
+    """
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(re.findall(r"\w+|[^\w\s]", text))
@@ -1,15 +1,27 @@
 import requests
 
-def fetch_templates():
-    url = "https://api.imgflip.com/get_memes"
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()
+from app.web_crawler.http_clients import default_async_http_client
+
+TEMPLATES_URL = "https://api.imgflip.com/get_memes"
+
+
+def parse_templates(status_code: int, data: dict):
+    if status_code == 200:
         if data["success"]:
             return data["data"]["memes"]
         else:
             print("Failed to fetch meme templates.")
             return []
     else:
-        print(f"HTTP Error: {response.status_code}")
+        print(f"HTTP Error: {status_code}")
         return []
+
+
+def fetch_templates():
+    response = requests.get(TEMPLATES_URL)
+    return parse_templates(response.status_code, response.json() if response.status_code == 200 else {})
+
+
+async def afetch_templates():
+    response = await default_async_http_client().get(TEMPLATES_URL)
+    return parse_templates(response.status_code, response.json() if response.status_code == 200 else {})
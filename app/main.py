@@ -1,3 +1,7 @@
+import logging
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -7,7 +11,33 @@ from app.api.finetune_text import router as finetunetext_router
 from app.api.finetune_meme import router as finetunememe_router
 from app.api.content_analyser import router as content_analyser_router
 
-app = FastAPI()
+from app.agents.nodes import aclose_crawler_clients
+from app.agents.post_creator import create_post_creator_agent
+from app.web_crawler.http_clients import aclose_default_async_http_client, default_async_http_client
+from app.web_crawler.scheduler import PreCrawler
+
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Compile the post creator graph before the first request needs it
+    create_post_creator_agent()
+    # Connections to imgflip and the image APIs are shared by all requests
+    default_async_http_client()
+    # Optionally keep the configured topics warm from within the API process
+    pre_crawler = None
+    if os.getenv("PRECRAWL_IN_PROCESS", "false").lower() == "true":
+        pre_crawler = PreCrawler.from_env()
+        pre_crawler.start()
+    yield
+    if pre_crawler is not None:
+        pre_crawler.stop(timeout=5)
+    await aclose_crawler_clients()
+    await aclose_default_async_http_client()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 app.add_middleware(
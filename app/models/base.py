@@ -1,24 +1,75 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
+from typing import List, Optional
+
+import httpx
 from langchain_community.utilities.dalle_image_generator import DallEAPIWrapper
-import requests
+from pydantic import BaseModel, Field
+
+from app.web_crawler.http_clients import default_async_http_client, default_http_client
+
+
+class ImageResult(BaseModel):
+    url: Optional[str] = Field(default=None, description="URL of the generated image, None if generation failed")
+    error: Optional[str] = Field(default=None, description="Why generation failed")
+    seconds: float = Field(default=0.0, description="Duration of the generation")
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.url is not None
 
 
 class ImageGeneratorAPI(ABC):
-    def __init__(self, api_key: str, url: str):
+    """
+    Client of an image generation API. It keeps no state between calls, every
+    call returns its own ImageResult, so one client is shared by all requests.
+    Failures are reported in the result instead of being raised.
+    """
+
+    def __init__(self, api_key: str, url: str, timeout: float = 120.0):
         self.api_key = api_key
         self.url = url
-        self.image_url: str = None
-        self.image_generated: bool = None
+        self.timeout = timeout
 
     @abstractmethod
-    def generate_image(self, prompt: str) -> bytes:
+    def generate_image(self, prompt: str) -> ImageResult:
         """Generate an image based on the given prompt."""
         pass
 
-    def get_generated_images(self) -> str:
-        """Helper method to make an API call."""
-        if self.image_generated:
-            return self.image_url
+    @abstractmethod
+    async def agenerate_image(self, prompt: str) -> ImageResult:
+        """generate_image without blocking the event loop."""
+        pass
+
+    async def agenerate_candidates(
+        self, prompt: str, n: int = 1, deadline: Optional[float] = None, first_success: bool = False
+    ) -> List[ImageResult]:
+        """
+        Generate n images for the same prompt concurrently. Generations still
+        running after `deadline` seconds are cancelled and reported as failed.
+        With `first_success`, the other generations are cancelled as soon as
+        one image is there.
+
+        :return: the results in the order they finished
+        """
+        tasks = [asyncio.create_task(self.agenerate_image(prompt)) for _ in range(n)]
+        results = []
+        try:
+            for finished in asyncio.as_completed(tasks, timeout=deadline):
+                results.append(await finished)
+                if first_success and results[-1].ok:
+                    break
+        except asyncio.TimeoutError:
+            results += [
+                ImageResult(error=f"No image after the deadline of {deadline}s", seconds=deadline)
+                for _ in range(n - len(results))
+            ]
+        finally:
+            for task in tasks:
+                task.cancel()
+        return results
+
 
 class LangChainDallEImageGenerator(ImageGeneratorAPI):
     """
@@ -28,71 +79,84 @@ class LangChainDallEImageGenerator(ImageGeneratorAPI):
     def __init__(self, api_key: str):
         """
         Initialize the LangChain DALL-E Image Generator.
-        
+
         Args:
             api_key (str): OpenAI API key for authentication.
         """
         super().__init__(api_key, url=None)  # URL is managed by LangChain's DALL-E Wrapper
         self.dalle = DallEAPIWrapper(api_key=api_key)
 
-    def generate_image(self, prompt: str, size: str = "1024x1024", n: int = 1) -> bytes:
+    def generate_image(self, prompt: str) -> ImageResult:
         """
         Generate an image using the provided prompt.
-        
+
         Args:
             prompt (str): The text prompt to generate an image.
-            size (str): The size of the generated image (default: "1024x1024").
-            n (int): The number of images to generate (default: 1).
 
         Returns:
-            bytes: Binary content of the generated image.
+            ImageResult: The URL of the generated image or the error.
         """
+        start = time.perf_counter()
         try:
-            response = self.dalle.run(prompt)
-            if response:
-                self.image_generated = True
-                self.image_url = response
-            else:
-                self.image_generated = False
-                self.image_url = None
-
+            image_url = self.dalle.run(prompt)
         except Exception as e:
-            self.image_generated = False
-            self.image_url = None
             print(f"Error generating image: {e}")
+            return ImageResult(error=f"{type(e).__name__}: {e}", seconds=time.perf_counter() - start)
+        if not image_url:
+            return ImageResult(error="No image returned", seconds=time.perf_counter() - start)
+        return ImageResult(url=image_url, seconds=time.perf_counter() - start)
 
-    def get_generated_images(self) -> str:
-        """
-        Retrieve the URL of the last generated image.
-
-        Returns:
-            str: URL of the generated image or None if no image was generated.
-        """
-        return super().get_generated_images()
-
+    async def agenerate_image(self, prompt: str) -> ImageResult:
+        # The wrapper is blocking, its OpenAI client pools the connections
+        return await asyncio.to_thread(self.generate_image, prompt)
 
 
 # Azure Dall-e-3 subclass for a specific image generation API
 class AzureDallE3ImageGenerator(ImageGeneratorAPI):
-    def __init__(self, api_key: str, url: str):
-        super().__init__(api_key, url)
-
-    def generate_image(self, prompt: str) -> None:
-
-        headers = {"Content-Type": "application/json", "api-key": self.api_key}
+    """
+    Azure DALL-E 3 through its REST API. Requests go through the process wide
+    httpx clients, so connections to the deployment are reused across calls.
+    """
 
-        body = {
-            "prompt": prompt,
-            "size": "1024x1024",
-            "n": 1,
-            "quality": "standard",
-            "style": "vivid",
-        }
+    def __init__(self, api_key: str, url: str, timeout: float = 120.0):
+        super().__init__(api_key, url, timeout)
+
+    def __request(self, prompt: str) -> dict:
+        return dict(
+            headers={"Content-Type": "application/json", "api-key": self.api_key},
+            json={
+                "prompt": prompt,
+                "size": "1024x1024",
+                "n": 1,
+                "quality": "standard",
+                "style": "vivid",
+            },
+            timeout=self.timeout,
+        )
+
+    @staticmethod
+    def __result(response: httpx.Response, start: float) -> ImageResult:
+        seconds = time.perf_counter() - start
+        if response.status_code != 200:
+            return ImageResult(error=f"HTTP {response.status_code}: {response.text[:200]}", seconds=seconds)
+        try:
+            url = response.json()["data"][0]["url"]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            return ImageResult(error=f"Unexpected response {type(e).__name__}: {response.text[:200]}", seconds=seconds)
+        return ImageResult(url=url, seconds=seconds)
 
-        response = requests.post(self.url, headers=headers, json=body)
+    def generate_image(self, prompt: str) -> ImageResult:
+        start = time.perf_counter()
+        try:
+            response = default_http_client().post(self.url, **self.__request(prompt))
+        except httpx.HTTPError as e:
+            return ImageResult(error=f"{type(e).__name__}: {e}", seconds=time.perf_counter() - start)
+        return self.__result(response, start)
 
-        if response.status_code == 200:
-            self.image_generated = True
-            self.image_url = response.json()["data"][0]["url"]
-        else:
-            self.image_generated = False
+    async def agenerate_image(self, prompt: str) -> ImageResult:
+        start = time.perf_counter()
+        try:
+            response = await default_async_http_client().post(self.url, **self.__request(prompt))
+        except httpx.HTTPError as e:
+            return ImageResult(error=f"{type(e).__name__}: {e}", seconds=time.perf_counter() - start)
+        return self.__result(response, start)
@@ -0,0 +1,243 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, the index is then only guarded within the process
+    fcntl = None
+
+from app.web_crawler.data_model import NewsArticle
+
+
+def default_article_index_dir() -> str:
+    """Directory of the article indexes, ARTICLE_INDEX_DIR (default work/cache/article_index)."""
+    return os.getenv("ARTICLE_INDEX_DIR", "work/cache/article_index")
+
+
+def parse_article_files(paths: List[str]) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Validate article JSON files. Runs in worker processes for large folders.
+
+    :return: (path, compact JSON of the article or None, error or None) per file
+    """
+    results = []
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                news_article = NewsArticle.model_validate_json(file.read())
+            results.append((path, news_article.model_dump_json(), None))
+        except (OSError, ValueError) as e:
+            results.append((path, None, f"{type(e).__name__}: {e}"))
+    return results
+
+
+class ArticleIndex(Sequence[NewsArticle]):
+    """
+    Index over a folder of article JSON files (one NewsArticle per file, as
+    written by ingest_metadata_file).
+
+    The validated articles are consolidated into one data file next to an index
+    of (mtime, size, offset, length) per file. Both are kept in `cache_dir`,
+    named after the absolute path of the folder, so the folder itself is only
+    read. Refreshes hold a file lock, so processes sharing the cache take turns
+    and all files are replaced atomically. Opening
+    the index only stats the folder: files whose mtime or size changed are
+    parsed again (in a process pool if there are many), removed files are
+    dropped. Articles are read through a memory map and parsed on access, so
+    the index is a lazy sequence of NewsArticles ordered by file name.
+    """
+
+    def __init__(
+        self,
+        folder_path: str,
+        parallel_threshold: int = 2000,
+        workers: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+    ):
+        self.__folder = folder_path
+        cache_dir = cache_dir or default_article_index_dir()
+        os.makedirs(cache_dir, exist_ok=True)
+        key = hashlib.sha256(os.path.realpath(folder_path).encode("utf-8")).hexdigest()[:32]
+        self.__data_path = os.path.join(cache_dir, f"{key}.jsonl")
+        self.__index_path = os.path.join(cache_dir, f"{key}.index.json")
+        self.__lock_path = os.path.join(cache_dir, f"{key}.lock")
+        self.__parallel_threshold = parallel_threshold
+        self.__workers = workers
+        self.__lock = threading.Lock()
+        # file name -> [mtime_ns, size, offset, length]
+        self.__entries: Dict[str, List[int]] = {}
+        self.__names: List[str] = []
+        self.__map: Optional[mmap.mmap] = None
+        self.refresh()
+
+    def __read_index(self) -> Dict[str, List[int]]:
+        if not (os.path.exists(self.__index_path) and os.path.exists(self.__data_path)):
+            return {}
+        try:
+            with open(self.__index_path, "r", encoding="utf-8") as file:
+                index = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if index.get("data_size", -1) > os.path.getsize(self.__data_path):
+            # The data file was truncated behind our back, start over
+            return {}
+        return index["entries"]
+
+    @contextmanager
+    def __locked(self) -> Iterator[None]:
+        """Exclusive access to the cache files, across threads and processes."""
+        with self.__lock, open(self.__lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def __tmp_path(path: str) -> str:
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def __write_index(self, entries: Dict[str, List[int]]) -> None:
+        tmp_path = self.__tmp_path(self.__index_path)
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"data_size": os.path.getsize(self.__data_path), "entries": entries}, file)
+        os.replace(tmp_path, self.__index_path)
+
+    def __parse(self, paths: List[str]) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        if len(paths) < self.__parallel_threshold:
+            return parse_article_files(paths)
+        chunk_size = max(len(paths) // ((self.__workers or os.cpu_count() or 1) * 4), 100)
+        chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+        with ProcessPoolExecutor(max_workers=self.__workers) as executor:
+            return [result for results in executor.map(parse_article_files, chunks) for result in results]
+
+    def refresh(self) -> "ArticleIndex":
+        """Bring the index up to date with the folder, parsing only new and changed files."""
+        with self.__locked():
+            entries = self.__read_index()
+            current = {}
+            changed = []
+            with os.scandir(self.__folder) as files:
+                for entry in files:
+                    if not entry.name.endswith(".json") or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    current[entry.name] = (stat.st_mtime_ns, stat.st_size)
+                    known = entries.get(entry.name)
+                    if known is None or (known[0], known[1]) != current[entry.name]:
+                        changed.append(entry.name)
+
+            removed = [name for name in entries if name not in current]
+            for name in removed:
+                del entries[name]
+
+            if changed:
+                with open(self.__data_path, "ab") as data_file:
+                    offset = data_file.tell()
+                    for path, article_json, error in self.__parse([os.path.join(self.__folder, n) for n in changed]):
+                        name = os.path.basename(path)
+                        if article_json is None:
+                            print(f"Skipping '{path}': {error}")
+                            entries.pop(name, None)
+                            continue
+                        data = article_json.encode("utf-8") + b"\n"
+                        data_file.write(data)
+                        entries[name] = [*current[name], offset, len(data) - 1]
+                        offset += len(data)
+
+            if changed or removed or not os.path.exists(self.__index_path):
+                if not os.path.exists(self.__data_path):
+                    open(self.__data_path, "ab").close()
+                entries = self.__compact(entries)
+                self.__write_index(entries)
+                print(f"Article index of '{self.__folder}': {len(changed)} files parsed, {len(removed)} removed")
+
+            self.__entries = entries
+            self.__names = sorted(entries)
+            self.__remap()
+        return self
+
+    def __compact(self, entries: Dict[str, List[int]]) -> Dict[str, List[int]]:
+        """Rewrite the data file once more than half of it is outdated articles."""
+        live = sum(entry[3] + 1 for entry in entries.values())
+        if live * 2 >= os.path.getsize(self.__data_path):
+            return entries
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+        tmp_path = self.__tmp_path(self.__data_path)
+        compacted = {}
+        with open(self.__data_path, "rb") as source, open(tmp_path, "wb") as target:
+            for name, (mtime, size, offset, length) in entries.items():
+                source.seek(offset)
+                compacted[name] = [mtime, size, target.tell(), length]
+                target.write(source.read(length + 1))
+        os.replace(tmp_path, self.__data_path)
+        return compacted
+
+    def __remap(self) -> None:
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+        if self.__entries:
+            with open(self.__data_path, "rb") as data_file:
+                self.__map = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __load(self, name: str) -> NewsArticle:
+        _, _, offset, length = self.__entries[name]
+        # Validated when indexed
+        return NewsArticle.model_construct(**json.loads(self.__map[offset:offset + length]))
+
+    def __len__(self) -> int:
+        return len(self.__names)
+
+    @overload
+    def __getitem__(self, i: int) -> NewsArticle: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> List[NewsArticle]: ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[NewsArticle, List[NewsArticle]]:
+        if isinstance(i, slice):
+            return [self.__load(name) for name in self.__names[i]]
+        return self.__load(self.__names[i])
+
+    def __iter__(self) -> Iterator[NewsArticle]:
+        for name in self.__names:
+            yield self.__load(name)
+
+    def get(self, filename: str) -> Optional[NewsArticle]:
+        return self.__load(filename) if filename in self.__entries else None
+
+    def close(self) -> None:
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+
+
+_shared_indexes: Dict[str, ArticleIndex] = {}
+_shared_indexes_lock = threading.Lock()
+
+
+def shared_article_index(folder_path: str) -> ArticleIndex:
+    """
+    Process wide ArticleIndex of a folder, created on first use and refreshed
+    on every later call. A refresh maps the data file again, so finish reading
+    the articles before asking for the index once more.
+    """
+    key = os.path.realpath(folder_path)
+    with _shared_indexes_lock:
+        index = _shared_indexes.get(key)
+        if index is None:
+            _shared_indexes[key] = ArticleIndex(folder_path)
+            return _shared_indexes[key]
+    return index.refresh()
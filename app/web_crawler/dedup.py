@@ -0,0 +1,189 @@
+import os
+import re
+import zlib
+from typing import List, Set, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from app.web_crawler.data_model import NewsArticle
+
+MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+
+class DedupReport(BaseModel):
+    input_count: int = Field(description="Number of articles before deduplication")
+    kept_count: int = Field(description="Number of articles after deduplication")
+    duplicate_groups: List[List[str]] = Field(description="Links of the articles collapsed together, kept link first")
+
+    @property
+    def dedup_rate(self) -> float:
+        if self.input_count == 0:
+            return 0.0
+        return 1 - self.kept_count / self.input_count
+
+    def __str__(self) -> str:
+        return f"kept {self.kept_count}/{self.input_count} articles (dedup rate {self.dedup_rate:.0%})"
+
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles. All permutations are applied to all
+    shingle hashes of a text at once with NumPy, and the pairwise similarities
+    of a set of signatures are computed in one vectorized comparison.
+    """
+
+    def __init__(self, num_permutations: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.__shingle_size = shingle_size
+        generator = np.random.default_rng(seed)
+        self.__a = generator.integers(1, int(MERSENNE_PRIME), size=(num_permutations, 1), dtype=np.uint64)
+        self.__b = generator.integers(0, int(MERSENNE_PRIME), size=(num_permutations, 1), dtype=np.uint64)
+
+    def shingle_hashes(self, text: str) -> np.ndarray:
+        words = re.findall(r"\w+", text.lower())
+        size = min(self.__shingle_size, len(words)) or 1
+        shingles = {" ".join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))}
+        return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = self.shingle_hashes(text)
+        # (a * h + b) mod p for every permutation and shingle, h < 2^32 and a < 2^31 so no overflow
+        permuted = (self.__a * hashes[np.newaxis, :] + self.__b) % MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        return np.stack([self.signature(text) for text in texts]) if texts else np.empty((0, len(self.__a)), dtype=np.uint64)
+
+    @staticmethod
+    def similarities(signatures: np.ndarray) -> np.ndarray:
+        """Estimated Jaccard similarity of every pair of signatures."""
+        return (signatures[:, np.newaxis, :] == signatures[np.newaxis, :, :]).mean(axis=2)
+
+
+def has_words(text: str) -> bool:
+    return re.search(r"\w", text) is not None
+
+
+def deduplicate_articles(
+    news_articles: List[NewsArticle],
+    threshold: float = None,
+    min_hasher: MinHasher = None,
+) -> Tuple[List[NewsArticle], DedupReport]:
+    """
+    Collapse articles whose content is a near duplicate of another (e.g. the same
+    wire story syndicated by several sites). Of every group of duplicates the
+    article with the most content is kept, at the position of the group's first
+    article, so the search ranking is preserved. Articles without text are
+    never duplicates.
+
+    :news_articles: Articles with the extracted page text as content
+    :threshold: Estimated Jaccard similarity above which two articles are duplicates,
+        defaults to DEDUP_THRESHOLD or 0.7
+
+    :return: Deduplicated articles and a report of what was collapsed
+    """
+    if threshold is None:
+        threshold = float(os.getenv("DEDUP_THRESHOLD", 0.7))
+    min_hasher = min_hasher or MinHasher()
+
+    similar = MinHasher.similarities(min_hasher.signatures([a.content for a in news_articles])) >= threshold
+    # Texts without words all have the same signature, they are not duplicates of each other
+    has_text = np.array([has_words(a.content) for a in news_articles], dtype=bool)
+    similar &= has_text[:, np.newaxis] & has_text[np.newaxis, :]
+
+    # Union-find over all similar pairs
+    parents = list(range(len(news_articles)))
+
+    def find(i: int) -> int:
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    for i, j in zip(*np.nonzero(np.triu(similar, k=1))):
+        root_i, root_j = find(int(i)), find(int(j))
+        if root_i != root_j:
+            parents[max(root_i, root_j)] = min(root_i, root_j)
+
+    groups = {}
+    for i in range(len(news_articles)):
+        groups.setdefault(find(i), []).append(i)
+
+    kept = []
+    duplicate_groups = []
+    for root in sorted(groups):
+        members = groups[root]
+        best = max(members, key=lambda i: (len(news_articles[i].content), -i))
+        kept.append(news_articles[best])
+        if len(members) > 1:
+            duplicate_groups.append(
+                [news_articles[best].source] + [news_articles[i].source for i in members if i != best]
+            )
+
+    return kept, DedupReport(
+        input_count=len(news_articles),
+        kept_count=len(kept),
+        duplicate_groups=duplicate_groups,
+    )
+
+
+class StreamingDeduplicator:
+    """
+    Incremental variant of deduplicate_articles for articles arriving one at a
+    time: an article is a duplicate if it is similar to one kept before. As in
+    deduplicate_articles the article with the most content is the source kept
+    of a group, so a longer duplicate takes the place of the kept article (its
+    fields are copied into the kept object) until the kept article is released,
+    i.e. handed on to the summarizer. Articles without text are never duplicates.
+    `report` summarizes what was collapsed so far like deduplicate_articles does.
+    """
+
+    def __init__(self, threshold: float = None, min_hasher: MinHasher = None):
+        if threshold is None:
+            threshold = float(os.getenv("DEDUP_THRESHOLD", 0.7))
+        self.__threshold = threshold
+        self.__min_hasher = min_hasher or MinHasher()
+        self.__signatures: List[np.ndarray] = []
+        self.__kept: List[NewsArticle] = []
+        self.__released: Set[int] = set()
+        # Links of the articles collapsed into every kept article, kept link first
+        self.__groups: List[List[str]] = []
+        self.__input_count = 0
+        # (kept link, duplicate link) of every duplicate
+        self.duplicates: List[Tuple[str, str]] = []
+
+    def is_duplicate(self, news_article: NewsArticle) -> bool:
+        self.__input_count += 1
+        if not has_words(news_article.content):
+            return False
+        signature = self.__min_hasher.signature(news_article.content)
+        if self.__signatures:
+            similarities = (np.stack(self.__signatures) == signature).mean(axis=1)
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.__threshold:
+                kept = self.__kept[best]
+                if id(kept) not in self.__released and len(news_article.content) > len(kept.content):
+                    self.duplicates.append((news_article.source, kept.source))
+                    self.__groups[best].insert(0, news_article.source)
+                    for field in NewsArticle.model_fields:
+                        setattr(kept, field, getattr(news_article, field))
+                    self.__signatures[best] = signature
+                else:
+                    self.duplicates.append((kept.source, news_article.source))
+                    self.__groups[best].append(news_article.source)
+                return True
+        self.__signatures.append(signature)
+        self.__kept.append(news_article)
+        self.__groups.append([news_article.source])
+        return False
+
+    def release(self, news_article: NewsArticle) -> None:
+        """The article is used from now on and must not be replaced anymore."""
+        self.__released.add(id(news_article))
+
+    def report(self) -> DedupReport:
+        return DedupReport(
+            input_count=self.__input_count,
+            kept_count=self.__input_count - len(self.duplicates),
+            duplicate_groups=[group for group in self.__groups if len(group) > 1],
+        )
@@ -0,0 +1,224 @@
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+
+# Elements whose content is never part of the article
+SKIPPED_TAGS = {
+    "head", "script", "style", "noscript", "template", "svg", "iframe", "object", "canvas",
+    "nav", "header", "footer", "aside", "form", "button", "select", "textarea", "menu",
+}
+# Elements that start a new text block
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "li", "ul", "ol", "dl", "dt", "dd",
+    "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "figcaption", "table",
+    "tr", "td", "th", "br", "hr", "body",
+}
+VOID_TAGS = {"br", "hr", "img", "meta", "link", "input", "source", "wbr", "area", "base", "col", "embed", "param", "track"}
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+BOILERPLATE_HINTS = re.compile(
+    r"nav|menu|footer|header|cookie|consent|banner|related|recirc|share|social|"
+    r"subscribe|newsletter|comment|sidebar|promo|advert|sponsor|breadcrumb|popup|modal",
+    re.IGNORECASE,
+)
+CONTENT_HINTS = re.compile(r"article|content|story|body|post|paywall|entry|text", re.IGNORECASE)
+
+
+class TextBlock:
+    def __init__(self, tag: str, hint: int):
+        self.tag = tag
+        self.hint = hint
+        self.parts: List[str] = []
+        self.link_chars = 0
+
+    @property
+    def text(self) -> str:
+        return " ".join("".join(self.parts).split())
+
+    @property
+    def word_count(self) -> int:
+        return len(self.text.split())
+
+    @property
+    def link_density(self) -> float:
+        length = sum(len(part.strip()) for part in self.parts)
+        return self.link_chars / length if length else 1.0
+
+
+class BlockParser(HTMLParser):
+    """
+    Splits an html document into text blocks. Every block records how much of
+    its text is link text and whether its ancestors' class/id attributes hint
+    at boilerplate (-1) or content (+1). Boilerplate elements (scripts, menus,
+    headers, forms, ...) are dropped entirely.
+
+    The parser can be fed incrementally, character references are decoded so
+    the text is proper Unicode.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: List[TextBlock] = []
+        self.__stack: List[tuple] = []
+        self.__skip_depth = 0
+        self.__link_depth = 0
+        self.__current: Optional[TextBlock] = None
+
+    def __hint(self) -> int:
+        for _, hint in reversed(self.__stack):
+            if hint:
+                return hint
+        return 0
+
+    def __new_block(self, tag: str) -> None:
+        self.__current = TextBlock(tag, self.__hint())
+        self.blocks.append(self.__current)
+
+    def handle_starttag(self, tag, attrs):
+        if self.__skip_depth:
+            if tag in SKIPPED_TAGS and tag not in VOID_TAGS:
+                self.__skip_depth += 1
+            return
+        if tag in SKIPPED_TAGS:
+            self.__skip_depth = 1
+            return
+        if tag in VOID_TAGS:
+            if tag in BLOCK_TAGS:
+                self.__new_block(self.__stack[-1][0] if self.__stack else tag)
+            return
+
+        attributes = " ".join(value for name, value in attrs if name in ("class", "id", "role") and value)
+        hint = 0
+        if attributes:
+            if BOILERPLATE_HINTS.search(attributes):
+                hint = -1
+            elif CONTENT_HINTS.search(attributes):
+                hint = 1
+        self.__stack.append((tag, hint))
+        if tag == "a":
+            self.__link_depth += 1
+        if tag in BLOCK_TAGS:
+            self.__new_block(tag)
+
+    def handle_endtag(self, tag):
+        if self.__skip_depth:
+            if tag in SKIPPED_TAGS:
+                self.__skip_depth -= 1
+            return
+        if tag in VOID_TAGS or not any(open_tag == tag for open_tag, _ in self.__stack):
+            return
+        while self.__stack:
+            open_tag, _ = self.__stack.pop()
+            if open_tag == "a":
+                self.__link_depth -= 1
+            if open_tag == tag:
+                break
+        if tag in BLOCK_TAGS:
+            self.__new_block(self.__stack[-1][0] if self.__stack else tag)
+
+    def handle_data(self, data):
+        if self.__skip_depth:
+            return
+        if self.__current is None:
+            self.__new_block("body")
+        self.__current.parts.append(data)
+        if self.__link_depth:
+            self.__current.link_chars += len(data.strip())
+
+
+def classify_blocks(
+    blocks: List[TextBlock],
+    min_words: int = 10,
+    max_link_density: float = 0.33,
+    max_gap: int = 2,
+    min_cluster_share: float = 0.33,
+) -> List[TextBlock]:
+    """
+    Select the main content blocks. A block is content if it is long enough,
+    mostly not link text and not inside a boilerplate container. Short blocks
+    (e.g. headings, one sentence paragraphs) are kept only if they sit between
+    content blocks. Of the resulting runs of content only the dominant ones are
+    kept, which drops "related articles" teasers and similar lists.
+    """
+    blocks = [block for block in blocks if block.text]
+    labels = []
+    for block in blocks:
+        # Short blocks with some link text are typically teasers or calls to action
+        link_limit = max_link_density if block.word_count >= 2 * min_words else max_link_density / 2
+        if block.link_density > link_limit or block.hint < 0:
+            labels.append("bad")
+        elif block.word_count >= min_words or (block.hint > 0 and block.word_count >= min_words // 2):
+            labels.append("good")
+        else:
+            labels.append("short")
+
+    # Group the candidates into runs that are at most `max_gap` blocks apart. A
+    # link list (e.g. the headline of a teaser) always ends the run.
+    clusters: List[List[TextBlock]] = []
+    last_index = None
+    for i, (block, label) in enumerate(zip(blocks, labels)):
+        if label == "bad":
+            if block.word_count >= 3:
+                last_index = None
+            continue
+        if label == "short":
+            previous_good = any(labels[j] == "good" for j in range(max(0, i - 2), i))
+            next_good = any(labels[j] == "good" for j in range(i + 1, min(len(labels), i + 3)))
+            if not (next_good and (previous_good or block.tag in HEADING_TAGS)):
+                continue
+        if last_index is None or i - last_index > max_gap + 1:
+            clusters.append([])
+        clusters[-1].append(block)
+        last_index = i
+
+    # The article body is the largest run, comparable runs (e.g. text split by a
+    # large figure) are kept too, small runs of teasers are dropped
+    if not clusters:
+        return []
+    for cluster in clusters:
+        while len(cluster) > 1 and cluster[-1].tag in HEADING_TAGS:
+            cluster.pop()
+    sizes = [sum(block.word_count for block in cluster) for cluster in clusters]
+    largest = max(sizes)
+    return [block for cluster, size in zip(clusters, sizes) if size >= min_cluster_share * largest for block in cluster]
+
+
+class MainContentExtractor:
+    """
+    extract_main_content for a page that arrives in pieces: every piece is parsed
+    as soon as it is fed, so the page never has to be held in memory as a whole.
+
+        extractor = MainContentExtractor()
+        for chunk in chunks:
+            extractor.feed(chunk)
+        text = extractor.close() or extractor.full_text()
+    """
+
+    def __init__(self):
+        self.__parser = BlockParser()
+
+    def feed(self, data: str) -> None:
+        self.__parser.feed(data)
+
+    def close(self) -> str:
+        """Finish parsing and return the main content (empty if none was found)."""
+        self.__parser.close()
+        return "\n".join(block.text for block in classify_blocks(self.__parser.blocks))
+
+    def full_text(self) -> str:
+        """All text outside of the dropped boilerplate elements, one block per line."""
+        return "\n".join(block.text for block in self.__parser.blocks if block.text)
+
+
+def extract_main_content(page: str) -> str:
+    """
+    Extract the main content of an html page, dropping navigation, cookie banners,
+    link lists and other boilerplate.
+
+    :page: Content of the website (html file)
+
+    :return: Text of the content blocks, one block per line (empty if none was found)
+    """
+    extractor = MainContentExtractor()
+    extractor.feed(page)
+    return extractor.close()
@@ -0,0 +1,181 @@
+import asyncio
+import os
+import time
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.web_crawler.extractors import MainContentExtractor
+from app.web_crawler.http_clients import BodyReader, check_html, client_options, print_redirect, redirect_chain
+from app.web_crawler.page_cache import CachedPage, PageCache, default_page_cache
+
+# Decoded text handed to the parser per worker thread call
+PARSE_BATCH_CHARS = 64 * 1024
+
+
+class AsyncFetcher:
+    """
+    Fetches many pages concurrently over a single pooled httpx.AsyncClient.
+
+    Concurrency is bounded globally and per host, so a story cluster pointing
+    at one site does not open a burst of connections against it. Redirects are
+    followed within the client, connections are kept alive per host (over
+    HTTP/2 when h2 is installed) and every request is subject to the connect
+    and read timeouts. The redirect chains are kept in `redirect_chains` for
+    diagnostics. Bodies are streamed: pages that are not html are skipped and
+    pages larger than `max_bytes` (FETCH_MAX_BYTES) are truncated, see
+    DOWNLOAD_STATS. If a PageCache is given, pages are served from it and stale
+    entries are revalidated with conditional requests. Parsing and the disk
+    access of the cache run in worker threads, not on the event loop.
+
+    Use it as an async context manager, the client is closed on exit:
+
+        async with AsyncFetcher() as fetcher:
+            text = await fetcher.fetch_text(url)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 10,
+        max_per_host: int = 2,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        max_bytes: Optional[int] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[PageCache] = None,
+    ):
+        self.__cache = cache
+        self.__max_bytes = max_bytes
+        self.__max_per_host = max_per_host
+        self.__global_limit = asyncio.Semaphore(max_concurrency)
+        self.__host_limits: Dict[str, asyncio.Semaphore] = {}
+        self.__owns_client = client is None
+        if client is None:
+            client = httpx.AsyncClient(**client_options(
+                max_connections=max_concurrency,
+                timeout=timeout,
+                connect_timeout=connect_timeout,
+            ))
+        self.__client = client
+        self.redirect_chains: Dict[str, List[str]] = {}
+
+    @classmethod
+    def from_env(cls) -> "AsyncFetcher":
+        """
+        Create a fetcher configured by FETCH_MAX_CONCURRENCY, FETCH_MAX_PER_HOST,
+        FETCH_TIMEOUT and FETCH_CONNECT_TIMEOUT (seconds), using the process wide
+        page cache.
+        """
+        return cls(
+            max_concurrency=int(os.getenv("FETCH_MAX_CONCURRENCY", 10)),
+            max_per_host=int(os.getenv("FETCH_MAX_PER_HOST", 2)),
+            timeout=float(os.getenv("FETCH_TIMEOUT", 10.0)),
+            connect_timeout=float(os.getenv("FETCH_CONNECT_TIMEOUT", 5.0)),
+            cache=default_page_cache(),
+        )
+
+    @property
+    def cache(self) -> Optional[PageCache]:
+        return self.__cache
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self.__owns_client:
+            await self.__client.aclose()
+
+    def __host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        if host not in self.__host_limits:
+            self.__host_limits[host] = asyncio.Semaphore(self.__max_per_host)
+        return self.__host_limits[host]
+
+    async def __download(
+        self, url: str, consume: Callable[[str], None], headers: Optional[Dict[str, str]] = None
+    ) -> httpx.Response:
+        """
+        Stream a page into `consume` as it arrives, up to the body size limit. Pages
+        that are not html are not downloaded, a 304 response has no body to read.
+        `consume` is called in a worker thread with about PARSE_BATCH_CHARS
+        characters at a time, in the order of the page.
+        """
+        pending: List[str] = []
+        async with self.__global_limit, self.__host_limit(url):
+            async with self.__client.stream("GET", url, headers=headers) as response:
+                if response.history:
+                    self.redirect_chains[url] = redirect_chain(response)
+                    print_redirect(response)
+                if response.status_code == 304:
+                    return response
+                response.raise_for_status()
+                check_html(response)
+                reader = BodyReader(response, pending.append, self.__max_bytes)
+                async for chunk in response.aiter_bytes():
+                    more = reader.feed(chunk)
+                    if sum(len(text) for text in pending) >= PARSE_BATCH_CHARS:
+                        text = "".join(pending)
+                        pending.clear()
+                        await asyncio.to_thread(consume, text)
+                    if not more:
+                        break
+                reader.close()
+        if pending:
+            await asyncio.to_thread(consume, "".join(pending))
+        return response
+
+    async def fetch_html(self, url: str) -> str:
+        """
+        Download a page, following redirects.
+
+        :url: URL of the website (html file)
+        :exception: Might throw exceptions e.g. HTTPStatusError, TimeoutException,
+            UnsupportedContentError
+
+        :return: Decoded response body, truncated to the body size limit
+        """
+        parts: List[str] = []
+        await self.__download(url, parts.append)
+        return "".join(parts)
+
+    async def fetch_text(self, url: str, article_id: Optional[str] = None) -> str:
+        """
+        Download a page and extract its text content. The page is parsed chunk by
+        chunk while it downloads. With a cache and an article_id fresh pages are not
+        downloaded at all and stale ones are revalidated.
+
+        :url: URL of the website (html file)
+        :article_id: Cache key of the page
+        :exception: Might throw exceptions e.g. HTTPStatusError, TimeoutException,
+            UnsupportedContentError
+
+        :return: Extracted content
+        """
+        cached_page = None
+        if self.__cache is not None and article_id is not None:
+            cached_page = await asyncio.to_thread(self.__cache.get, article_id)
+            if cached_page is not None and self.__cache.is_fresh(cached_page):
+                return cached_page.content
+
+        headers = PageCache.conditional_headers(cached_page) if cached_page is not None else None
+        extractor = MainContentExtractor()
+        response = await self.__download(url, extractor.feed, headers=headers)
+        if cached_page is not None and response.status_code == 304:
+            return (await asyncio.to_thread(self.__cache.revalidated, cached_page)).content
+
+        # Classifying the blocks of a large page takes a while as well
+        content = await asyncio.to_thread(lambda: extractor.close() or extractor.full_text())
+        if self.__cache is not None and article_id is not None:
+            await asyncio.to_thread(self.__cache.put, CachedPage(
+                article_id=article_id,
+                url=url,
+                content=content,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                fetched_at=time.time(),
+            ))
+        return content
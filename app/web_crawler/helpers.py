@@ -1,66 +1,96 @@
 from bs4 import BeautifulSoup
-from app.web_crawler.data_model import NewsArticle
+from app.web_crawler.extractors import MainContentExtractor, extract_main_content
+from app.web_crawler.ingest import ingest_metadata_file
+from app.web_crawler.http_clients import BodyReader, check_html, default_http_client, print_redirect
 
-import datetime
-import httpx
-import pathlib
-import requests
+import json
+import os
+import threading
+import time
 
 
 def extract_text_from_website(url: str) -> str:
     """
     Extract content from a website that can be accessed via a provided URL.
-    Will try to follow redirects.
+    Redirects are followed within a single request on the shared client, the
+    page is parsed while it downloads and truncated to FETCH_MAX_BYTES.
 
     :url: URL of the website (html file)
-    :exception: Might throw exceptions e.g. HTTPStatusError
+    :exception: Might throw exceptions e.g. HTTPStatusError, TimeoutException,
+        UnsupportedContentError
 
     :return: Extracted content
     """
-    r = requests.head(url, allow_redirects=True)
+    extractor = MainContentExtractor()
+    with default_http_client().stream("GET", url) as html_response:
+        print_redirect(html_response)
+        html_response.raise_for_status()
+        check_html(html_response)
+        reader = BodyReader(html_response, extractor.feed)
+        for chunk in html_response.iter_bytes():
+            if not reader.feed(chunk):
+                break
+        reader.close()
+    return extractor.close() or extractor.full_text()
 
-    final_url = r.url
-    if not final_url == url:
-        print(f"URL redirected\n  FROM: {url}\n  TO: {final_url}")
 
-    html_response = httpx.get(final_url)
-    html_response.raise_for_status()
-    page = html_response.text
+def extract_text_from_html(page: str) -> str:
+    """
+    Extract the main content of an already downloaded html page. Falls back to the
+    complete text of the page if no content blocks could be identified.
+
+    :page: Content of the website (html file)
+
+    :return: Extracted content
+    """
+    text = extract_main_content(page)
+    if text:
+        return text
+    return extract_full_text_from_html(page)
+
+
+def extract_full_text_from_html(page: str) -> str:
+    """
+    Extract all text of an html page except scripts and styles, one phrase per line.
+
+    :page: Content of the website (html file)
+
+    :return: Extracted content
+    """
     soup = BeautifulSoup(page, 'html.parser')
     for script in soup(["script", "style"]):
         script.extract()
     text = soup.get_text()
     lines = (line.strip() for line in text.splitlines())
     chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-    text = '\n'.join(chunk for chunk in chunks if chunk)
-    return str(text.encode('utf-8'))
+    return '\n'.join(chunk for chunk in chunks if chunk)
+
+
+def write_json_in_background(path: str, data) -> threading.Thread:
+    """
+    Write `data` as JSON to `path` in a daemon thread. The file is written to a
+    temporary name first and then moved into place, so concurrent writers never
+    leave a half written file behind.
+    """
+    def write():
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(json.dumps(data, indent=2))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write '{path}': {e}")
+
+    thread = threading.Thread(target=write, daemon=True)
+    thread.start()
+    return thread
 
 
 def create_article_summaries_from_metadata_file(source: str = "arxiv"):
-    if not pathlib.Path(f"work/{source}").exists():
-        raise ValueError(f"Directory for news source '{source}' does not exist")
-    meta_data_file_path = f"work/{source}/metadata.txt"
-    if not pathlib.Path(f"work/{source}/metadata.txt").exists():
-        raise ValueError(f"metadata.txt does not exist for news source '{source}'")
-
-    with open(meta_data_file_path, "r") as fl:
-        for line in fl:
-            fields = line.split('|')
-            article_id = fields[0]
-            article_summary_path = f"work/{source}/summaries/{article_id}.txt"
-            summary = ""
-            with open(article_summary_path, "r") as summary_file:
-                summary = summary_file.read()
-            news_article = NewsArticle(
-                title=str(fields[3]),
-                date=str(datetime.date.today()),
-                content=str(summary),
-                author=str(fields[1]),
-                source=str(fields[2])
-            )
-
-            with open(f"work/{source}/output/{article_id}.json", 'w') as outfile:
-                outfile.write(news_article.model_dump_json(indent=2))
+    """Create work/{source}/output from the metadata file, see ingest_metadata_file."""
+    report = ingest_metadata_file(source)
+    print(report)
+    return report
 
 
 class Timer:
@@ -70,13 +100,13 @@ class Timer:
         self.__stop_time = None
 
     def tic(self):
-        self.__start_time = datetime.now()
+        self.__start_time = time.perf_counter()
 
     def toc(self, note: str = "") -> float:
-        self.__stop_time = datetime.now()
+        self.__stop_time = time.perf_counter()
         elapsed_time = self.__stop_time - self.__start_time
         if self.__print:
             if note:
                 note = f" ({note})"
-            print(f"Elapsed time{note}: {elapsed_time}s")
+            print(f"Elapsed time{note}: {elapsed_time:.3f}s")
         return elapsed_time
@@ -0,0 +1,182 @@
+import codecs
+import importlib.util
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+HTML_CONTENT_TYPES = {"text/html", "application/xhtml+xml"}
+
+
+class UnsupportedContentError(Exception):
+    """The response is not an html page (e.g. a PDF or a video) and was not downloaded."""
+
+
+class DownloadStats:
+    """Counters of the page downloads, shared by all fetchers of the process."""
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__counters = dict(pages=0, skipped=0, truncated=0, bytes=0)
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        with self.__lock:
+            self.__counters[counter] += amount
+
+    def as_dict(self) -> Dict[str, int]:
+        with self.__lock:
+            return dict(self.__counters)
+
+    def __str__(self) -> str:
+        counters = self.as_dict()
+        return (
+            f"{counters['pages']} pages ({counters['bytes'] / 2 ** 20:.1f} MB), "
+            f"{counters['skipped']} skipped as not html, {counters['truncated']} truncated"
+        )
+
+
+DOWNLOAD_STATS = DownloadStats()
+
+
+def max_body_bytes() -> int:
+    """Size limit of a downloaded page, FETCH_MAX_BYTES (default 2 MB)."""
+    return int(os.getenv("FETCH_MAX_BYTES", 2 * 2 ** 20))
+
+
+def check_html(response: httpx.Response) -> None:
+    """Raise UnsupportedContentError unless the response is html (or does not say what it is)."""
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if content_type and content_type not in HTML_CONTENT_TYPES:
+        DOWNLOAD_STATS.count("skipped")
+        raise UnsupportedContentError(f"'{content_type}' at {response.url}")
+
+
+class BodyReader:
+    """
+    Decodes a streamed response body chunk by chunk and passes the text on to
+    `consume` (e.g. MainContentExtractor.feed), until `max_bytes` were read:
+
+        reader = BodyReader(response, extractor.feed)
+        for chunk in response.iter_bytes():
+            if not reader.feed(chunk):
+                break
+        reader.close()
+
+    Larger pages are truncated, the beginning of an article is what matters.
+    """
+
+    def __init__(self, response: httpx.Response, consume: Callable[[str], None], max_bytes: int = None):
+        try:
+            decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")
+        self.__decoder = decoder(errors="replace")
+        self.__consume = consume
+        self.__max_bytes = max_bytes if max_bytes is not None else max_body_bytes()
+        self.__remaining = self.__max_bytes
+        self.__url = response.url
+        self.truncated = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Pass a chunk on, return False once the size limit is reached."""
+        if len(chunk) > self.__remaining:
+            chunk = chunk[:self.__remaining]
+            self.truncated = True
+        self.__remaining -= len(chunk)
+        DOWNLOAD_STATS.count("bytes", len(chunk))
+        self.__consume(self.__decoder.decode(chunk))
+        return not self.truncated
+
+    def close(self) -> None:
+        self.__consume(self.__decoder.decode(b"", final=True))
+        DOWNLOAD_STATS.count("pages")
+        if self.truncated:
+            DOWNLOAD_STATS.count("truncated")
+            print(f"Page truncated after {self.__max_bytes} bytes: {self.__url}")
+
+
+def client_options(
+    max_connections: int = 10,
+    timeout: float = 10.0,
+    connect_timeout: float = 5.0,
+    keepalive_expiry: float = 30.0,
+) -> dict:
+    """
+    Keyword arguments for httpx.Client and httpx.AsyncClient as the crawler uses
+    them: redirects are followed within the client, so a page costs a single
+    round trip on reused connections, HTTP/2 is used where available, and
+    connecting and reading are both bounded.
+    """
+    return dict(
+        follow_redirects=True,
+        http2=HTTP2_AVAILABLE and os.getenv("FETCH_HTTP2", "true").lower() == "true",
+        timeout=httpx.Timeout(timeout, connect=connect_timeout),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+    )
+
+
+def client_options_from_env(max_connections: int = None) -> dict:
+    """client_options configured by FETCH_MAX_CONCURRENCY, FETCH_TIMEOUT and FETCH_CONNECT_TIMEOUT (seconds)."""
+    return client_options(
+        max_connections=max_connections or int(os.getenv("FETCH_MAX_CONCURRENCY", 10)),
+        timeout=float(os.getenv("FETCH_TIMEOUT", 10.0)),
+        connect_timeout=float(os.getenv("FETCH_CONNECT_TIMEOUT", 5.0)),
+    )
+
+
+def redirect_chain(response: httpx.Response) -> List[str]:
+    """All URLs a request went through, the requested one first and the final one last."""
+    return [str(r.url) for r in response.history] + [str(response.url)]
+
+
+def print_redirect(response: httpx.Response) -> None:
+    if response.history:
+        print("URL redirected\n  " + "\n  -> ".join(redirect_chain(response)))
+
+
+_default_http_client: Optional[httpx.Client] = None
+_default_http_client_lock = threading.Lock()
+
+
+def default_http_client() -> httpx.Client:
+    """Process wide blocking client, its connections are kept alive across requests and threads."""
+    global _default_http_client
+    with _default_http_client_lock:
+        if _default_http_client is None:
+            _default_http_client = httpx.Client(**client_options_from_env())
+    return _default_http_client
+
+
+_default_async_http_client: Optional[httpx.AsyncClient] = None
+
+
+def default_async_http_client() -> httpx.AsyncClient:
+    """
+    Process wide async client for the outgoing requests of the API (imgflip, image
+    generation), created on first use. Its connections belong to the event loop
+    of the server, the FastAPI lifespan closes it on shutdown.
+    """
+    global _default_async_http_client
+    if _default_async_http_client is None or _default_async_http_client.is_closed:
+        _default_async_http_client = httpx.AsyncClient(**client_options(
+            max_connections=int(os.getenv("API_HTTP_MAX_CONNECTIONS", 100)),
+            # Image generation takes a while
+            timeout=float(os.getenv("API_HTTP_TIMEOUT", 120)),
+            connect_timeout=float(os.getenv("FETCH_CONNECT_TIMEOUT", 5.0)),
+        ))
+    return _default_async_http_client
+
+
+async def aclose_default_async_http_client() -> None:
+    global _default_async_http_client
+    if _default_async_http_client is not None:
+        await _default_async_http_client.aclose()
+        _default_async_http_client = None
@@ -0,0 +1,164 @@
+import argparse
+import datetime
+import os
+import pathlib
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field
+
+from app.web_crawler.data_model import NewsArticle
+from app.web_crawler.news_repos import SqliteNewsRepo
+
+CHECKPOINT_FILE = ".ingested"
+
+
+class IngestReport(BaseModel):
+    source: str = Field(description="News source of the metadata file")
+    total: int = Field(description="Number of articles in the metadata file")
+    skipped: int = Field(description="Articles already ingested by a previous run")
+    ingested: int = Field(description="Articles ingested by this run")
+    failed: int = Field(description="Articles that could not be ingested")
+    seconds: float = Field(description="Duration of the run")
+
+    @property
+    def articles_per_second(self) -> float:
+        return self.ingested / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.source}: ingested {self.ingested}/{self.total} articles "
+            f"({self.skipped} already done, {self.failed} failed) in {self.seconds:.1f}s, "
+            f"{self.articles_per_second:.1f} articles/s"
+        )
+
+
+def read_checkpoint(output_dir: pathlib.Path) -> Set[str]:
+    path = output_dir / CHECKPOINT_FILE
+    if not path.exists():
+        return set()
+    with open(path, "r") as file:
+        return {line.strip() for line in file if line.strip()}
+
+
+def append_checkpoint(output_dir: pathlib.Path, article_ids: List[str]) -> None:
+    """Record finished articles, only after their outputs were written."""
+    with open(output_dir / CHECKPOINT_FILE, "a") as file:
+        file.write("".join(f"{article_id}\n" for article_id in article_ids))
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def ingest_batch(source_dir: str, lines: List[str]) -> Tuple[List[Tuple[str, dict]], List[str]]:
+    """
+    Build the articles of some metadata lines from their summaries and write one
+    JSON file per article. Runs in a worker process.
+
+    :return: (article_id, article) of every ingested article and the failures
+    """
+    source_dir = pathlib.Path(source_dir)
+    today = str(datetime.date.today())
+    ingested, failures = [], []
+    for line in lines:
+        fields = line.rstrip("\n").split('|')
+        try:
+            article_id = fields[0]
+            with open(source_dir / "summaries" / f"{article_id}.txt", "r") as summary_file:
+                summary = summary_file.read()
+            news_article = NewsArticle(
+                title=str(fields[3]),
+                date=today,
+                content=str(summary),
+                author=str(fields[1]),
+                source=str(fields[2])
+            )
+            output_path = source_dir / "output" / f"{article_id}.json"
+            tmp_path = output_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'w') as outfile:
+                outfile.write(news_article.model_dump_json(indent=2))
+            os.replace(tmp_path, output_path)
+            ingested.append((article_id, news_article.model_dump()))
+        except (IndexError, OSError, ValueError) as e:
+            failures.append(f"{fields[0]}: {type(e).__name__}: {e}")
+    return ingested, failures
+
+
+def ingest_metadata_file(
+    source: str = "arxiv",
+    work_dir: str = "work",
+    repo: Optional[SqliteNewsRepo] = None,
+    workers: Optional[int] = None,
+    batch_size: int = 100,
+) -> IngestReport:
+    """
+    Turn the lines of work/{source}/metadata.txt (id|author|link|title|...) and the
+    summaries in work/{source}/summaries into articles in work/{source}/output.
+
+    Batches of lines are processed in parallel by a process pool. Finished
+    article_ids are checkpointed per batch, so a rerun after a crash (or with
+    new lines appended) only processes what is missing. With a repo, every
+    batch is also stored in one transaction.
+    """
+    source_dir = pathlib.Path(work_dir) / source
+    if not source_dir.exists():
+        raise ValueError(f"Directory for news source '{source}' does not exist")
+    meta_data_file_path = source_dir / "metadata.txt"
+    if not meta_data_file_path.exists():
+        raise ValueError(f"metadata.txt does not exist for news source '{source}'")
+    output_dir = source_dir / "output"
+    output_dir.mkdir(exist_ok=True)
+
+    start = time.perf_counter()
+    with open(meta_data_file_path, "r") as fl:
+        lines = [line for line in fl if line.strip()]
+    done = read_checkpoint(output_dir)
+    pending = [line for line in lines if line.split('|')[0] not in done]
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+
+    ingested, failed = 0, 0
+    if batches:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(ingest_batch, str(source_dir), batch) for batch in batches]
+            for future in as_completed(futures):
+                articles, failures = future.result()
+                for failure in failures:
+                    print(f"Could not ingest {failure}")
+                if repo is not None and articles:
+                    repo.store_many(
+                        (NewsArticle(**article) for _, article in articles),
+                        source=source,
+                        article_ids=[article_id for article_id, _ in articles],
+                    )
+                append_checkpoint(output_dir, [article_id for article_id, _ in articles])
+                ingested += len(articles)
+                failed += len(failures)
+
+    return IngestReport(
+        source=source,
+        total=len(lines),
+        skipped=len(lines) - len(pending),
+        ingested=ingested,
+        failed=failed,
+        seconds=time.perf_counter() - start,
+    )
+
+
+if __name__ == "__main__":
+    # python -m app.web_crawler.ingest --source wired --workers 4 --store
+    parser = argparse.ArgumentParser(description="Create the article files of a news source from its metadata")
+    parser.add_argument("--source", default="arxiv", help="Folder of the news source below the work directory")
+    parser.add_argument("--work-dir", default="work", help="Work directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes, defaults to the number of CPUs")
+    parser.add_argument("--batch-size", type=int, default=100, help="Articles per batch and checkpoint")
+    parser.add_argument("--store", action="store_true", help="Also store the articles in the article store (NEWS_DB_PATH)")
+    args = parser.parse_args()
+
+    report = ingest_metadata_file(
+        args.source,
+        work_dir=args.work_dir,
+        repo=SqliteNewsRepo.from_env() if args.store else None,
+        workers=args.workers,
+        batch_size=args.batch_size,
+    )
+    print(report)
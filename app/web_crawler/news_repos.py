@@ -1,7 +1,53 @@
+import datetime
+import hashlib
+import os
+import pathlib
+import sqlite3
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import List
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 
-from data_model import NewsArticle
+from app.web_crawler.data_model import NewsArticle
+from app.web_crawler.domain import NewsProvider
+
+
+def article_id_for(news_article: NewsArticle) -> str:
+    """The article_id used by the news sources: md5 of the article link."""
+    return hashlib.md5(string=news_article.source.encode("utf-8")).hexdigest()
+
+
+# Dates as the news sources deliver them, e.g. "11/20/2024, 08:00 AM, +0000 UTC" from Google News
+ARTICLE_DATE_FORMATS = [
+    "%m/%d/%Y, %I:%M %p, %z UTC",
+    "%m/%d/%Y, %I:%M %p, %z",
+    "%m/%d/%Y",
+]
+
+
+def parse_article_date(date: str) -> Optional[float]:
+    """
+    The date of an article as seconds since the epoch, None if it cannot be
+    parsed. Besides the formats of the news sources ISO dates are understood,
+    dates without a time zone are taken as UTC.
+    """
+    date = date.strip()
+    parsed = None
+    try:
+        parsed = datetime.datetime.fromisoformat(date)
+    except ValueError:
+        for date_format in ARTICLE_DATE_FORMATS:
+            try:
+                parsed = datetime.datetime.strptime(date, date_format)
+                break
+            except ValueError:
+                continue
+    if parsed is None:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.timestamp()
 
 
 class NewsRepo(ABC):
@@ -14,5 +60,237 @@ class NewsRepo(ABC):
         pass
 
     @abstractmethod
-    def load_all(self, source: str) -> List[NewsArticle]:
+    def load_all(self, source: str) -> Iterable[NewsArticle]:
         pass
+
+
+class SqliteNewsRepo(NewsRepo):
+    """
+    NewsRepo backed by a single SQLite file.
+
+    Articles are identified by their article_id (md5 of the link unless given
+    explicitly) and grouped by `source`, the news provider they were crawled
+    from. Storing an article_id again replaces the stored article.
+
+    The date is stored as delivered by the source and, for ordering and
+    filtering, parsed into `published_at` (seconds since the epoch, NULL if
+    it cannot be parsed).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS articles (
+            article_id TEXT PRIMARY KEY,
+            source TEXT NOT NULL,
+            title TEXT NOT NULL,
+            date TEXT NOT NULL,
+            content TEXT NOT NULL,
+            author TEXT NOT NULL,
+            link TEXT NOT NULL,
+            stored_at REAL NOT NULL,
+            published_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_articles_source ON articles (source);
+        CREATE TABLE IF NOT EXISTS topic_articles (
+            topic TEXT NOT NULL,
+            article_id TEXT NOT NULL,
+            rank INTEGER NOT NULL,
+            crawled_at REAL NOT NULL,
+            PRIMARY KEY (topic, article_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_topic_articles_topic ON topic_articles (topic, crawled_at);
+    """
+    # After the migration of stores created before published_at existed
+    INDEXES = """
+        DROP INDEX IF EXISTS idx_articles_date;
+        DROP INDEX IF EXISTS idx_articles_source_date;
+        CREATE INDEX IF NOT EXISTS idx_articles_published_at ON articles (published_at);
+        CREATE INDEX IF NOT EXISTS idx_articles_source_published_at ON articles (source, published_at);
+    """
+    UPSERT = """
+        INSERT INTO articles (article_id, source, title, date, content, author, link, stored_at, published_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (article_id) DO UPDATE SET
+            source = excluded.source,
+            title = excluded.title,
+            date = excluded.date,
+            content = excluded.content,
+            author = excluded.author,
+            link = excluded.link,
+            stored_at = excluded.stored_at,
+            published_at = excluded.published_at
+    """
+    COLUMNS = "title, date, content, author, link"
+
+    @staticmethod
+    def normalize_topic(topic: str) -> str:
+        return " ".join(topic.lower().split())
+
+    def __init__(self, path: str = "work/news.sqlite3", batch_size: int = 500):
+        pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.__path = path
+        self.__local = threading.local()
+        self.__batch_size = batch_size
+        with self.__connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(self.SCHEMA)
+            self.__migrate(connection)
+            connection.executescript(self.INDEXES)
+
+    @classmethod
+    def from_env(cls) -> "SqliteNewsRepo":
+        """Create a repo stored at NEWS_DB_PATH."""
+        return cls(path=os.getenv("NEWS_DB_PATH", "work/news.sqlite3"))
+
+    @contextmanager
+    def __connect(self) -> Iterator[sqlite3.Connection]:
+        # One connection per thread keeps the repo usable from the worker threads of the API
+        connection = getattr(self.__local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.__path, timeout=30)
+            self.__local.connection = connection
+        with connection:
+            yield connection
+
+    @staticmethod
+    def __migrate(connection: sqlite3.Connection) -> None:
+        """Add and fill published_at in stores created without it."""
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(articles)")]
+        if "published_at" in columns:
+            return
+        connection.execute("ALTER TABLE articles ADD COLUMN published_at REAL")
+        rows = connection.execute("SELECT article_id, date FROM articles").fetchall()
+        connection.executemany(
+            "UPDATE articles SET published_at = ? WHERE article_id = ?",
+            [(parse_article_date(date), article_id) for article_id, date in rows],
+        )
+
+    @staticmethod
+    def __row(news_article: NewsArticle, source: str, article_id: Optional[str], stored_at: float) -> tuple:
+        return (
+            article_id or article_id_for(news_article),
+            str(source),
+            news_article.title,
+            news_article.date,
+            news_article.content,
+            news_article.author,
+            news_article.source,
+            stored_at,
+            parse_article_date(news_article.date),
+        )
+
+    @staticmethod
+    def __article(row: tuple) -> NewsArticle:
+        title, date, content, author, link = row
+        return NewsArticle(title=title, date=date, content=content, author=author, source=link)
+
+    def store(self, news_article: NewsArticle, source: str = NewsProvider.GOOGLE, article_id: Optional[str] = None) -> None:
+        self.store_many([news_article], source=source, article_ids=[article_id])
+
+    def store_many(
+        self,
+        news_articles: Iterable[NewsArticle],
+        source: str = NewsProvider.GOOGLE,
+        article_ids: Optional[Iterable[Optional[str]]] = None,
+    ) -> int:
+        """
+        Store articles in batched transactions, replacing articles with the same
+        article_id.
+
+        :return: Number of stored articles
+        """
+        news_articles = list(news_articles)
+        article_ids = list(article_ids) if article_ids is not None else [None] * len(news_articles)
+        if len(article_ids) != len(news_articles):
+            raise ValueError("article_ids and news_articles must have the same length")
+
+        stored_at = time.time()
+        rows = [self.__row(a, source, i, stored_at) for a, i in zip(news_articles, article_ids)]
+        with self.__connect() as connection:
+            for start in range(0, len(rows), self.__batch_size):
+                connection.executemany(self.UPSERT, rows[start:start + self.__batch_size])
+        return len(rows)
+
+    def load(self, article_id: str, source: str) -> Optional[NewsArticle]:
+        with self.__connect() as connection:
+            row = connection.execute(
+                f"SELECT {self.COLUMNS} FROM articles WHERE article_id = ? AND source = ?",
+                (article_id, str(source)),
+            ).fetchone()
+        return self.__article(row) if row is not None else None
+
+    def load_all(
+        self, source: str, since: Union[str, float, datetime.datetime, None] = None
+    ) -> Iterator[NewsArticle]:
+        """
+        Stream the articles of a source, newest first (undated ones last), without
+        loading them all into memory. `since` (a date string as understood by
+        parse_article_date, a datetime or seconds since the epoch) limits the
+        result to articles published on or after it.
+        """
+        query = f"SELECT {self.COLUMNS} FROM articles WHERE source = ?"
+        parameters: List = [str(source)]
+        if since is not None:
+            if isinstance(since, str):
+                since_date, since = since, parse_article_date(since)
+                if since is None:
+                    raise ValueError(f"Cannot parse the date '{since_date}'")
+            elif isinstance(since, datetime.datetime):
+                since = (since if since.tzinfo else since.replace(tzinfo=datetime.timezone.utc)).timestamp()
+            query += " AND published_at >= ?"
+            parameters.append(since)
+        query += " ORDER BY published_at DESC NULLS LAST"
+        with self.__connect() as connection:
+            cursor = connection.execute(query, parameters)
+            while True:
+                rows = cursor.fetchmany(self.__batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self.__article(row)
+
+    def article_ids(self, source: str) -> List[str]:
+        with self.__connect() as connection:
+            rows = connection.execute("SELECT article_id FROM articles WHERE source = ?", (str(source),)).fetchall()
+        return [row[0] for row in rows]
+
+    def load_many(self, article_ids: Iterable[str], source: str) -> Dict[str, NewsArticle]:
+        """Load the stored articles among article_ids, keyed by article_id."""
+        article_ids = list(article_ids)
+        articles = {}
+        with self.__connect() as connection:
+            for start in range(0, len(article_ids), self.__batch_size):
+                batch = article_ids[start:start + self.__batch_size]
+                rows = connection.execute(
+                    f"SELECT article_id, {self.COLUMNS} FROM articles "
+                    f"WHERE source = ? AND article_id IN ({','.join('?' * len(batch))})",
+                    [str(source), *batch],
+                ).fetchall()
+                for row in rows:
+                    articles[row[0]] = self.__article(row[1:])
+        return articles
+
+    def store_topic(self, topic: str, article_ids: Iterable[str]) -> None:
+        """Remember which articles (in ranking order) a crawl of the topic found."""
+        crawled_at = time.time()
+        topic = self.normalize_topic(topic)
+        rows = [(topic, article_id, rank, crawled_at) for rank, article_id in enumerate(article_ids)]
+        with self.__connect() as connection:
+            connection.execute("DELETE FROM topic_articles WHERE topic = ?", (topic,))
+            connection.executemany(
+                "INSERT OR REPLACE INTO topic_articles (topic, article_id, rank, crawled_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def load_topic(self, topic: str, max_age: float) -> List[NewsArticle]:
+        """
+        Articles of the last crawl of a topic, in ranking order, if that crawl is at
+        most max_age seconds old.
+        """
+        with self.__connect() as connection:
+            rows = connection.execute(
+                f"SELECT {', '.join('a.' + c for c in self.COLUMNS.split(', '))} "
+                "FROM topic_articles t JOIN articles a ON a.article_id = t.article_id "
+                "WHERE t.topic = ? AND t.crawled_at >= ? ORDER BY t.rank",
+                (self.normalize_topic(topic), time.time() - max_age),
+            ).fetchall()
+        return [self.__article(row) for row in rows]
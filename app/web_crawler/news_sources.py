@@ -1,18 +1,21 @@
+import asyncio
 import hashlib
-import json
 import pathlib
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import Collection, List, Dict
 
 import os
 
-from httpx import HTTPStatusError
+from httpx import HTTPStatusError, TimeoutException
 
 from app.web_crawler.data_model import NewsArticle
 from app.web_crawler.domain import NewsProvider
 from serpapi import GoogleSearch
 
-from app.web_crawler.helpers import extract_text_from_website
+from app.web_crawler.fetcher import AsyncFetcher
+from app.web_crawler.helpers import extract_text_from_website, write_json_in_background
+from app.web_crawler.http_clients import DOWNLOAD_STATS, UnsupportedContentError
+from app.web_crawler.search_cache import default_search_cache
 
 
 class NewsSource(ABC):
@@ -37,11 +40,26 @@ class GoogleNewsSource(NewsSource):
         self.__source = NewsProvider.GOOGLE
 
     def fetch(self, search_parameters: dict = {"q": "artificial intelligence"}) -> None:
-        GoogleSearch.SERP_API_KEY = self.__SERP_API_KEY
-        search = GoogleSearch(search_parameters)
-        self.__last_result = search.get_dict()
-        with open("google_fetch.json", "w") as f:
-            f.write(json.dumps(self.__last_result, indent=2))
+        """
+        Run the search, answering from the search cache (see SEARCH_CACHE_TTL) when
+        the same normalized search was done recently. If GOOGLE_FETCH_DUMP names a
+        file, the raw result is additionally written there in the background.
+        """
+        cache = default_search_cache()
+        result = cache.get(search_parameters) if cache is not None else None
+        if result is None:
+            GoogleSearch.SERP_API_KEY = self.__SERP_API_KEY
+            search = GoogleSearch(search_parameters)
+            result = search.get_dict()
+            if cache is not None and "error" not in result:
+                cache.put(search_parameters, result)
+        else:
+            print(f"Search cache hit: {search_parameters}")
+        self.__last_result = result
+
+        dump_path = os.getenv("GOOGLE_FETCH_DUMP")
+        if dump_path:
+            write_json_in_background(dump_path, self.__last_result)
 
     def store_raw_data(self, filename: str) -> None:
         source = NewsProvider.GOOGLE
@@ -49,47 +67,64 @@ class GoogleNewsSource(NewsSource):
         with open(filepath, "w") as file:
             file.write(str(self.__last_result))
 
-    def get_news_content(self, limit: int = 1) -> List[NewsArticle]:
+    def get_news_content(self, limit: int = 1, skip_article_ids: Collection[str] = ()) -> List[NewsArticle]:
+        return asyncio.run(self.aget_news_content(limit=limit, skip_article_ids=skip_article_ids))
+
+    async def aget_news_content(self, limit: int = 1, skip_article_ids: Collection[str] = ()) -> List[NewsArticle]:
+        """
+        Fetch the content of the first `limit` news results (and all stories of their
+        clusters) concurrently. Stories whose content could not be fetched are skipped,
+        the order of the search results is preserved.
+
+        :skip_article_ids: Stories that are already known and need not be fetched
+        """
+        stories = [
+            story for story in self.collect_stories(limit)
+            if self.article_id(story) not in skip_article_ids
+        ]
+        if not stories:
+            return []
+        print(f"Fetching {len(stories)} stories")
+        async with AsyncFetcher.from_env() as fetcher:
+            contents = await asyncio.gather(
+                *(self.aprocess(fetcher, story) for story in stories)
+            )
+            if fetcher.cache is not None:
+                print(f"Page cache: {fetcher.cache.stats()}")
+        print(f"Downloads: {DOWNLOAD_STATS}")
+
         news_articles = []
-        news_results = self.__last_result["news_results"][:limit]
-        for i_news, news_result in enumerate(news_results):
-            print(f"""News p: {i_news + 1}/{len(news_results)}""")
+        for story, news_article_content in zip(stories, contents):
+            if news_article_content is not None:
+                news_articles.append(self.to_news_article(story, news_article_content))
+        return news_articles
 
+    def collect_stories(self, limit: int = 1) -> List[dict]:
+        """Flatten the first `limit` news results, expanding story clusters."""
+        stories = []
+        for news_result in self.__last_result["news_results"][:limit]:
             if "stories" in news_result:
-                for i_story, story in enumerate(news_result["stories"]):
-                    print(f"""  Story: {i_story + 1}/{len(news_result["stories"])}""")
-
-                    news_article_content = self.process(story)
-                    if news_article_content is not None:
-                        authors = ""
-                        if "authors" in story["source"]:
-                            authors = '|'.join(story["source"]["authors"])
-                        news_article = NewsArticle(
-                            title=str(story["title"]),
-                            date=str(story["date"]),
-                            content=str(news_article_content),
-                            author=str(authors),
-                            source=str(story["link"])
-                        )
-                        news_articles.append(news_article)
+                stories.extend(news_result["stories"])
             else:
-                story = news_result
-
-                news_article_content = self.process(story)
-                if news_article_content is not None:
-                    authors = ""
-                    if "authors" in story["source"]:
-                        authors = '|'.join(story["source"]["authors"])
-                    news_article = NewsArticle(
-                        title=str(story["title"]),
-                        date=str(story["date"]),
-                        content=str(news_article_content),
-                        author=str(authors),
-                        source=str(story["link"])
-                    )
-                    news_articles.append(news_article)
-
-        return news_articles
+                stories.append(news_result)
+        return stories
+
+    @staticmethod
+    def article_id(story: dict) -> str:
+        return hashlib.md5(string=story["link"].encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def to_news_article(story: dict, news_article_content: dict) -> NewsArticle:
+        authors = ""
+        if "authors" in story["source"]:
+            authors = '|'.join(story["source"]["authors"])
+        return NewsArticle(
+            title=str(story["title"]),
+            date=str(story["date"]),
+            content=str(news_article_content["content"]),
+            author=str(authors),
+            source=str(story["link"])
+        )
 
     def process(self, story) -> dict:
         try:
@@ -101,5 +136,24 @@ class GoogleNewsSource(NewsSource):
             }
         except HTTPStatusError as e:
             print(f"Ignoring this story, problem with the content fetching: {e}")
+        except UnsupportedContentError as e:
+            print(f"Ignoring this story, not an html page: {e}")
         except BaseException as e:
             print(f"Ignoring this story, an unknown problem occurred: {e}")
+
+    async def aprocess(self, fetcher: AsyncFetcher, story) -> dict:
+        try:
+            article_id = self.article_id(story)
+            content = await fetcher.fetch_text(story["link"], article_id=article_id)
+            return {
+                "article_id": article_id,
+                "content": content
+            }
+        except HTTPStatusError as e:
+            print(f"Ignoring this story, problem with the content fetching: {e}")
+        except TimeoutException as e:
+            print(f"Ignoring this story, fetching the content timed out: {e}")
+        except UnsupportedContentError as e:
+            print(f"Ignoring this story, not an html page: {e}")
+        except Exception as e:
+            print(f"Ignoring this story, an unknown problem occurred: {e}")
@@ -0,0 +1,152 @@
+import os
+import pathlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+
+
+class CachedPage(BaseModel):
+    article_id: str = Field(description="md5 of the article link")
+    url: str = Field(description="The URL the page was fetched from")
+    content: str = Field(description="The extracted text of the page")
+    etag: Optional[str] = Field(default=None, description="ETag validator of the response")
+    last_modified: Optional[str] = Field(default=None, description="Last-Modified validator of the response")
+    fetched_at: float = Field(description="Unix time of the last successful fetch or revalidation")
+
+
+class PageCache:
+    """
+    Disk-backed cache of extracted page text, keyed on the article_id computed by
+    the news sources. One JSON file per page is kept in `directory`; the total
+    size is bounded by `max_bytes` and the least recently used pages are evicted
+    first.
+
+    Entries younger than `ttl` seconds are served as they are. Older entries are
+    still returned by `get` so that the caller can revalidate them with a
+    conditional request built from `conditional_headers`.
+    """
+
+    def __init__(self, directory: str = "work/cache/pages", max_bytes: int = 200 * 1024 * 1024, ttl: float = 3600):
+        self.__directory = pathlib.Path(directory)
+        self.__directory.mkdir(parents=True, exist_ok=True)
+        self.__max_bytes = max_bytes
+        self.__ttl = ttl
+        self.__lock = threading.Lock()
+        self.__sizes: "OrderedDict[str, int]" = OrderedDict()
+        self.__counters = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0, "evictions": 0, "bytes_served": 0}
+        self.__load_index()
+
+    @classmethod
+    def from_env(cls) -> Optional["PageCache"]:
+        """
+        Create a cache configured by PAGE_CACHE_DIR, PAGE_CACHE_MAX_MB and PAGE_CACHE_TTL
+        (seconds). Returns None if PAGE_CACHE_DIR is set to an empty string.
+        """
+        directory = os.getenv("PAGE_CACHE_DIR", "work/cache/pages")
+        if not directory:
+            return None
+        return cls(
+            directory=directory,
+            max_bytes=int(float(os.getenv("PAGE_CACHE_MAX_MB", 200)) * 1024 * 1024),
+            ttl=float(os.getenv("PAGE_CACHE_TTL", 3600)),
+        )
+
+    def __path(self, article_id: str) -> pathlib.Path:
+        return self.__directory / f"{article_id}.json"
+
+    def __load_index(self) -> None:
+        # The file modification time doubles as the recency of use
+        entries = []
+        for path in self.__directory.glob("*.json"):
+            stat = path.stat()
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, article_id, size in sorted(entries):
+            self.__sizes[article_id] = size
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        return time.time() - page.fetched_at < self.__ttl
+
+    def get(self, article_id: str) -> Optional[CachedPage]:
+        """Return the cached page (fresh or stale) or None if it is unknown."""
+        with self.__lock:
+            if article_id not in self.__sizes:
+                self.__counters["misses"] += 1
+                return None
+            path = self.__path(article_id)
+            try:
+                page = CachedPage.model_validate_json(path.read_text(encoding="utf-8"))
+                os.utime(path)
+            except (OSError, ValueError):
+                self.__remove(article_id)
+                self.__counters["misses"] += 1
+                return None
+            self.__sizes.move_to_end(article_id)
+            if self.is_fresh(page):
+                self.__counters["hits"] += 1
+                self.__counters["bytes_served"] += self.__sizes[article_id]
+            else:
+                self.__counters["stale"] += 1
+            return page
+
+    def put(self, page: CachedPage) -> None:
+        data = page.model_dump_json().encode("utf-8")
+        with self.__lock:
+            path = self.__path(page.article_id)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            self.__sizes[page.article_id] = len(data)
+            self.__sizes.move_to_end(page.article_id)
+            self.__evict()
+
+    def revalidated(self, page: CachedPage) -> CachedPage:
+        """Mark a stale page as confirmed by the server (HTTP 304) and store it again."""
+        page = page.model_copy(update={"fetched_at": time.time()})
+        self.put(page)
+        with self.__lock:
+            self.__counters["revalidated"] += 1
+            self.__counters["bytes_served"] += self.__sizes.get(page.article_id, 0)
+        return page
+
+    @staticmethod
+    def conditional_headers(page: CachedPage) -> Dict[str, str]:
+        headers = {}
+        if page.etag:
+            headers["If-None-Match"] = page.etag
+        if page.last_modified:
+            headers["If-Modified-Since"] = page.last_modified
+        return headers
+
+    def __remove(self, article_id: str) -> None:
+        self.__sizes.pop(article_id, None)
+        self.__path(article_id).unlink(missing_ok=True)
+
+    def __evict(self) -> None:
+        total = sum(self.__sizes.values())
+        while total > self.__max_bytes and len(self.__sizes) > 1:
+            article_id, size = next(iter(self.__sizes.items()))
+            self.__remove(article_id)
+            total -= size
+            self.__counters["evictions"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self.__lock:
+            return {
+                **self.__counters,
+                "entries": len(self.__sizes),
+                "bytes": sum(self.__sizes.values()),
+            }
+
+
+_default_page_cache: Optional[PageCache] = None
+
+
+def default_page_cache() -> Optional[PageCache]:
+    """Process wide page cache, created from the environment on first use."""
+    global _default_page_cache
+    if _default_page_cache is None:
+        _default_page_cache = PageCache.from_env()
+    return _default_page_cache
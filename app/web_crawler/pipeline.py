@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import os
+import time
+from typing import AsyncIterator, Awaitable, Callable, Collection, Dict, List, Optional
+
+from app.web_crawler.data_model import NewsArticle
+from app.web_crawler.dedup import DedupReport, StreamingDeduplicator
+from app.web_crawler.fetcher import AsyncFetcher
+from app.web_crawler.http_clients import DOWNLOAD_STATS
+from app.web_crawler.news_sources import GoogleNewsSource
+from app.web_crawler.summarizers import Summarizer
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's input, one per worker of the receiving stage
+_DONE = object()
+
+
+async def _closing(stage: Awaitable[None], outbox: asyncio.Queue, downstream_workers: int) -> None:
+    """
+    Await a stage, then tell the downstream workers that no more input follows,
+    also if the stage failed. Cancelled stages stay silent, the whole pipeline is
+    being torn down and nobody might be left to drain the queue.
+    """
+    try:
+        await stage
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        for _ in range(downstream_workers):
+            await outbox.put(_DONE)
+        raise
+    for _ in range(downstream_workers):
+        await outbox.put(_DONE)
+
+
+class CrawlPipeline:
+    """
+    Streams search results through fetch & extract → dedup → summarize. Every
+    stage runs as its own task(s) connected by bounded queues, so articles flow
+    on as soon as they are ready: the first summaries are requested while other
+    pages are still downloading, and a slow stage throttles the stages before it.
+
+    The summarized articles are yielded in completion order. Iteration stops
+    after `max_articles` articles, cancelling all outstanding work.
+    """
+
+    def __init__(
+        self,
+        news_source: GoogleNewsSource,
+        summarizer: Summarizer,
+        fetcher_factory: Callable[[], AsyncFetcher] = AsyncFetcher.from_env,
+        fetch_concurrency: int = None,
+        summarize_concurrency: int = None,
+        summarize_batch_size: int = 4,
+        queue_size: int = 8,
+        dedup_threshold: float = None,
+    ):
+        self.__news_source = news_source
+        self.__summarizer = summarizer
+        self.__fetcher_factory = fetcher_factory
+        self.__fetch_concurrency = fetch_concurrency or int(os.getenv("FETCH_MAX_CONCURRENCY", 10))
+        self.__summarize_concurrency = summarize_concurrency or int(os.getenv("SUMMARIZER_MAX_CONCURRENCY", 5))
+        self.__summarize_batch_size = summarize_batch_size
+        self.__queue_size = queue_size
+        self.__dedup_threshold = dedup_threshold
+        self.stats: Dict[str, int] = {}
+        # What the dedup stage collapsed in the last run
+        self.dedup_report: Optional[DedupReport] = None
+        # Seconds spent per item (per batch for summarize) in each stage of the last run
+        self.timings: Dict[str, List[float]] = {}
+
+    async def stream(
+        self,
+        search_parameters: Optional[dict],
+        limit: int = 5,
+        max_articles: Optional[int] = None,
+        skip_article_ids: Collection[str] = (),
+    ) -> AsyncIterator[NewsArticle]:
+        """
+        :search_parameters: Parameters of the news search, None to stream the
+            results of the news source's last search
+        :limit: Number of news results (story clusters are expanded)
+        :max_articles: Stop once this many articles are summarized
+        :skip_article_ids: Stories that are already known and need not be crawled
+        """
+        self.stats = dict(stories=0, fetched=0, failed=0, duplicates=0, summarized=0, unsummarized=0)
+        self.timings = dict(search=[], fetch=[], dedup=[], summarize=[])
+        stories: asyncio.Queue = asyncio.Queue(self.__queue_size)
+        pages: asyncio.Queue = asyncio.Queue(self.__queue_size)
+        unique: asyncio.Queue = asyncio.Queue(self.__queue_size)
+        summarized: asyncio.Queue = asyncio.Queue(self.__queue_size)
+
+        deduplicator = StreamingDeduplicator(threshold=self.__dedup_threshold)
+        async with self.__fetcher_factory() as fetcher:
+            tasks = [
+                asyncio.create_task(_closing(
+                    self.__search(search_parameters, limit, skip_article_ids, stories),
+                    stories, downstream_workers=self.__fetch_concurrency,
+                )),
+                asyncio.create_task(_closing(
+                    self.__stage(lambda story: self.__fetch(fetcher, story), stories, pages, self.__fetch_concurrency),
+                    pages, downstream_workers=1,
+                )),
+                asyncio.create_task(_closing(
+                    self.__stage(self.__deduplicate(deduplicator), pages, unique, 1),
+                    unique, downstream_workers=self.__summarize_concurrency,
+                )),
+                asyncio.create_task(_closing(self.__summarize_stage(unique, summarized, deduplicator), summarized, 1)),
+            ]
+            try:
+                yielded = 0
+                while max_articles is None or yielded < max_articles:
+                    news_article = await summarized.get()
+                    if news_article is _DONE:
+                        break
+                    yielded += 1
+                    yield news_article
+                # Surface errors of the stages, e.g. a failed search
+                for task in tasks:
+                    if task.done() and task.exception() is not None:
+                        raise task.exception()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                self.dedup_report = deduplicator.report()
+                logger.info("Crawl pipeline: %s", self.stats)
+                logger.info("Deduplication: %s", self.dedup_report)
+                for group in self.dedup_report.duplicate_groups:
+                    logger.debug("Duplicates of %s: %s", group[0], group[1:])
+                logger.info("Downloads: %s", DOWNLOAD_STATS)
+                if fetcher.cache is not None:
+                    logger.info("Page cache: %s", fetcher.cache.stats())
+
+    async def collect(self, search_parameters: Optional[dict], **kwargs) -> List[NewsArticle]:
+        return [news_article async for news_article in self.stream(search_parameters, **kwargs)]
+
+    async def __search(
+        self, search_parameters: Optional[dict], limit: int, skip_article_ids: Collection[str], outbox: asyncio.Queue
+    ) -> None:
+        if search_parameters is not None:
+            start = time.perf_counter()
+            # The SerpAPI client is blocking
+            await asyncio.to_thread(self.__news_source.fetch, search_parameters)
+            self.timings["search"].append(time.perf_counter() - start)
+        for story in self.__news_source.collect_stories(limit):
+            if GoogleNewsSource.article_id(story) in skip_article_ids:
+                continue
+            self.stats["stories"] += 1
+            await outbox.put(story)
+
+    @staticmethod
+    async def __stage(
+        worker: Callable[[object], Awaitable[Optional[object]]],
+        inbox: asyncio.Queue,
+        outbox: asyncio.Queue,
+        concurrency: int,
+    ) -> None:
+        """Run `concurrency` workers over the inbox, forwarding every result that is not None."""
+        async def run() -> None:
+            while (item := await inbox.get()) is not _DONE:
+                result = await worker(item)
+                if result is not None:
+                    await outbox.put(result)
+
+        await asyncio.gather(*(run() for _ in range(concurrency)))
+
+    async def __fetch(self, fetcher: AsyncFetcher, story: dict) -> Optional[NewsArticle]:
+        start = time.perf_counter()
+        content = await self.__news_source.aprocess(fetcher, story)
+        self.timings["fetch"].append(time.perf_counter() - start)
+        if content is None or not content["content"].strip():
+            self.stats["failed"] += 1
+            return None
+        self.stats["fetched"] += 1
+        return GoogleNewsSource.to_news_article(story, content)
+
+    def __deduplicate(self, deduplicator: StreamingDeduplicator) -> Callable[[NewsArticle], Awaitable[Optional[NewsArticle]]]:
+        async def deduplicate(news_article: NewsArticle) -> Optional[NewsArticle]:
+            start = time.perf_counter()
+            duplicate = deduplicator.is_duplicate(news_article)
+            self.timings["dedup"].append(time.perf_counter() - start)
+            if duplicate:
+                self.stats["duplicates"] += 1
+                return None
+            return news_article
+
+        return deduplicate
+
+    async def __summarize_stage(self, inbox: asyncio.Queue, outbox: asyncio.Queue, deduplicator: StreamingDeduplicator) -> None:
+        """
+        Summarize with several workers. A worker takes whatever is already waiting
+        (up to summarize_batch_size articles), so summarizers that pack or batch
+        requests still can, without delaying the first article. Until an article
+        is taken, a better source of the same story may still replace it.
+        """
+        async def run() -> None:
+            done = False
+            while not done:
+                item = await inbox.get()
+                if item is _DONE:
+                    return
+                batch = [item]
+                while len(batch) < self.__summarize_batch_size and not inbox.empty():
+                    item = inbox.get_nowait()
+                    if item is _DONE:
+                        done = True
+                        break
+                    batch.append(item)
+                for news_article in batch:
+                    deduplicator.release(news_article)
+
+                start = time.perf_counter()
+                summaries = await self.__summarizer.aget_summaries([a.content for a in batch])
+                self.timings["summarize"].append(time.perf_counter() - start)
+                for news_article, summary in zip(batch, summaries):
+                    if not summary.ok:
+                        self.stats["unsummarized"] += 1
+                        logger.warning("Skipping '%s', summarization failed: %s", news_article.source, summary.error)
+                        continue
+                    self.stats["summarized"] += 1
+                    news_article.content = summary.summary
+                    await outbox.put(news_article)
+
+        await asyncio.gather(*(run() for _ in range(self.__summarize_concurrency)))
+
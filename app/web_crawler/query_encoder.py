@@ -1,33 +1,216 @@
+import logging
 import os
+import re
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
 
-from groq import Groq
+import numpy as np
+from groq import AsyncGroq, Groq
+
+logger = logging.getLogger(__name__)
+
+# Words that do not change what a news search is about
+STOP_WORDS = {
+    "a", "an", "the", "of", "on", "about", "for", "in", "to", "and", "or", "me", "us", "give", "provide",
+    "show", "tell", "what", "whats", "is", "are", "with", "please", "some", "any", "i", "want", "can", "you",
+}
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lower case words without punctuation, separated by single spaces."""
+    return " ".join(re.findall(r"\w+", prompt.lower()))
+
+
+def prompt_terms(prompt: str) -> List[str]:
+    """Content words of a prompt, crudely singularized."""
+    terms = []
+    for word in normalize_prompt(prompt).split():
+        if word in STOP_WORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def hashed_ngram_vector(prompt: str, dimensions: int = 4096) -> np.ndarray:
+    """
+    L2 normalized bag of words vector of a prompt, using the hashing trick. Word
+    character 4-grams are added with a lower weight so that spelling variants
+    stay close. Word order does not matter.
+    """
+    vector = np.zeros(dimensions)
+    for term in prompt_terms(prompt):
+        features = [(term, 1.0)]
+        padded = f"<{term}>"
+        features += [(padded[i:i + 4], 0.25) for i in range(max(len(padded) - 3, 1))]
+        for feature, weight in features:
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % dimensions] += weight if h & 0x80000000 else -weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+class TopicCache:
+    """
+    Cache of the topics extracted from user prompts. A prompt is answered from
+    the cache if its normalized form was seen before, or if the cosine similarity
+    of its hashed n-gram vector to a cached prompt reaches `threshold`. Entries
+    expire after `ttl` seconds so that topics follow the news.
+    """
+
+    def __init__(self, ttl: float = 3600, threshold: float = 0.9, max_entries: int = 1024, dimensions: int = 4096):
+        self.__ttl = ttl
+        self.__threshold = threshold
+        self.__max_entries = max_entries
+        self.__dimensions = dimensions
+        self.__lock = threading.Lock()
+        self.__exact: Dict[str, Tuple[str, float]] = {}
+        self.__prompts: List[str] = []
+        self.__vectors = np.zeros((0, dimensions))
+        self.__topics: List[str] = []
+        self.__created_at = np.zeros(0)
+
+    @classmethod
+    def from_env(cls) -> Optional["TopicCache"]:
+        """
+        Create a cache configured by TOPIC_CACHE_TTL (seconds, 0 disables the cache)
+        and TOPIC_CACHE_THRESHOLD (cosine similarity, 1 allows exact matches only).
+        """
+        ttl = float(os.getenv("TOPIC_CACHE_TTL", 3600))
+        if ttl <= 0:
+            return None
+        return cls(ttl=ttl, threshold=float(os.getenv("TOPIC_CACHE_THRESHOLD", 0.9)))
+
+    def __expire(self, now: float) -> None:
+        self.__exact = {k: v for k, v in self.__exact.items() if now - v[1] < self.__ttl}
+        alive = now - self.__created_at < self.__ttl
+        if alive.all():
+            return
+        self.__vectors = self.__vectors[alive]
+        self.__created_at = self.__created_at[alive]
+        self.__prompts = [p for p, keep in zip(self.__prompts, alive) if keep]
+        self.__topics = [t for t, keep in zip(self.__topics, alive) if keep]
+
+    def get(self, prompt: str) -> Optional[str]:
+        key = normalize_prompt(prompt)
+        now = time.time()
+        with self.__lock:
+            self.__expire(now)
+            if key in self.__exact:
+                return self.__exact[key][0]
+            if not self.__topics or self.__threshold >= 1:
+                return None
+            similarities = self.__vectors @ hashed_ngram_vector(prompt, self.__dimensions)
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.__threshold:
+                logger.info("Reusing topic of similar prompt '%s' (%.2f)", self.__prompts[best], similarities[best])
+                return self.__topics[best]
+        return None
+
+    def put(self, prompt: str, topic: str) -> None:
+        key = normalize_prompt(prompt)
+        now = time.time()
+        vector = hashed_ngram_vector(prompt, self.__dimensions)
+        with self.__lock:
+            self.__exact[key] = (topic, now)
+            self.__prompts.append(key)
+            self.__topics.append(topic)
+            self.__vectors = np.vstack([self.__vectors, vector])
+            self.__created_at = np.append(self.__created_at, now)
+            if len(self.__topics) > self.__max_entries:
+                self.__prompts = self.__prompts[-self.__max_entries:]
+                self.__topics = self.__topics[-self.__max_entries:]
+                self.__vectors = self.__vectors[-self.__max_entries:]
+                self.__created_at = self.__created_at[-self.__max_entries:]
+            while len(self.__exact) > self.__max_entries:
+                del self.__exact[next(iter(self.__exact))]
 
 
 class QueryEncoder:
-    def __init__(self):
-        self.__client = Groq(
-            api_key=os.environ.get("GROQ_API_KEY"),
-        )
+    """
+    Turns a user prompt into a Google News query with a Groq hosted LLM. The Groq
+    clients are created on first use, so an encoder can be created without
+    GROQ_API_KEY; aclose closes them.
+    """
 
-    def get_topic(self, prompt: str) -> str:
-        chat_completion = self.__client.chat.completions.create(
-            messages=[
-                {
-                    "role": "user",
-                    "content": f"""
-                        Provide an input for a google news search query based on the following prompt:
-                        
-                        {prompt}
-                        
-                        Return only a string with the topic. No other text is required. Do not add quotation marks.
-                    """
-                }
-            ],
-            model="llama3-8b-8192",
-        )
-        topic = str(chat_completion.choices[0].message.content)
-        print(topic)
+    def __init__(self, cache: Optional[TopicCache] = None, async_client: Optional[AsyncGroq] = None):
+        self.__client: Optional[Groq] = None
+        self.__async_client = async_client
+        self.__cache = cache
+
+    @classmethod
+    def from_env(cls) -> "QueryEncoder":
+        return cls(cache=TopicCache.from_env())
+
+    @staticmethod
+    def __messages(prompt: str) -> List[dict]:
+        return [
+            {
+                "role": "user",
+                "content": f"""
+                    Provide an input for a google news search query based on the following prompt:
+
+                    {prompt}
+
+                    Return only a string with the topic. No other text is required. Do not add quotation marks.
+                """
+            }
+        ]
+
+    def __cached_topic(self, prompt: str) -> Optional[str]:
+        if self.__cache is None:
+            return None
+        topic = self.__cache.get(prompt)
+        if topic is not None:
+            logger.info("Topic cache hit: %s", topic)
+        return topic
+
+    def __clean_topic(self, prompt: str, topic: str) -> str:
+        logger.info("Topic: %s", topic)
         topic = topic.replace('\n', '')
         topic = topic.replace('"', '')
         topic = topic.replace("'", '')
+        if self.__cache is not None:
+            self.__cache.put(prompt, topic)
         return topic
+
+    def get_topic(self, prompt: str) -> str:
+        topic = self.__cached_topic(prompt)
+        if topic is not None:
+            return topic
+
+        if self.__client is None:
+            self.__client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+        chat_completion = self.__client.chat.completions.create(
+            messages=self.__messages(prompt),
+            model="llama3-8b-8192",
+        )
+        return self.__clean_topic(prompt, str(chat_completion.choices[0].message.content))
+
+    async def aget_topic(self, prompt: str) -> str:
+        """
+        get_topic without blocking the event loop. The AsyncGroq client is created
+        on first use and reused, so use one QueryEncoder per event loop.
+        """
+        topic = self.__cached_topic(prompt)
+        if topic is not None:
+            return topic
+
+        if self.__async_client is None:
+            self.__async_client = AsyncGroq(api_key=os.environ.get("GROQ_API_KEY"))
+        chat_completion = await self.__async_client.chat.completions.create(
+            messages=self.__messages(prompt),
+            model="llama3-8b-8192",
+        )
+        return self.__clean_topic(prompt, str(chat_completion.choices[0].message.content))
+
+    async def aclose(self) -> None:
+        if self.__client is not None:
+            self.__client.close()
+            self.__client = None
+        if self.__async_client is not None:
+            await self.__async_client.close()
+            self.__async_client = None
@@ -0,0 +1,44 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    Token bucket limiting how many calls per minute are started. Up to `burst`
+    calls may start at once, after that calls are admitted at the refill rate.
+
+    The bucket state is guarded by a thread lock and not bound to an event loop,
+    so one limiter can be shared by all requests of the process.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None, burst: int = 1):
+        self.__rate = requests_per_minute / 60 if requests_per_minute else None
+        self.__capacity = float(max(burst, 1))
+        self.__tokens = self.__capacity
+        self.__updated_at = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def __reserve(self) -> float:
+        """Take a token and return how long the caller has to wait for it."""
+        if self.__rate is None:
+            return 0.0
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.__capacity, self.__tokens + (now - self.__updated_at) * self.__rate)
+            self.__updated_at = now
+            self.__tokens -= 1
+            if self.__tokens >= 0:
+                return 0.0
+            return -self.__tokens / self.__rate
+
+    async def acquire(self) -> None:
+        wait = self.__reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def acquire_blocking(self) -> None:
+        wait = self.__reserve()
+        if wait > 0:
+            time.sleep(wait)
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import threading
+import time
+from typing import List, Optional, Union
+
+from app.web_crawler.news_repos import SqliteNewsRepo
+from app.web_crawler.news_sources import GoogleNewsSource
+from app.web_crawler.summarizers import Summarizer, create_summarizer_from_env
+from app.web_crawler.workflow import acrawl_topic
+
+
+def parse_topics(topics: Union[str, List[str]]) -> List[str]:
+    if isinstance(topics, str):
+        topics = topics.split(",")
+    return [topic.strip() for topic in topics if topic.strip()]
+
+
+class PreCrawler:
+    """
+    Crawls a fixed list of topics every `interval` seconds into the article
+    store, so that requests for these topics are answered from warm data.
+
+    Run it in-process with start()/stop() (a daemon thread) or as a separate
+    worker with run_forever(), see app/web_crawler/workflow.py. All crawls of
+    run_forever share one event loop, so the summarizer's clients keep their
+    connections between crawls.
+    """
+
+    def __init__(
+        self,
+        topics: List[str],
+        interval: float,
+        repo: SqliteNewsRepo,
+        summarizer: Summarizer,
+        limit: int = 5,
+    ):
+        self.topics = topics
+        self.interval = interval
+        self.__repo = repo
+        self.__summarizer = summarizer
+        self.__limit = limit
+        self.__stop = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, topics: Union[str, List[str], None] = None, interval: Optional[float] = None) -> "PreCrawler":
+        """Create a pre-crawler configured by PRECRAWL_TOPICS, PRECRAWL_INTERVAL and PRECRAWL_LIMIT."""
+        return cls(
+            topics=parse_topics(topics if topics is not None else os.getenv("PRECRAWL_TOPICS", "")),
+            interval=interval if interval is not None else float(os.getenv("PRECRAWL_INTERVAL", 1800)),
+            repo=SqliteNewsRepo.from_env(),
+            summarizer=create_summarizer_from_env(),
+            limit=int(os.getenv("PRECRAWL_LIMIT", 5)),
+        )
+
+    def run_once(self, runner: Optional[asyncio.Runner] = None) -> None:
+        if runner is None:
+            with asyncio.Runner() as runner:
+                self.run_once(runner)
+                # The summarizer's clients belong to the runner's loop
+                runner.run(self.__summarizer.aclose())
+                return
+        for topic in self.topics:
+            if self.__stop.is_set():
+                return
+            start = time.perf_counter()
+            try:
+                articles = runner.run(acrawl_topic(topic, GoogleNewsSource(), self.__summarizer, self.__repo, limit=self.__limit))
+                print(f"Pre-crawled '{topic}': {len(articles)} articles in {time.perf_counter() - start:.1f}s")
+            except Exception as e:
+                print(f"Pre-crawling '{topic}' failed: {e}")
+
+    def run_forever(self) -> None:
+        if not self.topics:
+            print("No topics to pre-crawl")
+            return
+        with asyncio.Runner() as runner:
+            while not self.__stop.is_set():
+                self.run_once(runner)
+                self.__stop.wait(self.interval)
+            runner.run(self.__summarizer.aclose())
+
+    def start(self) -> None:
+        if self.__thread is not None and self.__thread.is_alive():
+            return
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.run_forever, name="pre-crawler", daemon=True)
+        self.__thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout)
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import pathlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Parameters that do not change the search results
+IGNORED_PARAMETERS = {"api_key", "output", "no_cache", "async"}
+
+
+def normalize_search_parameters(search_parameters: dict) -> dict:
+    """
+    Normalize search parameters so that equivalent searches share a cache entry:
+    keys are lower case, string values are stripped and the query is lower case
+    with collapsed whitespace.
+    """
+    normalized = {}
+    for key, value in search_parameters.items():
+        key = str(key).strip().lower()
+        if key in IGNORED_PARAMETERS:
+            continue
+        if isinstance(value, str):
+            value = " ".join(value.split())
+            if key == "q":
+                value = value.lower()
+        normalized[key] = value
+    return normalized
+
+
+def search_cache_key(search_parameters: dict) -> str:
+    normalized = normalize_search_parameters(search_parameters)
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """
+    Two tier TTL cache for search results. Results are kept in a bounded in-memory
+    LRU and in one JSON file per search in `directory`, so they survive restarts
+    and are shared between worker processes.
+    """
+
+    def __init__(self, directory: Optional[str] = "work/cache/search", ttl: float = 900, max_memory_entries: int = 256):
+        self.__directory = pathlib.Path(directory) if directory else None
+        if self.__directory is not None:
+            self.__directory.mkdir(parents=True, exist_ok=True)
+        self.__ttl = ttl
+        self.__max_memory_entries = max_memory_entries
+        self.__memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["SearchCache"]:
+        """
+        Create a cache configured by SEARCH_CACHE_TTL (seconds, 0 disables the cache)
+        and SEARCH_CACHE_DIR (empty string keeps the cache in memory only).
+        """
+        ttl = float(os.getenv("SEARCH_CACHE_TTL", 900))
+        if ttl <= 0:
+            return None
+        return cls(directory=os.getenv("SEARCH_CACHE_DIR", "work/cache/search"), ttl=ttl)
+
+    def __path(self, key: str) -> pathlib.Path:
+        return self.__directory / f"{key}.json"
+
+    def get(self, search_parameters: dict) -> Optional[dict]:
+        key = search_cache_key(search_parameters)
+        now = time.time()
+        with self.__lock:
+            if key in self.__memory:
+                stored_at, result = self.__memory[key]
+                if now - stored_at < self.__ttl:
+                    self.__memory.move_to_end(key)
+                    return result
+                del self.__memory[key]
+
+        if self.__directory is None:
+            return None
+        try:
+            with open(self.__path(key), "r", encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if now - entry["stored_at"] >= self.__ttl:
+            return None
+        self.__remember(key, entry["stored_at"], entry["result"])
+        return entry["result"]
+
+    def put(self, search_parameters: dict, result: dict) -> None:
+        key = search_cache_key(search_parameters)
+        stored_at = time.time()
+        self.__remember(key, stored_at, result)
+        if self.__directory is None:
+            return
+        entry = {
+            "stored_at": stored_at,
+            "search_parameters": normalize_search_parameters(search_parameters),
+            "result": result,
+        }
+        path = self.__path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(entry, file)
+        os.replace(tmp_path, path)
+
+    def __remember(self, key: str, stored_at: float, result: dict) -> None:
+        with self.__lock:
+            self.__memory[key] = (stored_at, result)
+            self.__memory.move_to_end(key)
+            while len(self.__memory) > self.__max_memory_entries:
+                self.__memory.popitem(last=False)
+
+
+_default_search_cache: Optional[SearchCache] = None
+
+
+def default_search_cache() -> Optional[SearchCache]:
+    """Process wide search cache, created from the environment on first use."""
+    global _default_search_cache
+    if _default_search_cache is None:
+        _default_search_cache = SearchCache.from_env()
+    return _default_search_cache
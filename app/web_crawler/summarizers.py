@@ -1,7 +1,45 @@
+import asyncio
+import itertools
+import json
 import os
+import re
+import threading
 
 from abc import ABC, abstractmethod
-from groq import Groq
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+from groq import AsyncGroq, Groq
+from pydantic import BaseModel, Field
+
+from app.helper_functions import count_tokens
+from app.web_crawler.rate_limiter import RateLimiter
+from app.web_crawler.summary_cache import SummaryCache, default_summary_cache, summary_cache_key
+
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])[\"'”’)\]]*\s+|\n+")
+
+
+def iter_sentences(text: str) -> Iterator[str]:
+    """Yield the sentences (and separate lines) of a text one at a time."""
+    start = 0
+    for boundary in SENTENCE_BOUNDARY.finditer(text):
+        sentence = text[start:boundary.end()].strip()
+        if sentence:
+            yield sentence
+        start = boundary.end()
+    sentence = text[start:].strip()
+    if sentence:
+        yield sentence
+
+
+class SummaryResult(BaseModel):
+    summary: str = Field(default="", description="The summary, empty if summarization failed")
+    error: Optional[str] = Field(default=None, description="Why summarization failed")
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 class Summarizer(ABC):
@@ -9,6 +47,30 @@ class Summarizer(ABC):
     def get_summary(self, text_to_summarize: str) -> str:
         pass
 
+    def get_summaries(self, texts_to_summarize: List[str], min_length=100, max_length=150) -> List[SummaryResult]:
+        """
+        Summarize several texts. Returns one result per text in the same order, a
+        failure is reported in the result instead of raising.
+
+        This default implementation summarizes one text after the other.
+        """
+        results = []
+        for text_to_summarize in texts_to_summarize:
+            try:
+                summary = self.get_summary(text_to_summarize, min_length=min_length, max_length=max_length)
+                results.append(SummaryResult(summary=summary))
+            except Exception as e:
+                results.append(SummaryResult(error=str(e)))
+        return results
+
+    async def aget_summaries(self, texts_to_summarize: List[str], min_length=100, max_length=150) -> List[SummaryResult]:
+        """Async variant of get_summaries, by default run in a worker thread."""
+        return await asyncio.to_thread(self.get_summaries, texts_to_summarize, min_length, max_length)
+
+    async def aclose(self) -> None:
+        """Close the API clients of the summarizer, if it has any."""
+        pass
+
 
 INCLUDE_TRANSFORMER_SUMMARIZER = False
 if INCLUDE_TRANSFORMER_SUMMARIZER:
@@ -24,29 +86,487 @@ if INCLUDE_TRANSFORMER_SUMMARIZER:
             return summary
 
 
+_groq_rate_limiter: Optional[RateLimiter] = None
+_groq_rate_limiter_lock = threading.Lock()
+
+
+def groq_rate_limiter() -> RateLimiter:
+    """
+    Rate limiter shared by all SummarizerUsingGroq instances, Groq's limits apply
+    per API key. Configured by SUMMARIZER_REQUESTS_PER_MINUTE and
+    SUMMARIZER_MAX_CONCURRENCY on first use, so after .env was loaded.
+    """
+    global _groq_rate_limiter
+    with _groq_rate_limiter_lock:
+        if _groq_rate_limiter is None:
+            _groq_rate_limiter = RateLimiter(
+                requests_per_minute=float(os.getenv("SUMMARIZER_REQUESTS_PER_MINUTE", 30)),
+                burst=int(os.getenv("SUMMARIZER_MAX_CONCURRENCY", 5)),
+            )
+    return _groq_rate_limiter
+
+
 class SummarizerUsingGroq(Summarizer):
-    def __init__(self):
-        self.__client = Groq(
-            api_key=os.environ.get("GROQ_API_KEY"),
-        )
+    """
+    Summarizer using a Groq hosted LLM.
 
-    def get_summary(self, text_to_summarize: str, min_length=100, max_length=150) -> str:
-        try:
-            chat_completion = self.__client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "user",
-                        "content": f"""
+    get_summaries runs the completions concurrently (at most `max_concurrency` at a
+    time and within the process wide groq_rate_limiter()). With `pack_token_budget`
+    set, texts shorter than `short_text_tokens` are packed into shared completions
+    of at most that many input tokens; a pack whose answer cannot be parsed is
+    retried one text at a time.
+
+    aget_summaries uses `async_client` for all batches. Its connections belong
+    to the event loop it is first used on, so share a summarizer only within
+    one event loop; get_summaries runs its own loop with its own client. The
+    clients are created on first use, so a summarizer can be created without
+    GROQ_API_KEY; aclose closes them.
+    """
+
+    def __init__(
+        self,
+        model: str = "llama3-8b-8192",
+        max_concurrency: int = None,
+        pack_token_budget: int = None,
+        short_text_tokens: int = 600,
+        async_client: Optional[AsyncGroq] = None,
+    ):
+        self.__client: Optional[Groq] = None
+        self.__async_client = async_client
+        self.model = model
+        self.__max_concurrency = max_concurrency or int(os.getenv("SUMMARIZER_MAX_CONCURRENCY", 5))
+        if pack_token_budget is None:
+            pack_token_budget = int(os.getenv("SUMMARIZER_PACK_TOKENS", 0))
+        self.__pack_token_budget = pack_token_budget
+        self.__short_text_tokens = short_text_tokens
+
+    @staticmethod
+    def __prompt(text_to_summarize: str, min_length: int) -> str:
+        return f"""
                         Summarize the following text with less than {min_length} words:
 
                         {text_to_summarize}
 
                         Return only a string of the summary without quotation mark, newline characters or other text.
                     """
+
+    @staticmethod
+    def __packed_prompt(texts_to_summarize: List[str], min_length: int) -> str:
+        numbered_texts = "\n\n".join(f"TEXT {i + 1}:\n{text}" for i, text in enumerate(texts_to_summarize))
+        return f"""
+                        Summarize each of the following {len(texts_to_summarize)} texts separately with less than {min_length} words:
+
+                        {numbered_texts}
+
+                        Return only a JSON array with one summary string per text, in the order of the texts. No other text is required.
+                    """
+
+    def get_summary(self, text_to_summarize: str, min_length=100, max_length=150) -> str:
+        try:
+            groq_rate_limiter().acquire_blocking()
+            if self.__client is None:
+                self.__client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+            chat_completion = self.__client.chat.completions.create(
+                messages=[
+                    {
+                        "role": "user",
+                        "content": self.__prompt(text_to_summarize, min_length)
                     }
                 ],
-                model="llama3-8b-8192",
+                model=self.model,
             )
             return chat_completion.choices[0].message.content
         except Exception as e:
+            print(f"Summarization failed: {e}")
             return ""
+
+    def get_summaries(self, texts_to_summarize: List[str], min_length=100, max_length=150) -> List[SummaryResult]:
+        async def summarize_all() -> List[SummaryResult]:
+            # A new event loop, the shared client cannot be used on it
+            async with AsyncGroq(api_key=os.environ.get("GROQ_API_KEY")) as client:
+                return await self.__summarize_all(client, texts_to_summarize, min_length)
+
+        return asyncio.run(summarize_all())
+
+    async def aget_summaries(self, texts_to_summarize: List[str], min_length=100, max_length=150) -> List[SummaryResult]:
+        if self.__async_client is None:
+            self.__async_client = AsyncGroq(api_key=os.environ.get("GROQ_API_KEY"))
+        return await self.__summarize_all(self.__async_client, texts_to_summarize, min_length)
+
+    async def aclose(self) -> None:
+        if self.__client is not None:
+            self.__client.close()
+            self.__client = None
+        if self.__async_client is not None:
+            await self.__async_client.close()
+            self.__async_client = None
+
+    def __packs(self, texts_to_summarize: List[str]) -> List[List[int]]:
+        """Group the indices of the texts, short texts share a pack within the token budget."""
+        if not self.__pack_token_budget:
+            return [[i] for i in range(len(texts_to_summarize))]
+        packs, current, current_tokens = [], [], 0
+        for i, text in enumerate(texts_to_summarize):
+            tokens = count_tokens(text)
+            if tokens > self.__short_text_tokens:
+                packs.append([i])
+                continue
+            if current and current_tokens + tokens > self.__pack_token_budget:
+                packs.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            packs.append(current)
+        return packs
+
+    async def __complete(self, client: AsyncGroq, limit: asyncio.Semaphore, prompt: str) -> str:
+        async with limit:
+            await groq_rate_limiter().acquire()
+            chat_completion = await client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=self.model,
+            )
+        return chat_completion.choices[0].message.content
+
+    async def __summarize_one(self, client, limit, text_to_summarize: str, min_length: int) -> SummaryResult:
+        try:
+            summary = await self.__complete(client, limit, self.__prompt(text_to_summarize, min_length))
+            return SummaryResult(summary=summary)
+        except Exception as e:
+            return SummaryResult(error=f"{type(e).__name__}: {e}")
+
+    async def __summarize_pack(self, client, limit, texts_to_summarize: List[str], min_length: int) -> List[SummaryResult]:
+        if len(texts_to_summarize) == 1:
+            return [await self.__summarize_one(client, limit, texts_to_summarize[0], min_length)]
+        try:
+            answer = await self.__complete(client, limit, self.__packed_prompt(texts_to_summarize, min_length))
+            summaries = json.loads(answer[answer.index("["):answer.rindex("]") + 1])
+            if len(summaries) == len(texts_to_summarize) and all(isinstance(s, str) for s in summaries):
+                return [SummaryResult(summary=summary) for summary in summaries]
+        except Exception as e:
+            print(f"Packed summarization failed, summarizing the texts one by one: {e}")
+        return list(await asyncio.gather(
+            *(self.__summarize_one(client, limit, text, min_length) for text in texts_to_summarize)
+        ))
+
+    async def __summarize_all(self, client: AsyncGroq, texts_to_summarize: List[str], min_length: int) -> List[SummaryResult]:
+        limit = asyncio.Semaphore(self.__max_concurrency)
+        packs = self.__packs(texts_to_summarize)
+        pack_results = await asyncio.gather(
+            *(self.__summarize_pack(client, limit, [texts_to_summarize[i] for i in pack], min_length) for pack in packs)
+        )
+        results: List[Optional[SummaryResult]] = [None] * len(texts_to_summarize)
+        for pack, pack_result in zip(packs, pack_results):
+            for i, result in zip(pack, pack_result):
+                results[i] = result
+        return results
+
+
+class CachedSummarizer(Summarizer):
+    """
+    Wraps any Summarizer and skips the summarization of texts whose summary is
+    already known. Summaries are cached by a hash of the text, the wrapped
+    summarizer's model (or class name) and the requested lengths; failed
+    summarizations are not cached.
+    """
+
+    def __init__(self, summarizer: Summarizer, cache: Optional[SummaryCache] = None):
+        self.__summarizer = summarizer
+        self.__cache = cache or default_summary_cache()
+        self.model = getattr(summarizer, "model", type(summarizer).__name__)
+
+    def __key(self, text_to_summarize: str, min_length, max_length) -> str:
+        return summary_cache_key(text_to_summarize, self.model, min_length, max_length)
+
+    def get_summary(self, text_to_summarize: str, min_length=100, max_length=150) -> str:
+        key = self.__key(text_to_summarize, min_length, max_length)
+        summary = self.__cache.get(key)
+        if summary is None:
+            summary = self.__summarizer.get_summary(text_to_summarize, min_length=min_length, max_length=max_length)
+            if summary:
+                self.__cache.put(key, summary)
+        return summary
+
+    def __lookup(self, texts_to_summarize: List[str], min_length, max_length):
+        keys = [self.__key(text, min_length, max_length) for text in texts_to_summarize]
+        results: List[Optional[SummaryResult]] = []
+        missing = {}  # key -> text, identical texts are summarized once
+        for key, text in zip(keys, texts_to_summarize):
+            summary = self.__cache.get(key)
+            results.append(SummaryResult(summary=summary) if summary is not None else None)
+            if summary is None:
+                missing.setdefault(key, text)
+        return keys, results, missing
+
+    def __merge(self, keys, results, missing, missing_results) -> List[SummaryResult]:
+        fetched = dict(zip(missing.keys(), missing_results))
+        for key, result in fetched.items():
+            if result.ok and result.summary:
+                self.__cache.put(key, result.summary)
+        return [result if result is not None else fetched[key] for key, result in zip(keys, results)]
+
+    def get_summaries(self, texts_to_summarize: List[str], min_length=100, max_length=150) -> List[SummaryResult]:
+        keys, results, missing = self.__lookup(texts_to_summarize, min_length, max_length)
+        missing_results = []
+        if missing:
+            missing_results = self.__summarizer.get_summaries(list(missing.values()), min_length=min_length, max_length=max_length)
+        return self.__merge(keys, results, missing, missing_results)
+
+    async def aget_summaries(self, texts_to_summarize: List[str], min_length=100, max_length=150) -> List[SummaryResult]:
+        keys, results, missing = self.__lookup(texts_to_summarize, min_length, max_length)
+        missing_results = []
+        if missing:
+            missing_results = await self.__summarizer.aget_summaries(list(missing.values()), min_length=min_length, max_length=max_length)
+        return self.__merge(keys, results, missing, missing_results)
+
+    async def aclose(self) -> None:
+        await self.__summarizer.aclose()
+
+
+class SummarizerUsingLexRank(Summarizer):
+    """
+    Local, CPU only extractive summarizer. Sentences are represented as TF-IDF
+    vectors, ranked with LexRank (PageRank on the graph of sentence cosine
+    similarities) and the best ones are returned in their original order.
+
+    The matrices are dense and grow with the square of the number of sentences,
+    so only the first `max_sentences` sentences of a text are ranked; the
+    beginning of an article is what matters.
+    """
+
+    def __init__(
+        self, similarity_threshold: float = 0.1, damping: float = 0.85, min_sentence_words: int = 4, max_sentences: int = 400
+    ):
+        self.model = "lexrank"
+        self.__similarity_threshold = similarity_threshold
+        self.__damping = damping
+        self.__min_sentence_words = min_sentence_words
+        self.__max_sentences = max_sentences
+
+    def rank_sentences(self, text: str) -> tuple:
+        """
+        :return: The sentences of the text (at most max_sentences) and their LexRank scores
+        """
+        sentences = list(itertools.islice(
+            (s for s in iter_sentences(text) if len(s.split()) >= self.__min_sentence_words), self.__max_sentences
+        ))
+        if len(sentences) < 2:
+            return sentences, np.ones(len(sentences))
+
+        vocabulary = {}
+        rows, columns = [], []
+        for i, sentence in enumerate(sentences):
+            for word in re.findall(r"\w{2,}", sentence.lower()):
+                rows.append(i)
+                columns.append(vocabulary.setdefault(word, len(vocabulary)))
+        term_frequencies = np.zeros((len(sentences), len(vocabulary)), dtype=np.float32)
+        np.add.at(term_frequencies, (rows, columns), 1)
+
+        document_frequencies = np.count_nonzero(term_frequencies, axis=0)
+        tf_idf = term_frequencies * np.log(len(sentences) / document_frequencies).astype(np.float32)
+        del term_frequencies
+        norms = np.linalg.norm(tf_idf, axis=1, keepdims=True)
+        tf_idf = np.divide(tf_idf, norms, out=np.zeros_like(tf_idf), where=norms > 0)
+
+        n = len(sentences)
+        adjacency = (tf_idf @ tf_idf.T >= self.__similarity_threshold).astype(float)
+        degrees = adjacency.sum(axis=1, keepdims=True)
+        # Sentences without counted terms are similar to nothing, not even themselves;
+        # like dangling pages in PageRank they link to all sentences
+        transitions = np.divide(adjacency, degrees, out=np.full_like(adjacency, 1 / n), where=degrees > 0)
+        scores = np.full(n, 1 / n)
+        for _ in range(100):
+            updated = (1 - self.__damping) / n + self.__damping * (transitions.T @ scores)
+            if np.abs(updated - scores).sum() < 1e-6:
+                break
+            scores = updated
+        return sentences, scores
+
+    def select(self, text: str, max_tokens: int) -> str:
+        """Keep the best ranked sentences that fit into max_tokens, in their original order."""
+        sentences, scores = self.rank_sentences(text)
+        selected, used = [], 0
+        for i in np.argsort(-scores, kind="stable"):
+            tokens = count_tokens(sentences[i])
+            if used + tokens > max_tokens:
+                continue
+            selected.append(i)
+            used += tokens
+        return " ".join(sentences[i] for i in sorted(selected))
+
+    def get_summary(self, text_to_summarize: str, min_length=100, max_length=150) -> str:
+        sentences, scores = self.rank_sentences(text_to_summarize)
+        selected, words = [], 0
+        for i in np.argsort(-scores, kind="stable"):
+            sentence_words = len(sentences[i].split())
+            if words >= min_length or words + sentence_words > max_length:
+                continue
+            selected.append(i)
+            words += sentence_words
+        return " ".join(sentences[i] for i in sorted(selected))
+
+
+class PrefilteringSummarizer(Summarizer):
+    """
+    Cuts texts longer than `max_input_tokens` down to their most central sentences
+    (see SummarizerUsingLexRank) before handing them to another, typically LLM
+    based, summarizer.
+
+    When the wrapped summarizer is a ChunkingSummarizer, `max_input_tokens` has
+    to be larger than its chunk size, otherwise no text would ever be chunked.
+    """
+
+    def __init__(self, summarizer: Summarizer, max_input_tokens: int = 1500, extractor: SummarizerUsingLexRank = None):
+        chunk_tokens = getattr(summarizer, "max_chunk_tokens", None)
+        if chunk_tokens is not None and max_input_tokens <= chunk_tokens:
+            raise ValueError(
+                f"The prefilter budget ({max_input_tokens} tokens) must be larger than "
+                f"the chunk size ({chunk_tokens} tokens) of the wrapped summarizer"
+            )
+        self.__summarizer = summarizer
+        self.__max_input_tokens = max_input_tokens
+        self.__extractor = extractor or SummarizerUsingLexRank()
+        self.model = f"{getattr(summarizer, 'model', type(summarizer).__name__)}+lexrank{max_input_tokens}"
+
+    def prefilter(self, text_to_summarize: str) -> str:
+        if count_tokens(text_to_summarize) <= self.__max_input_tokens:
+            return text_to_summarize
+        return self.__extractor.select(text_to_summarize, self.__max_input_tokens)
+
+    def get_summary(self, text_to_summarize: str, min_length=100, max_length=150) -> str:
+        return self.__summarizer.get_summary(self.prefilter(text_to_summarize), min_length=min_length, max_length=max_length)
+
+    def get_summaries(self, texts_to_summarize: List[str], min_length=100, max_length=150) -> List[SummaryResult]:
+        texts = [self.prefilter(text) for text in texts_to_summarize]
+        return self.__summarizer.get_summaries(texts, min_length=min_length, max_length=max_length)
+
+    async def aget_summaries(self, texts_to_summarize: List[str], min_length=100, max_length=150) -> List[SummaryResult]:
+        # LexRank is CPU bound, keep it off the event loop
+        texts = await asyncio.to_thread(lambda: [self.prefilter(text) for text in texts_to_summarize])
+        return await self.__summarizer.aget_summaries(texts, min_length=min_length, max_length=max_length)
+
+    async def aclose(self) -> None:
+        await self.__summarizer.aclose()
+
+
+def iter_chunks(text: str, max_chunk_tokens: int) -> Iterator[str]:
+    """
+    Yield consecutive chunks of a text of at most max_chunk_tokens tokens each,
+    split on sentence boundaries. Sentences longer than a chunk are split on words.
+    """
+    chunk, chunk_tokens = [], 0
+    for sentence in iter_sentences(text):
+        tokens = count_tokens(sentence)
+        if tokens > max_chunk_tokens:
+            words = sentence.split()
+            words_per_part = max(1, len(words) * max_chunk_tokens // tokens)
+            parts = (" ".join(words[i:i + words_per_part]) for i in range(0, len(words), words_per_part))
+        else:
+            parts = (sentence,)
+        for part in parts:
+            part_tokens = tokens if part is sentence else count_tokens(part)
+            if chunk and chunk_tokens + part_tokens > max_chunk_tokens:
+                yield " ".join(chunk)
+                chunk, chunk_tokens = [], 0
+            chunk.append(part)
+            chunk_tokens += part_tokens
+    if chunk:
+        yield " ".join(chunk)
+
+
+class ChunkingSummarizer(Summarizer):
+    """
+    Map-reduce summarization of texts that do not fit into the context window of
+    the wrapped summarizer. Texts above `max_chunk_tokens` are split into chunks
+    on sentence boundaries, the chunks are produced lazily and summarized
+    `batch_size` at a time (so concurrently for SummarizerUsingGroq) and the
+    chunk summaries of every text are summarized again, repeatedly if they still
+    do not fit.
+    """
+
+    def __init__(self, summarizer: Summarizer, max_chunk_tokens: int = 3000, max_rounds: int = 3, batch_size: int = 16):
+        self.__summarizer = summarizer
+        self.__max_chunk_tokens = max_chunk_tokens
+        self.__max_rounds = max_rounds
+        self.__batch_size = batch_size
+        self.model = getattr(summarizer, "model", type(summarizer).__name__)
+
+    @property
+    def max_chunk_tokens(self) -> int:
+        return self.__max_chunk_tokens
+
+    def get_summary(self, text_to_summarize: str, min_length=100, max_length=150) -> str:
+        result = self.get_summaries([text_to_summarize], min_length=min_length, max_length=max_length)[0]
+        if not result.ok:
+            print(f"Summarization failed: {result.error}")
+        return result.summary
+
+    def get_summaries(self, texts_to_summarize: List[str], min_length=100, max_length=150) -> List[SummaryResult]:
+        return asyncio.run(self.aget_summaries(texts_to_summarize, min_length=min_length, max_length=max_length))
+
+    def __iter_chunks(self, texts: List[Optional[str]]) -> Iterator[Tuple[int, str]]:
+        """(index of the text, chunk) of every text that is too long, the texts are cleared as they are chunked."""
+        for i, text in enumerate(texts):
+            if text is None or count_tokens(text) <= self.__max_chunk_tokens:
+                continue
+            texts[i] = None
+            for chunk in iter_chunks(text, self.__max_chunk_tokens):
+                yield i, chunk
+
+    async def aget_summaries(self, texts_to_summarize: List[str], min_length=100, max_length=150) -> List[SummaryResult]:
+        texts: List[Optional[str]] = list(texts_to_summarize)
+        errors: List[Optional[str]] = [None] * len(texts)
+        for _ in range(self.__max_rounds):
+            # Map: every text that is too long is replaced by the joined summaries of its chunks
+            chunk_summaries = {}
+            chunked = set()
+            chunks = self.__iter_chunks(texts)
+            while batch := list(itertools.islice(chunks, self.__batch_size)):
+                owners = [i for i, _ in batch]
+                chunked.update(owners)
+                chunk_results = await self.__summarizer.aget_summaries(
+                    [chunk for _, chunk in batch], min_length=min_length, max_length=max_length
+                )
+                for i, result in zip(owners, chunk_results):
+                    if result.ok and result.summary:
+                        chunk_summaries.setdefault(i, []).append(result.summary)
+                    else:
+                        errors[i] = result.error or "empty chunk summary"
+            if not chunked:
+                break
+            for i in chunked:
+                if i in chunk_summaries:
+                    texts[i] = "\n".join(chunk_summaries[i])
+
+        # Reduce: summarize what is left of every text in one batch
+        pending = [i for i, text in enumerate(texts) if text is not None]
+        final_results = await self.__summarizer.aget_summaries(
+            [texts[i] for i in pending], min_length=min_length, max_length=max_length
+        )
+        results = [SummaryResult(error=error or "text could not be summarized") for error in errors]
+        for i, result in zip(pending, final_results):
+            results[i] = result
+        return results
+
+    async def aclose(self) -> None:
+        await self.__summarizer.aclose()
+
+
+def create_summarizer_from_env() -> Summarizer:
+    """
+    The summarizer used by the crawler: Groq and cached summaries. Texts are cut
+    to their central sentences first (SUMMARIZER_PREFILTER_TOKENS, 0 disables),
+    what is left is summarized chunk by chunk if it is longer than
+    SUMMARIZER_CHUNK_TOKENS. The prefilter budget has to be larger than the
+    chunk size. Close the summarizer with aclose on the event loop it was used on.
+    """
+    summarizer: Summarizer = ChunkingSummarizer(
+        # One client for all batches of this summarizer, created on first use
+        SummarizerUsingGroq(),
+        max_chunk_tokens=int(os.getenv("SUMMARIZER_CHUNK_TOKENS", 3000)),
+    )
+    prefilter_tokens = int(os.getenv("SUMMARIZER_PREFILTER_TOKENS", 9000))
+    if prefilter_tokens > 0:
+        summarizer = PrefilteringSummarizer(summarizer, max_input_tokens=prefilter_tokens)
+    return CachedSummarizer(summarizer)
@@ -0,0 +1,104 @@
+import hashlib
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+def summary_cache_key(text_to_summarize: str, model: str, min_length: int, max_length: int) -> str:
+    digest = hashlib.sha256()
+    for part in (model, str(min_length), str(max_length), text_to_summarize):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """
+    Cache of summaries keyed by summary_cache_key. A bounded in-memory LRU is
+    backed by an optional SQLite file, so known summaries survive restarts.
+    """
+
+    def __init__(self, max_entries: int = 1024, path: Optional[str] = None):
+        self.__max_entries = max_entries
+        self.__memory: "OrderedDict[str, str]" = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__path = path
+        self.__local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        if path is not None:
+            pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+            with self.__connection() as connection:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, summary TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+
+    @classmethod
+    def from_env(cls) -> "SummaryCache":
+        """
+        Create a cache configured by SUMMARY_CACHE_SIZE (entries kept in memory) and
+        SUMMARY_CACHE_PATH (SQLite file, an empty string keeps the cache in memory only).
+        """
+        return cls(
+            max_entries=int(os.getenv("SUMMARY_CACHE_SIZE", 1024)),
+            path=os.getenv("SUMMARY_CACHE_PATH", "work/cache/summaries.sqlite3") or None,
+        )
+
+    def __connection(self) -> sqlite3.Connection:
+        connection = getattr(self.__local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.__path, timeout=30)
+            self.__local.connection = connection
+        return connection
+
+    def __remember(self, key: str, summary: str) -> None:
+        with self.__lock:
+            self.__memory[key] = summary
+            self.__memory.move_to_end(key)
+            while len(self.__memory) > self.__max_entries:
+                self.__memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        with self.__lock:
+            summary = self.__memory.get(key)
+            if summary is not None:
+                self.__memory.move_to_end(key)
+                self.hits += 1
+                return summary
+
+        if self.__path is not None:
+            row = self.__connection().execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.__remember(key, row[0])
+                with self.__lock:
+                    self.hits += 1
+                return row[0]
+
+        with self.__lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, summary: str) -> None:
+        self.__remember(key, summary)
+        if self.__path is not None:
+            with self.__connection() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO summaries (key, summary, created_at) VALUES (?, ?, ?)",
+                    (key, summary, time.time()),
+                )
+
+
+_default_summary_cache: Optional[SummaryCache] = None
+
+
+def default_summary_cache() -> SummaryCache:
+    """Process wide summary cache, created from the environment on first use."""
+    global _default_summary_cache
+    if _default_summary_cache is None:
+        _default_summary_cache = SummaryCache.from_env()
+    return _default_summary_cache
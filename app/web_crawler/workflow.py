@@ -1,41 +1,81 @@
-from app.web_crawler.helpers import Timer
-from app.web_crawler.query_encoder import QueryEncoder
+import argparse
+import asyncio
+import os
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from app.web_crawler.data_model import NewsArticle
+from app.web_crawler.domain import NewsProvider
+from app.web_crawler.news_repos import SqliteNewsRepo, article_id_for
 from app.web_crawler.news_sources import GoogleNewsSource
-from app.web_crawler.summarizers import Summarizer, SummarizerUsingGroq
+from app.web_crawler.pipeline import CrawlPipeline
+from app.web_crawler.summarizers import Summarizer
+
+
+def crawl_topic(
+    topic: str,
+    news_source: GoogleNewsSource,
+    summarizer: Summarizer,
+    repo: Optional[SqliteNewsRepo] = None,
+    limit: int = 5,
+) -> List[NewsArticle]:
+    """
+    Search the news for a topic and return the summarized articles in ranking order.
+
+    With a repo, only the delta is crawled: stories that were already summarized
+    are taken from the repo, new ones are streamed through the crawl pipeline and
+    stored, and the topic is linked to the articles found.
+    """
+    return asyncio.run(acrawl_topic(topic, news_source, summarizer, repo=repo, limit=limit))
+
+
+async def acrawl_topic(
+    topic: str,
+    news_source: GoogleNewsSource,
+    summarizer: Summarizer,
+    repo: Optional[SqliteNewsRepo] = None,
+    limit: int = 5,
+) -> List[NewsArticle]:
+    """crawl_topic for callers running an event loop, the blocking search and store calls run in threads."""
+    await asyncio.to_thread(news_source.fetch, {"q": topic, "engine": "google_news", "gl": "us", "hl": "en"})
+    article_ids = list(dict.fromkeys(GoogleNewsSource.article_id(s) for s in news_source.collect_stories(limit)))
+    known = await asyncio.to_thread(repo.load_many, article_ids, NewsProvider.GOOGLE) if repo is not None else {}
+    print(f"Topic '{topic}': {len(article_ids)} stories, {len(known)} already known")
+
+    # Fetching, deduplication and summarization overlap, see CrawlPipeline
+    pipeline = CrawlPipeline(news_source, summarizer)
+    new_articles = {
+        article_id_for(news_article): news_article
+        for news_article in await pipeline.collect(None, limit=limit, skip_article_ids=known.keys())
+    }
+
+    if repo is not None:
+        def store():
+            repo.store_many(new_articles.values(), source=NewsProvider.GOOGLE, article_ids=new_articles.keys())
+            repo.store_topic(topic, [i for i in article_ids if i in known or i in new_articles])
+
+        await asyncio.to_thread(store)
+
+    articles = {**known, **new_articles}
+    return [articles[i] for i in article_ids if i in articles]
+
 
 if __name__ == "__main__":
-    t = Timer()
-    t.tic()
-    query_encoder = QueryEncoder()
-    t.toc("QueryEncoder()")
-    t.tic()
-    news_source = GoogleNewsSource()
-    t.toc("GoogleNewsSource()")
-
-    t.tic()
-    summarizer: Summarizer = SummarizerUsingGroq()
-    t.toc("SummarizerUsingGroq()")
-
-    t.tic()
-    topic = query_encoder.get_topic("Provide a summary of the latest AI news.")
-    t.toc("query_encoder.get_topic()")
-    print(f"Topic: {topic}")
-
-    t.tic()
-    news_source.fetch({
-        "q": topic,
-        "engine": "google_news",
-        "gl": "us",
-        "hl": "en"
-    })
-    complete_news_articles = news_source.get_news_content(limit=5)
-    t.toc("news_source.fetch()")
-    print(f"#articles: {len(complete_news_articles)}")
-
-    # text_to_summarize = """b'Artificial Intelligence Nudges Scientist to Try Simpler Approach to Quantum Entanglement\nSkip to content\nNews\nCapital Markets\nNational\nQuantum Computing Business\nResearch\nExclusives\nEducation\nFeatured\nInsights\nInterviews\nMedia\nReports\nWomen In Quantum\nSolutions\nAbout Us\nMenu\nNews\nCapital Markets\nNational\nQuantum Computing Business\nResearch\nExclusives\nEducation\nFeatured\nInsights\nInterviews\nMedia\nReports\nWomen In Quantum\nSolutions\nAbout Us\nSubscribe\nSignup\nNews\nQuantum Computing Business\nNational\nCapital Markets\nExclusives\nInsights\nEducation\nInterviews\nMedia\nIntro to quantum\nAdvisory\nAbout Us\nMarketing\nQ-munity\nNews\nQuantum Computing Business\nNational\nCapital Markets\nExclusives\nInsights\nEducation\nInterviews\nMedia\nIntro to quantum\nAdvisory\nAbout Us\nMarketing\nQ-munity\nContact Us\nGet demo\nArtificial Intelligence Nudges Scientist to Try Simpler Approach to Quantum Entanglement\nResearch\nMatt Swayne\nDecember 7, 2024\nInsider Brief\nThe team\xe2\x80\x99s new approach avoids starting with pre-entangled pairs or performing Bell-state measurements, relying instead on the indistinguishability of photon paths.\nAn AI tool called PyTheus, originally tasked with reproducing established entanglement-swapping protocols, unexpectedly revealed a simpler method to entangle independent photons.\nThis discovery reduces complexity in quantum networks and challenges long-held assumptions about what is required to generate entanglement at a distance.\nPRESS RELEASE \xe2\x80\x94 Physicists have discovered a simpler way to create quantum entanglement between two distant photons \xe2\x80\x94 without starting with entanglement, without resorting to Bell-state measurements, and even without detecting all ancillary photons \xe2\x80\x94 an advance that challenges long-held assumptions in quantum networking.\nAnd all it took was a friendly nudge from an artificial intelligence tool.\nAn international team of scientists led by researchers from Nanjing University and the Max Planck Institute for the Science of Light described their method in Physical Review Letters \xe2\x80\x94 accessed for this article through arXiv \xe2\x80\x94 that demonstrated entanglement can emerge from the indistinguishability of photon paths alone. Instead of relying on standard procedures that start from prepared entangled pairs and complex joint measurements, their technique leverages a basic quantum principle: when multiple photons could have come from several possible sources, erasing the clues to their origins can produce entanglement where none existed before.\nInterestingly \xe2\x80\x94 and perhaps even more importantly \xe2\x80\x94 this unexpected advance stems from the use of an artificial intelligence tool called PyTheus, initially relied on to rediscover a workhorse protocol in quantum communications known as entanglement swapping. Instead, the algorithm turned up something simpler. According to Mario Krenn, a research group leader of the\xc2\xa0Artificial Scientist Lab\xc2\xa0at the\xc2\xa0Max Planck Institute for the Science of Light, the solution the AI delivered seemed too straightforward at first.\n\xe2\x80\x9cWe discovered this idea coincidentally while applying PyTheus to quantum protocols,\xe2\x80\x9d Krenn wrote on X. \xe2\x80\x9cAs a first task, we aimed to rediscover entanglement swapping, one of the most crucial protocols in quantum networks. Curiously, the algorithm kept producing something else \xe2\x80\x94 something simpler \xe2\x80\x94 which we initially thought was incorrect.\xe2\x80\x9d\nAccording to the paper, entanglement swapping typically requires starting with two separate entangled pairs and performing a special joint measurement \xe2\x80\x94 called a Bell-state measurement \xe2\x80\x94 on one photon from each pair. This collapses the system, leaving the two other photons entangled even though they never interacted directly. It has been a cornerstone of quantum network design for decades. But in their new work, Krenn and his colleagues show there are other ways to achieve a similar end result without this chain of prerequisites.\nBy making all possible paths of photon generation identical, the team\xe2\x80\x99s scheme generates entanglement purely through the quantum uncertainty about origins. Overlooked for more than 25 years, Krenn writes that this simpler approach cuts away complexity. Instead of meticulously preparing entanglement and then using a Bell-state projection to distribute it, the method uses a superposition of different generation events to yield the same effect. This contrasts sharply with decades of conventional wisdom about what\xe2\x80\x99s \xe2\x80\x9crequired\xe2\x80\x9d to create entanglement at a distance.\n\xe2\x80\x9cFor me, this changed my perspective on what is necessary to create entanglement\xe2\x80\x94not because I now know what is necessary, but because we\xe2\x80\x99ve realized what is not,\xe2\x80\x9d Krenn wrote in the social media point.\nExperimentally Sound, Philosophically Intriguing\nThe PyTheus algorithm, according to Krenn, was tasked with re-deriving established protocols like entanglement swapping. Instead, it kept serving up a configuration that demanded less overhead. In classical logic, less resource-intensive often means inferior. But here, the surprising solution turned out to be experimentally sound and philosophically intriguing. Rather than using established building blocks like Bell-state measurements, the new approach exploits indistinguishable photon origins to tie together distant particles. It even allows for scenarios in which not all ancillary photons need to be detected, suggesting that resource requirements in future quantum networks might be lowered.\nIn the researchers\xe2\x80\x99 experiment, no prior entanglement source or measurement apparatus was required. By adjusting the photon sources and ensuring their outputs are indistinguishable, they created conditions where detecting photons at certain paths guaranteed that two others \xe2\x80\x94 never directly interacting \xe2\x80\x94 emerged entangled. This approach could simplify the construction of quantum links between distant locations and reduce the complexity of multi-node quantum networks, making them more scalable and potentially more practical.\nSuch a discovery could have implications for quantum communication and information processing. Quantum networks, aimed at enabling secure message transmission and distributed quantum computing, have long leaned on well-established methods like entanglement swapping. Now, a new generation of protocols may emerge that rely on fundamental quantum principles in more direct ways.\nTo be sure, as with all early-stage quantum demonstrations, scaling this method to realistic network lengths and larger numbers of photons remains a challenge. Environmental noise, losses, and device imperfections still loom large. But now that a previously unrecognized mechanism for generating entanglement has come to light, quantum engineers have fresh avenues to explore.\n\xe2\x80\x9cConventional, AI-discovered solutions are complex and it takes ages to understand what is going on,\xe2\x80\x9d Krenn wrote in his post. \xe2\x80\x9cIn this case, the solution was way simpler than we expected.\xe2\x80\x9d\nThe development underscores that as quantum technologies advance, AI-assisted discovery may be able to partner with human scientists to open up previously unimagined paths. Just as PyTheus inadvertently revealed that entanglement swapping wasn\xe2\x80\x99t the only game in town, future tools may find other hidden protocols that defy conventional wisdom. By stripping away decades-old assumptions, this result prompts researchers to reconsider what truly defines entanglement generation\xe2\x80\x94and what might be possible as they push quantum networks toward practical, wide-scale deployment.\nIndustry Implications?\nAlthough not directly addressed in the paper, the use of AI in identifying simpler, more efficient methods of producing quantum entanglement hints at needed help for the entire quantum computing ecosystem. By moving beyond human intuition and established routines, algorithms like PyTheus can rapidly uncover new protocols that shave down complexity, reduce resource overhead, and streamline quantum experiments.\nThe approach, itself, could also help engineers and researchers achieve more scalable quantum networks faster, laying groundwork not just for advances in secure communication, but for broader innovations in quantum sensors, simulators, and ultimately, practical quantum computers.\nFor a more technical look at the experiment, please review the paper available on Physical Review Letters and on arXiv.\nIn addition to Krenn, the study\xe2\x80\x99s authors include Kai Wang and Zhaohua Hou\xe2\x80\x94who contributed equally\xe2\x80\x94along with Kaiyi Qian, Leizhen Chen, Shining Zhu, and Xiao-Song Ma, all from the National Laboratory of Solid-state Microstructures, School of Physics, and the Collaborative Innovation Center of Advanced Microstructures at Nanjing University in China.\nAIArtificial IntelligenceBell-StateMario KrennPyTheusquantum entanglement\nMatt Swayne\nLinkedIn\nWith a several-decades long background in journalism and communications, Matt Swayne has worked as a science communicator for an R1 university for more than 12 years, specializing in translating high tech and deep tech for the general audience. He has served as a writer, editor and analyst at The Quantum Insider since its inception. In addition to his service as a science communicator, Matt also develops courses to improve the media and communications skills of scientists and has taught courses.\n[email\xc2\xa0protected]\nShare this article:\nRelevant\nMore\nGuest Post:\nThe Unexaggerated Magic of Quantum\nShai Phillips\nJanuary 17, 2024\nError-Mitigation Techniques Can Pump Up The Quantum Volume\nMatt Swayne\nMarch 16, 2022\nHSBC, IBM to Explore Using Quantum Computers for Financial Services\nMatt Swayne\nMarch 31, 2022\nEntropica Labs, Atom Computing Announce Strategic Partnership\nMatt Swayne\nJune 22, 2023\nResearchers Turn an Atomic Microscope into a Quantum\xc2\xa0Computer\nJames Dargan\nOctober 17, 2023\nRecommended\nMore\nQuantum Machine Learning Is The Next Big Thing\nMay 28, 2020\n12 Top Quantum Computing Universities in 2024\nApril 18, 2022\nSifting through the Clouds: Polish Researchers Will Test the Utility of Quantum Algorithms for Satellite Imagery\nMay 24, 2021\nKeep track of everything going on in the Quantum Technology Market.In one place.\nGet started\nRelated Articles\nView all\nGuest Post: Deep Tech Success \xe2\x80\x94 Redefining Your Commercial Strategy for 2025\nMatt Swayne\nDecember 7, 2024\nArtificial Intelligence Nudges Scientist to Try Simpler Approach to Quantum Entanglement\nMatt Swayne\nDecember 7, 2024\nIndia\xe2\x80\x99s National Quantum Mission Invites Israeli Startups: Building Global Partnerships for Quantum Technology\xe2\x80\x99s Future\nCierra Choucair\nDecember 6, 2024\nEY, IBM Guest Post \xe2\x80\x94 Up And Running on Day Two: How Businesses Can Prepare For Quantum\xe2\x80\x99s Promise\nResonance\nDecember 6, 2024\nImproved Performance of Superconducting Qubits Makes Investigation of Sapphire Substrates Compelling as an Alternative to Silicon\nJakob P\nDecember 14, 2023\nGuest Post: Reimagining Primary Care \xe2\x80\x94 Clinical Quantum, AI And The Role of Hackathons in Shaping a New Era For The NHS\nMatt Swayne\nDecember 1, 2024\nFrom Cat Qubits to Universal Quantum Computing: Alice & Bob\xe2\x80\x99s 2030 Roadmap Delivers High-Fidelity Solutions\nCierra Choucair\nDecember 4, 2024\nEntropica Labs and Xanadu Partner to Simplify Fault-Tolerant Quantum Computing\nCierra Choucair\nDecember 3, 2024\nSDT Secures $14.1M Pre-IPO Investment to Advance Korea\xe2\x80\x99s Quantum Technology Leadership\nCierra Choucair\nDecember 5, 2024\nQuantum Insider is the leading provider of media and market intelligence on the quantum technology industry.\nLinkedin-in\nYoutube\nInstagram\nFacebook-f\nTiktok\nFeatured News\nGuest Post: Deep Tech Success \xe2\x80\x94 Redefining Your Commercial Strategy for 2025\nDecember 7, 2024\nArtificial Intelligence Nudges Scientist to Try Simpler Approach to Quantum Entanglement\nDecember 7, 2024\nIndia\xe2\x80\x99s National Quantum Mission Invites Israeli Startups: Building Global Partnerships for Quantum Technology\xe2\x80\x99s Future\nDecember 6, 2024\nGuest Post: Deep Tech Success \xe2\x80\x94 Redefining Your Commercial Strategy for 2025\nDecember 7, 2024\nArtificial Intelligence Nudges Scientist to Try Simpler Approach to Quantum Entanglement\nDecember 7, 2024\nIndia\xe2\x80\x99s National Quantum Mission Invites Israeli Startups: Building Global Partnerships for Quantum Technology\xe2\x80\x99s Future\nDecember 6, 2024\nNavigate\nNews\nExclusives\nMarketing\nAdvisory\nReports\nNews\nExclusives\nMarketing\nAdvisory\nReports\nNews\nExclusives\nMarketing\nAdvisory\nReports\nNews\nExclusives\nMarketing\nAdvisory\nReports\nProjects\nResonance\nDigital Twin Insider\nSpace Impulse\nAI Insider\nClimate Insider\nContact Us\nEmail Us\nLegal\nPrivacy Policy\nTerms and Conditions\nEditorial Policy\n2024 \xc2\xa9Copyright Resonance Alliance Inc. All Rights Reserved\nDesigned by Resonance\nCookies\nWe use cookies to improve your experience on our site. By continuing to browse our site, you consent to our use of cookies. For more details, you can manage your preferences under "Settings".\nRead our cookie policy\nSettings\nAccept all\nCookies\nChoose what kind of cookies to accept. Your choice will be saved for one year.\nRead our cookie policy\nNecessary\nThese cookies are not optional. They are needed for the website to function.\nStatistics\nIn order for us to improve the website\'s functionality and structure, based on how the website is used.\nExperience\nIn order for our website to perform as well as possible during your visit. If you refuse these cookies, some functionality will disappear from the website.\nMarketing\nBy sharing your interests and behavior as you visit our site, you increase the chance of seeing personalized content and offers.\nSave\nAccept all\nSearch for:\n\xc3\x97\nThe weekly QC newsletter\nWelcome to our weekly QC newsletter. Yes, we know we are The Quantum Insider but we also appreciate that you probably don\xe2\x80\x99t want us in your inbox every day. Here is what we have been working on this week.\nYou can unsubscribe anytime. For more details, review our Privacy Policy.\nSubscribe\nLoading\xe2\x80\xa6\nThank you!\nYou have successfully joined our subscriber list.\n\xc3\x97\nThank you!\nOne of our team will be in touch to learn more about your requirements, and provide pricing and access options.\n\xc3\x97\nNews\nQuantum Computing Business\nNational\nCapital Markets\nExclusives\nInsights\nEducation\nInterviews\nMedia\nIntro to quantum\nAdvisory\nAbout Us\nMarketing\nQ-munity\nNews\nQuantum Computing Business\nNational\nCapital Markets\nExclusives\nInsights\nEducation\nInterviews\nMedia\nIntro to quantum\nAdvisory\nAbout Us\nMarketing\nQ-munity\nContact Us\nIntelligence\nSubscribe to our industry leading leading newsletter for the latest in quantum news and insights.\nEmail\nSUBSCRIBE\nJoin Our Newsletter\nYou can unsubscribe anytime. For more details, review our Privacy Policy.\nSubscribe\nLoading...\nThank you!\nYou have successfully joined our subscriber list.\nDigitalagentur Forge12 Interactive GmbH'"""
-    for news_article in complete_news_articles:
-        t.tic()
-        short_text = summarizer.get_summary(str(news_article.content))
-        t.toc("summarizer.get_summary()")
-        print(short_text)
-        news_article.content = short_text
+    # Background crawler keeping the article store warm, e.g.
+    #   python -m app.web_crawler.workflow --topics "AI news,quantum computing" --interval 1800
+    from app.web_crawler.scheduler import PreCrawler
+
+    load_dotenv(override=True)
+    parser = argparse.ArgumentParser(description="Crawl news topics periodically into the article store")
+    parser.add_argument("--topics", default=os.getenv("PRECRAWL_TOPICS", ""), help="Comma separated search topics")
+    parser.add_argument("--interval", type=float, default=float(os.getenv("PRECRAWL_INTERVAL", 1800)),
+                        help="Seconds between two crawls of all topics")
+    parser.add_argument("--once", action="store_true", help="Crawl all topics once and exit")
+    args = parser.parse_args()
+
+    pre_crawler = PreCrawler.from_env(topics=args.topics, interval=args.interval)
+    if args.once:
+        pre_crawler.run_once()
+    else:
+        pre_crawler.run_forever()
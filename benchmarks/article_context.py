@@ -0,0 +1,42 @@
+"""
+Benchmark of the article context sent to the LLM per post request.
+
+Compares the previous prompts, which got the repr of the list of articles once
+for the text and once for the image, with the ArticleContext rendered within
+the budgets of the two nodes, for a growing number of articles.
+
+Usage (from the repository root):
+
+    python -m benchmarks.article_context --articles data/work/wired/output
+"""
+import argparse
+import os
+
+from app.agents.article_context import IMAGE_CONTEXT_TOKENS, TEXT_CONTEXT_TOKENS, ArticleContext
+from app.helper_functions import count_tokens
+from app.web_crawler.article_index import ArticleIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", default="data/work/wired/output", help="Folder with article JSON files")
+    parser.add_argument("--text-tokens", type=int, default=int(os.getenv("TEXT_CONTEXT_TOKENS", TEXT_CONTEXT_TOKENS)))
+    parser.add_argument("--image-tokens", type=int, default=int(os.getenv("IMAGE_CONTEXT_TOKENS", IMAGE_CONTEXT_TOKENS)))
+    args = parser.parse_args()
+
+    articles = list(ArticleIndex(args.articles))
+    if not articles:
+        raise ValueError(f"No articles found in '{args.articles}'")
+
+    print(f"{'articles':>8} {'legacy tok':>11} {'text tok':>9} {'image tok':>10} {'compact tok':>12} {'reduction':>10}")
+    for n in range(1, len(articles) + 1):
+        legacy = 2 * count_tokens(str(articles[:n]))
+        context = ArticleContext(articles[:n])
+        text_tokens = count_tokens(context.render(args.text_tokens, name="text_generator"))
+        image_tokens = count_tokens(context.render(args.image_tokens, name="image_generator"))
+        compact = text_tokens + image_tokens
+        print(f"{n:>8} {legacy:>11} {text_tokens:>9} {image_tokens:>10} {compact:>12} {1 - compact / legacy:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+End to end benchmark of the crawler without network access.
+
+A local stub server plays SerpAPI (the recorded search result in
+benchmarks/fixtures/google_news.json), the news sites (the saved WIRED pages)
+and Groq (canned summaries after a fixed latency). The real clients talk to
+it: serpapi, httpx through the AsyncFetcher and the Groq SDK. Every run
+streams the search result through the CrawlPipeline with cold caches and
+reports per stage latency percentiles, articles per second and peak memory.
+
+All pages are served from one host, so FETCH_MAX_PER_HOST limits the
+concurrent downloads; set it (and the other crawler settings) in the
+environment to compare configurations.
+
+Usage (from the repository root):
+
+    python -m benchmarks.crawler --runs 5 --page-latency 50 --llm-latency 300
+"""
+import argparse
+import asyncio
+import json
+import os
+import pathlib
+import re
+import resource
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+import numpy as np
+
+FIXTURE = pathlib.Path(__file__).parent / "fixtures" / "google_news.json"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Set by StubServer
+    fixture = ""
+    pages: pathlib.Path = None
+    page_latency = 0.0
+    llm_latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def __send(self, status: int, body: str, content_type: str) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.startswith("/search"):
+            base_url = f"http://{self.headers['Host']}"
+            return self.__send(200, self.fixture.replace("{base_url}", base_url), "application/json")
+
+        time.sleep(self.page_latency)
+        page = self.pages / f"{self.path.rsplit('/', 1)[-1]}.txt"
+        if not page.is_file():
+            return self.__send(404, "<html><body>Not found</body></html>", "text/html")
+        self.__send(200, page.read_text(encoding="utf-8", errors="replace"), "text/html; charset=utf-8")
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.llm_latency)
+        prompt = request["messages"][-1]["content"]
+        if "JSON array" in prompt:
+            texts = re.split(r"TEXT \d+:\n", prompt.split("Return only")[0])[1:]
+            content = json.dumps([self.summary(text) for text in texts])
+        else:
+            content = self.summary(prompt.split("words:", 1)[-1].split("Return only")[0])
+        self.__send(200, json.dumps({
+            "id": "stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+                "logprobs": None,
+            }],
+            "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": 60, "total_tokens": len(prompt.split()) + 60},
+        }), "application/json")
+
+    @staticmethod
+    def summary(text: str) -> str:
+        return " ".join(text.split()[:60])
+
+
+class StubServer:
+    def __init__(self, pages: str, page_latency: float, llm_latency: float):
+        handler = type("Handler", (StubHandler,), dict(
+            fixture=FIXTURE.read_text(encoding="utf-8"),
+            pages=pathlib.Path(pages),
+            page_latency=page_latency,
+            llm_latency=llm_latency,
+        ))
+        self.__server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.__server.server_address[1]}"
+
+    def __enter__(self) -> "StubServer":
+        self.__thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.__server.shutdown()
+        self.__server.server_close()
+
+
+def configure_environment(stub_url: str) -> None:
+    """Point all clients at the stub server and disable the caches, before the app modules are imported."""
+    os.environ.update({
+        "SERP_API_KEY": "benchmark",
+        "GROQ_API_KEY": "benchmark",
+        "GROQ_BASE_URL": stub_url,
+        "SEARCH_CACHE_TTL": "0",
+        "PAGE_CACHE_DIR": "",
+        "SUMMARY_CACHE_SIZE": "0",
+        "SUMMARY_CACHE_PATH": "",
+        # The stub has no rate limit, measure the crawler and not Groq's quota
+        "SUMMARIZER_REQUESTS_PER_MINUTE": "0",
+    })
+
+
+def percentiles(values: List[float]) -> str:
+    if not values:
+        return f"{'-':>8} {'-':>8} {'-':>8}"
+    p50, p90, p99 = np.percentile(np.array(values) * 1000, [50, 90, 99])
+    return f"{p50:>8.1f} {p90:>8.1f} {p99:>8.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="data/work/wired/sites", help="Folder with the saved html pages")
+    parser.add_argument("--runs", type=int, default=3, help="Number of crawls")
+    parser.add_argument("--limit", type=int, default=10, help="Number of news results to crawl")
+    parser.add_argument("--page-latency", type=float, default=50, help="Milliseconds until a page is served")
+    parser.add_argument("--llm-latency", type=float, default=300, help="Milliseconds until a summary is served")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Also report the peak of Python allocations (tracemalloc slows the crawl down)")
+    args = parser.parse_args()
+
+    with StubServer(args.pages, args.page_latency / 1000, args.llm_latency / 1000) as server:
+        configure_environment(server.url)
+        # Imported late, the caches are configured on import
+        from serpapi import GoogleSearch
+
+        from app.web_crawler.news_sources import GoogleNewsSource
+        from app.web_crawler.pipeline import CrawlPipeline
+        from app.web_crawler.summarizers import create_summarizer_from_env
+
+        GoogleSearch.BACKEND = server.url
+
+        timings: Dict[str, List[float]] = {}
+        durations, articles = [], 0
+        if args.trace_memory:
+            tracemalloc.start()
+        for _ in range(args.runs):
+            pipeline = CrawlPipeline(GoogleNewsSource(), create_summarizer_from_env())
+            start = time.perf_counter()
+            news_articles = asyncio.run(pipeline.collect(
+                {"q": "artificial intelligence", "engine": "google_news", "gl": "us", "hl": "en"},
+                limit=args.limit,
+            ))
+            durations.append(time.perf_counter() - start)
+            articles += len(news_articles)
+            for stage, values in pipeline.timings.items():
+                timings.setdefault(stage, []).extend(values)
+        _, peak_traced = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print()
+    print(f"{'stage':<12} {'count':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}")
+    for stage, values in timings.items():
+        print(f"{stage:<12} {len(values):>6} {percentiles(values)}")
+    print(f"{'crawl':<12} {len(durations):>6} {percentiles(durations)}")
+    print()
+    print(f"Throughput: {articles / sum(durations):.2f} articles/s ({articles} articles in {args.runs} runs)")
+    # ru_maxrss is in kilobytes on Linux
+    peak_memory = f"Peak memory: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB max RSS"
+    if args.trace_memory:
+        peak_memory += f", {peak_traced / 2 ** 20:.1f} MB traced"
+    print(peak_memory)
+
+
+if __name__ == "__main__":
+    main()
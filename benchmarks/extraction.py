@@ -0,0 +1,70 @@
+"""
+Benchmark of the html text extraction on saved news pages.
+
+Compares the previous extraction (all text of the page, returned as the repr of
+its utf-8 encoding) with the main content extraction and reports the extraction
+time and the number of tokens that would be sent to the summarizer.
+
+Usage (from the repository root):
+
+    python -m benchmarks.extraction --pages data/work/wired/sites
+"""
+import argparse
+import pathlib
+import statistics
+import time
+
+from app.helper_functions import count_tokens
+from app.web_crawler.helpers import extract_full_text_from_html, extract_text_from_html
+
+
+def legacy_extract(page: str) -> str:
+    return str(extract_full_text_from_html(page).encode('utf-8'))
+
+
+def timed(function, page: str, repeat: int):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = function(page)
+        durations.append(time.perf_counter() - start)
+    return text, min(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="data/work/wired/sites", help="Folder with saved html pages")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per page, the fastest one is reported")
+    args = parser.parse_args()
+
+    paths = sorted(p for p in pathlib.Path(args.pages).iterdir() if p.suffix in (".html", ".htm", ".txt"))
+    if not paths:
+        raise ValueError(f"No saved pages found in '{args.pages}'")
+
+    print(f"{'page':<30} {'legacy ms':>10} {'main ms':>10} {'legacy tok':>11} {'main tok':>9} {'reduction':>10}")
+    rows = []
+    for path in paths:
+        page = path.read_text(encoding="utf-8", errors="replace")
+        legacy_text, legacy_time = timed(legacy_extract, page, args.repeat)
+        main_text, main_time = timed(extract_text_from_html, page, args.repeat)
+        legacy_tokens = count_tokens(legacy_text)
+        main_tokens = count_tokens(main_text)
+        reduction = 1 - main_tokens / legacy_tokens if legacy_tokens else 0.0
+        rows.append((legacy_time, main_time, legacy_tokens, main_tokens))
+        print(
+            f"{path.name[:30]:<30} {legacy_time * 1000:>10.1f} {main_time * 1000:>10.1f} "
+            f"{legacy_tokens:>11} {main_tokens:>9} {reduction:>9.0%}"
+        )
+
+    legacy_total = sum(row[2] for row in rows)
+    main_total = sum(row[3] for row in rows)
+    print()
+    print(f"pages: {len(rows)}")
+    print(f"median extraction time: legacy {statistics.median(r[0] for r in rows) * 1000:.1f} ms, "
+          f"main content {statistics.median(r[1] for r in rows) * 1000:.1f} ms")
+    print(f"tokens: legacy {legacy_total}, main content {main_total} "
+          f"({1 - main_total / legacy_total:.0%} fewer, {legacy_total / max(main_total, 1):.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
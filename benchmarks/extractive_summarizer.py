@@ -0,0 +1,68 @@
+"""
+Benchmark of the local LexRank summarizer on saved news pages.
+
+For every page the main content is extracted and then
+  - cut down to `--budget` tokens, as PrefilteringSummarizer does before the
+    Groq call, and
+  - summarized standalone with SummarizerUsingLexRank.
+Reports the latency of both and the tokens saved per article.
+
+Usage (from the repository root):
+
+    python -m benchmarks.extractive_summarizer --pages data/work/wired/sites --budget 1500
+"""
+import argparse
+import pathlib
+import statistics
+import time
+
+from app.helper_functions import count_tokens
+from app.web_crawler.helpers import extract_text_from_html
+from app.web_crawler.summarizers import PrefilteringSummarizer, Summarizer, SummarizerUsingLexRank
+
+
+class NoSummarizer(Summarizer):
+    def get_summary(self, text_to_summarize: str, min_length=100, max_length=150) -> str:
+        return text_to_summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="data/work/wired/sites", help="Folder with saved html pages")
+    parser.add_argument("--budget", type=int, default=1500, help="Token budget of the prefilter")
+    args = parser.parse_args()
+
+    lexrank = SummarizerUsingLexRank()
+    prefilter = PrefilteringSummarizer(NoSummarizer(), max_input_tokens=args.budget, extractor=lexrank)
+
+    print(f"{'page':<30} {'tokens':>7} {'prefilt':>8} {'ms':>6} {'summary':>8} {'ms':>6}")
+    rows = []
+    for path in sorted(pathlib.Path(args.pages).iterdir()):
+        text = extract_text_from_html(path.read_text(encoding="utf-8", errors="replace"))
+        tokens = count_tokens(text)
+
+        start = time.perf_counter()
+        prefiltered = prefilter.prefilter(text)
+        prefilter_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        summary = lexrank.get_summary(text)
+        summary_time = time.perf_counter() - start
+
+        row = (tokens, count_tokens(prefiltered), prefilter_time, count_tokens(summary), summary_time)
+        rows.append(row)
+        print(f"{path.name[:30]:<30} {row[0]:>7} {row[1]:>8} {row[2] * 1000:>6.1f} {row[3]:>8} {row[4] * 1000:>6.1f}")
+
+    total = sum(r[0] for r in rows)
+    prefiltered_total = sum(r[1] for r in rows)
+    print()
+    print(f"articles: {len(rows)}")
+    print(f"prefilter: median {statistics.median(r[2] for r in rows) * 1000:.1f} ms, "
+          f"{(total - prefiltered_total) / len(rows):.0f} tokens saved per article "
+          f"({1 - prefiltered_total / total:.0%} of the summarizer input)")
+    print(f"standalone summary: median {statistics.median(r[4] for r in rows) * 1000:.1f} ms, "
+          f"{statistics.mean(r[3] for r in rows):.0f} tokens on average, no LLM call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Microbenchmark of the per request overhead of the post creator graph.
+
+Compares building and compiling the StateGraph for every request (as
+generate_post did) with invoking a variant compiled once by the GraphRegistry.
+The graph has the dependencies and conditions the app serves, its nodes are
+stubs that return immediately, so only LangGraph's own work is measured.
+
+Usage (from the repository root):
+
+    python -m benchmarks.graph_overhead --requests 200 --outputs text,image,meme
+"""
+import argparse
+import time
+from typing import List, TypedDict, Union
+
+from app.agents.graph_registry import GraphRegistry
+from app.agents.post_creator_graph import POST_CREATOR_CONDITIONS, POST_CREATOR_DEPENDENCIES
+
+
+class State(TypedDict):
+    user_prompt: str
+    generate_text: bool
+    generate_image: bool
+    generate_meme: bool
+    news_articles: Union[List[str], None]
+    generated_text: Union[str, None]
+    generated_image_url: Union[str, None]
+    selected_meme_template: Union[str, None]
+    generated_meme_url: Union[str, None]
+
+
+# Stubs in the order of POST_CREATOR_NODES, it determines the order of parallel branches
+NODES = {
+    "web_crawler": lambda state: {"news_articles": ["article"]},
+    "text_generator": lambda state: {"generated_text": "text"},
+    "image_generator": lambda state: {"generated_image_url": "image"},
+    "meme_selector": lambda state: {"selected_meme_template": "template"},
+    "meme_generator": lambda state: {"generated_meme_url": "meme"},
+}
+
+
+def per_request(note: str, function, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        function()
+    elapsed = (time.perf_counter() - start) / requests
+    print(f"{note:<36} {elapsed * 1000:>8.2f} ms/request")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Number of simulated requests")
+    parser.add_argument("--outputs", default="text,image,meme", help="Requested outputs (text, image, meme)")
+    args = parser.parse_args()
+
+    outputs = {output.strip() for output in args.outputs.split(",")}
+    initial_input = {
+        "user_prompt": "artificial intelligence",
+        **{f"generate_{output}": output in outputs for output in ("text", "image", "meme")},
+    }
+
+    def create_registry() -> GraphRegistry:
+        return GraphRegistry(State, NODES, POST_CREATOR_DEPENDENCIES, POST_CREATOR_CONDITIONS)
+
+    def rebuild_and_invoke():
+        create_registry().get().invoke(initial_input)
+
+    registry = create_registry()
+    registry.get()
+
+    def invoke_compiled():
+        registry.get().invoke(initial_input)
+
+    before = per_request("build, compile and invoke", rebuild_and_invoke, args.requests)
+    after = per_request("invoke compiled graph", invoke_compiled, args.requests)
+    print(f"Per request overhead saved: {(before - after) * 1000:.2f} ms ({1 - after / before:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark of article persistence: one JSON file per article (as written by
+create_article_summaries_from_metadata_file), read file by file and through
+the ArticleIndex, against SqliteNewsRepo.
+
+The saved WIRED articles are replicated to the requested number of articles,
+written with both approaches and read back completely and by id.
+
+Usage (from the repository root):
+
+    python -m benchmarks.news_repo --articles 20000
+"""
+import argparse
+import json
+import os
+import pathlib
+import random
+import tempfile
+import time
+
+from app.web_crawler.article_index import ArticleIndex
+from app.web_crawler.data_model import NewsArticle
+from app.web_crawler.news_repos import SqliteNewsRepo
+
+
+def load_json_files_from_folder(folder_path: str):
+    # The file by file loading app.agents.nodes.load_json_files_from_folder
+    # did before it was backed by the ArticleIndex
+    articles = []
+    for filename in os.listdir(folder_path):
+        if filename.endswith(".json"):
+            file_path = os.path.join(folder_path, filename)
+            with open(file_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+                article = NewsArticle(**data)
+                articles.append(article)
+    return articles
+
+
+def make_articles(template_folder: str, count: int):
+    templates = [
+        NewsArticle(**json.loads(path.read_text(encoding="utf-8")))
+        for path in sorted(pathlib.Path(template_folder).glob("*.json"))
+    ]
+    if not templates:
+        raise ValueError(f"No article templates found in '{template_folder}'")
+    for i in range(count):
+        template = templates[i % len(templates)]
+        yield f"{i:024x}", template.model_copy(update={
+            "source": f"{template.source}?copy={i}",
+            "date": f"2024-12-{1 + i % 28:02d}",
+        })
+
+
+def measure(note: str, function):
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    print(f"{note:<40} {elapsed * 1000:>10.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=5000, help="Number of articles to store")
+    parser.add_argument("--templates", default="data/work/wired/output", help="Folder with article JSON files")
+    parser.add_argument("--lookups", type=int, default=1000, help="Number of loads by article_id")
+    args = parser.parse_args()
+
+    articles = list(make_articles(args.templates, args.articles))
+    lookup_ids = random.Random(0).sample([article_id for article_id, _ in articles], min(args.lookups, len(articles)))
+    print(f"articles: {len(articles)}, lookups: {len(lookup_ids)}")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        folder = pathlib.Path(work_dir, "output")
+        folder.mkdir()
+
+        def write_json_files():
+            for article_id, news_article in articles:
+                with open(folder / f"{article_id}.json", "w") as outfile:
+                    outfile.write(news_article.model_dump_json(indent=2))
+
+        def load_json_by_id():
+            for article_id in lookup_ids:
+                NewsArticle(**json.loads((folder / f"{article_id}.json").read_text(encoding="utf-8")))
+
+        repo = SqliteNewsRepo(path=os.path.join(work_dir, "news.sqlite3"))
+
+        def write_sqlite():
+            repo.store_many(
+                (news_article for _, news_article in articles),
+                source="wired",
+                article_ids=[article_id for article_id, _ in articles],
+            )
+
+        def load_sqlite_by_id():
+            for article_id in lookup_ids:
+                repo.load(article_id, "wired")
+
+        measure("json folder: write", write_json_files)
+        measure("sqlite repo: write (bulk upsert)", write_sqlite)
+        measure("sqlite repo: rewrite (dedup upsert)", write_sqlite)
+        loaded = measure("json folder: load all", lambda: load_json_files_from_folder(str(folder)))
+        measure("article index: build", lambda: ArticleIndex(str(folder), cache_dir=os.path.join(work_dir, "index")))
+        index = measure("article index: open unchanged", lambda: ArticleIndex(str(folder), cache_dir=os.path.join(work_dir, "index")))
+        measure("article index: load all", lambda: list(index))
+        streamed = measure("sqlite repo: load_all (streamed)", lambda: sum(1 for _ in repo.load_all("wired")))
+        measure("sqlite repo: load_all since 2024-12-20", lambda: sum(1 for _ in repo.load_all("wired", since="2024-12-20")))
+        measure("json folder: load by id", load_json_by_id)
+        measure("sqlite repo: load by id", load_sqlite_by_id)
+        assert len(loaded) == streamed == len(index) == len(articles)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import json
+
+from app.web_crawler.article_index import shared_article_index
+
+
+def write_article(folder, name: str, title: str) -> None:
+    article = dict(title=title, date="", content="...", author="", source=f"https://example.com/{name}")
+    (folder / f"{name}.json").write_text(json.dumps(article), encoding="utf-8")
+
+
+def test_shared_article_index_is_refreshed(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTICLE_INDEX_DIR", str(tmp_path / "index"))
+    folder = tmp_path / "articles"
+    folder.mkdir()
+    write_article(folder, "a", "First")
+
+    index = shared_article_index(str(folder))
+    assert [article.title for article in index] == ["First"]
+
+    write_article(folder, "b", "Second")
+    assert shared_article_index(str(folder)) is index
+    assert [article.title for article in index] == ["First", "Second"]
+    # Nothing is written into the indexed folder
+    assert sorted(path.name for path in folder.iterdir()) == ["a.json", "b.json"]
@@ -0,0 +1,69 @@
+from app.web_crawler.data_model import NewsArticle
+from app.web_crawler.dedup import StreamingDeduplicator, deduplicate_articles
+
+STORY = (
+    "The city council approved the new budget on Tuesday after a long debate about "
+    "public transport, school funding and the renovation of the central library."
+)
+
+
+def article(source: str, content: str) -> NewsArticle:
+    return NewsArticle(title=source, date="", content=content, author="", source=source)
+
+
+def test_deduplicate_articles_keeps_the_longest_source():
+    articles = [
+        article("short", STORY),
+        article("other", "A completely different story about the weather and the harvest this year."),
+        article("long", STORY + " The mayor welcomed the decision."),
+    ]
+    kept, report = deduplicate_articles(articles, threshold=0.5)
+    assert [a.source for a in kept] == ["long", "other"]
+    assert report.duplicate_groups == [["long", "short"]]
+
+
+def test_deduplicate_articles_keeps_empty_texts():
+    articles = [article("a", ""), article("b", "  \n"), article("c", "")]
+    kept, report = deduplicate_articles(articles)
+    assert [a.source for a in kept] == ["a", "b", "c"]
+    assert report.duplicate_groups == []
+
+
+def test_streaming_deduplicator_ignores_empty_texts():
+    deduplicator = StreamingDeduplicator()
+    assert not any(deduplicator.is_duplicate(article(source, "")) for source in "abc")
+
+
+def test_streaming_deduplicator_replaces_kept_article_with_longer_duplicate():
+    deduplicator = StreamingDeduplicator(threshold=0.5)
+    first = article("short", STORY)
+    assert not deduplicator.is_duplicate(first)
+    assert deduplicator.is_duplicate(article("long", STORY + " The mayor welcomed the decision."))
+    # The kept object now carries the better source
+    assert first.source == "long"
+    assert deduplicator.duplicates == [("long", "short")]
+
+
+def test_streaming_deduplicator_keeps_released_article():
+    deduplicator = StreamingDeduplicator(threshold=0.5)
+    first = article("short", STORY)
+    assert not deduplicator.is_duplicate(first)
+    deduplicator.release(first)
+    assert deduplicator.is_duplicate(article("long", STORY + " The mayor welcomed the decision."))
+    assert first.source == "short"
+    assert deduplicator.duplicates == [("short", "long")]
+
+
+def test_streaming_deduplicator_report():
+    deduplicator = StreamingDeduplicator(threshold=0.5)
+    for news_article in [
+        article("short", STORY),
+        article("empty", ""),
+        article("long", STORY + " The mayor welcomed the decision."),
+        article("copy", STORY),
+    ]:
+        deduplicator.is_duplicate(news_article)
+    report = deduplicator.report()
+    assert (report.input_count, report.kept_count) == (4, 2)
+    assert report.dedup_rate == 0.5
+    assert report.duplicate_groups == [["long", "short", "copy"]]
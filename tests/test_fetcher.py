@@ -0,0 +1,36 @@
+import asyncio
+import pathlib
+
+import httpx
+
+from app.web_crawler.extractors import extract_main_content
+from app.web_crawler.fetcher import AsyncFetcher
+from app.web_crawler.page_cache import PageCache
+
+PAGE = sorted((pathlib.Path(__file__).parents[1] / "data/work/wired/sites").glob("*.txt"))[0].read_bytes()
+
+
+def test_fetch_text_streams_and_caches_pages(tmp_path):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+
+        async def body():
+            for start in range(0, len(PAGE), 10_000):
+                yield PAGE[start:start + 10_000]
+
+        return httpx.Response(200, headers={"Content-Type": "text/html; charset=utf-8"}, content=body())
+
+    async def fetch_twice():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with AsyncFetcher(client=client, max_bytes=len(PAGE), cache=PageCache(directory=str(tmp_path))) as fetcher:
+            first = await fetcher.fetch_text("https://www.wired.com/story", article_id="story")
+            second = await fetcher.fetch_text("https://www.wired.com/story", article_id="story")
+        await client.aclose()
+        return first, second
+
+    first, second = asyncio.run(fetch_twice())
+    assert first == extract_main_content(PAGE.decode("utf-8"))
+    assert second == first
+    assert len(requests) == 1
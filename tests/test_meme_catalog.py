@@ -0,0 +1,25 @@
+import asyncio
+
+from app.agents import meme_catalog
+from app.agents.meme_catalog import MemeTemplateCatalog
+
+NAMES = ["Drake Hotline Bling", "Two Buttons", "Distracted Boyfriend", "Running Away Balloon", "Change My Mind"]
+
+
+def shortlist(monkeypatch, prompt: str, k: int, fallback_size: int):
+    async def fetch_templates():
+        return [dict(id=str(i), name=name, box_count=2) for i, name in enumerate(NAMES)]
+
+    monkeypatch.setattr(meme_catalog, "afetch_templates", fetch_templates)
+    catalog = MemeTemplateCatalog(path=None, fallback_size=fallback_size)
+    return [template["name"] for template in asyncio.run(catalog.ashortlist(prompt, k=k))]
+
+
+def test_shortlist_ranks_matching_names_first(monkeypatch):
+    assert shortlist(monkeypatch, "my boyfriend ignoring me", k=2, fallback_size=4)[0] == "Distracted Boyfriend"
+    assert len(shortlist(monkeypatch, "my boyfriend ignoring me", k=2, fallback_size=4)) == 2
+
+
+def test_shortlist_falls_back_to_popular_templates(monkeypatch):
+    assert shortlist(monkeypatch, "quantum computing", k=2, fallback_size=4) == NAMES[:4]
+    assert shortlist(monkeypatch, "quantum computing", k=2, fallback_size=1) == NAMES[:2]
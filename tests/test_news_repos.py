@@ -0,0 +1,63 @@
+import datetime
+import sqlite3
+
+import pytest
+
+from app.web_crawler.data_model import NewsArticle
+from app.web_crawler.domain import NewsProvider
+from app.web_crawler.news_repos import SqliteNewsRepo, parse_article_date
+
+
+def article(title: str, date: str) -> NewsArticle:
+    return NewsArticle(title=title, date=date, content="...", author="", source=f"https://example.com/{title}")
+
+
+def test_parse_article_date():
+    utc = datetime.timezone.utc
+    assert parse_article_date("11/20/2024, 08:00 AM, +0000 UTC") == datetime.datetime(2024, 11, 20, 8, tzinfo=utc).timestamp()
+    assert parse_article_date("2024-11-20T08:00:00+01:00") == datetime.datetime(2024, 11, 20, 7, tzinfo=utc).timestamp()
+    assert parse_article_date("2024-11-20") == datetime.datetime(2024, 11, 20, tzinfo=utc).timestamp()
+    assert parse_article_date("yesterday") is None
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = SqliteNewsRepo(path=str(tmp_path / "news.sqlite3"))
+    # Lexically "12/01/2023" > "01/15/2024" > "", the dates have to be compared as dates
+    repo.store_many([
+        article("old", "12/01/2023, 09:00 AM, +0000 UTC"),
+        article("undated", ""),
+        article("new", "01/15/2024, 10:00 AM, +0000 UTC"),
+        article("middle", "2024-01-01T12:00:00+00:00"),
+    ])
+    return repo
+
+
+def test_load_all_newest_first(repo):
+    assert [a.title for a in repo.load_all(NewsProvider.GOOGLE)] == ["new", "middle", "old", "undated"]
+
+
+def test_load_all_since(repo):
+    assert [a.title for a in repo.load_all(NewsProvider.GOOGLE, since="12/31/2023")] == ["new", "middle"]
+    since = datetime.datetime(2024, 1, 10, tzinfo=datetime.timezone.utc)
+    assert [a.title for a in repo.load_all(NewsProvider.GOOGLE, since=since)] == ["new"]
+    assert [a.title for a in repo.load_all(NewsProvider.GOOGLE, since=since.timestamp())] == ["new"]
+    with pytest.raises(ValueError):
+        list(repo.load_all(NewsProvider.GOOGLE, since="soon"))
+
+
+def test_dates_of_existing_databases_are_parsed(tmp_path):
+    path = str(tmp_path / "news.sqlite3")
+    # An articles table from before published_at
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute(
+            "CREATE TABLE articles (article_id TEXT PRIMARY KEY, source TEXT NOT NULL, title TEXT NOT NULL, "
+            "date TEXT NOT NULL, content TEXT NOT NULL, author TEXT NOT NULL, link TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        connection.executemany(
+            "INSERT INTO articles VALUES (?, ?, ?, ?, '', '', '', 0)",
+            [("1", str(NewsProvider.GOOGLE), "old", "12/01/2023"), ("2", str(NewsProvider.GOOGLE), "new", "01/15/2024")],
+        )
+    connection.close()
+    assert [a.title for a in SqliteNewsRepo(path=path).load_all(NewsProvider.GOOGLE)] == ["new", "old"]
@@ -0,0 +1,19 @@
+import asyncio
+
+from app.web_crawler.query_encoder import QueryEncoder, TopicCache
+
+
+def test_cached_topics_need_no_api_key(monkeypatch):
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    cache = TopicCache()
+    cache.put("Give me the news about the Mars mission", "Mars mission")
+    encoder = QueryEncoder(cache=cache)
+
+    async def topic() -> str:
+        try:
+            return await encoder.aget_topic("Give me the news about the Mars mission")
+        finally:
+            await encoder.aclose()
+
+    assert asyncio.run(topic()) == "Mars mission"
+    assert encoder.get_topic("give me the news about the mars mission") == "Mars mission"
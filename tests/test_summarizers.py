@@ -0,0 +1,137 @@
+import asyncio
+import time
+import warnings
+
+import numpy as np
+import pytest
+
+from app.helper_functions import count_tokens
+from app.web_crawler import summarizers, summary_cache
+from app.web_crawler.summarizers import (
+    ChunkingSummarizer,
+    PrefilteringSummarizer,
+    Summarizer,
+    SummarizerUsingLexRank,
+    create_summarizer_from_env,
+)
+
+# About 30 tokens per sentence, every sentence with its own words so that LexRank has something to rank
+LONG_TEXT = " ".join(
+    f"Report {i} says the committee number {i} discussed budget item {i} with delegates from region {i} "
+    f"and agreed to revisit proposal {i} before the session {i} ends."
+    for i in range(10, 110)
+)
+
+
+class RecordingSummarizer(Summarizer):
+    """Summarizes a text to its first words and records every text it was given."""
+
+    model = "recording"
+
+    def __init__(self):
+        self.texts = []
+        self.closed = False
+
+    def get_summary(self, text_to_summarize: str, min_length=100, max_length=150) -> str:
+        self.texts.append(text_to_summarize)
+        return " ".join(text_to_summarize.split()[:20])
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def recording(monkeypatch):
+    """create_summarizer_from_env with a RecordingSummarizer in place of Groq and an in-memory cache."""
+    recording = RecordingSummarizer()
+    monkeypatch.setattr(summarizers, "SummarizerUsingGroq", lambda **kwargs: recording)
+    monkeypatch.setattr(summary_cache, "_default_summary_cache", summary_cache.SummaryCache())
+    monkeypatch.setenv("SUMMARIZER_CHUNK_TOKENS", "300")
+    monkeypatch.setenv("SUMMARIZER_PREFILTER_TOKENS", "1000")
+    return recording
+
+
+def test_summarizer_from_env_prefilters_then_chunks_then_caches(recording):
+    summarizer = create_summarizer_from_env()
+    assert count_tokens(LONG_TEXT) > 2000
+
+    assert summarizer.get_summaries([LONG_TEXT])[0].ok
+    *chunks, reduced = recording.texts
+    # Cut to the prefilter budget, then map-reduced in chunks
+    assert len(chunks) >= 2
+    assert all(count_tokens(chunk) <= 300 for chunk in chunks)
+    assert sum(count_tokens(chunk) for chunk in chunks) <= 1000
+    assert reduced.split("\n")[0] == " ".join(chunks[0].split()[:20])
+
+    # The second time the summary comes from the cache
+    summarizer.get_summaries([LONG_TEXT])
+    assert len(recording.texts) == len(chunks) + 1
+
+
+def test_summarizer_from_env_passes_short_texts_through(recording):
+    summarizer = create_summarizer_from_env()
+    assert summarizer.get_summaries(["A short text."])[0].summary == "A short text."
+    assert recording.texts == ["A short text."]
+
+
+def test_summarizer_from_env_without_prefilter(recording, monkeypatch):
+    monkeypatch.setenv("SUMMARIZER_PREFILTER_TOKENS", "0")
+    create_summarizer_from_env().get_summaries([LONG_TEXT])
+    *chunks, _ = recording.texts
+    assert sum(count_tokens(chunk) for chunk in chunks) > 1000
+
+
+def test_summarizer_from_env_closes_the_wrapped_summarizer(recording):
+    asyncio.run(create_summarizer_from_env().aclose())
+    assert recording.closed
+
+
+def test_summarizer_from_env_needs_no_api_key_until_used(monkeypatch):
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    monkeypatch.setattr(summary_cache, "_default_summary_cache", summary_cache.SummaryCache())
+    asyncio.run(create_summarizer_from_env().aclose())
+
+
+def test_summarizer_from_env_rejects_prefilter_below_chunk_size(recording, monkeypatch):
+    monkeypatch.setenv("SUMMARIZER_PREFILTER_TOKENS", "300")
+    with pytest.raises(ValueError):
+        create_summarizer_from_env()
+
+
+def test_prefilter_budget_must_exceed_chunk_size():
+    with pytest.raises(ValueError):
+        PrefilteringSummarizer(ChunkingSummarizer(SummarizerUsingLexRank(), max_chunk_tokens=3000), max_input_tokens=3000)
+
+
+def test_lexrank_scores_sentences_without_terms():
+    # The last sentences only have one letter words, they share no term with any sentence
+    text = "The cat sat on the mat. The cat ate the fish today. A b c d e. I a o u e."
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        sentences, scores = SummarizerUsingLexRank().rank_sentences(text)
+    assert len(sentences) == 4
+    assert not np.isnan(scores).any()
+    assert scores.sum() == pytest.approx(1)
+
+
+def test_lexrank_ranks_at_most_max_sentences():
+    text = " ".join(f"Sentence number {i} is here." for i in range(50))
+    sentences, scores = SummarizerUsingLexRank(max_sentences=10).rank_sentences(text)
+    assert len(sentences) == len(scores) == 10
+
+
+def test_groq_rate_limiter_is_configured_on_first_use(monkeypatch):
+    monkeypatch.setattr(summarizers, "_groq_rate_limiter", None)
+    # Set after the import, as load_dotenv does
+    monkeypatch.setenv("SUMMARIZER_REQUESTS_PER_MINUTE", "600")
+    monkeypatch.setenv("SUMMARIZER_MAX_CONCURRENCY", "2")
+    limiter = summarizers.groq_rate_limiter()
+    assert summarizers.groq_rate_limiter() is limiter
+
+    start = time.monotonic()
+    limiter.acquire_blocking()
+    limiter.acquire_blocking()
+    assert time.monotonic() - start < 0.05
+    # The burst of 2 is used up, the next call waits for the refill of 10 per second
+    limiter.acquire_blocking()
+    assert 0.07 < time.monotonic() - start < 0.5